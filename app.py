@@ -6,8 +6,12 @@ Streamlit Web 界面 - 社交媒体热点分析智能体系统
 
 from __future__ import annotations
 
+import json
 import os
 import sys
+import threading
+import uuid
+from dataclasses import asdict
 from pathlib import Path
 
 # 将项目根目录加入 sys.path
@@ -19,7 +23,192 @@ from src.utils.config import load_config
 from src.hot_topics.crawler import HotTopicCrawler
 from src.hot_topics.database import DatabaseManager
 from src.hot_topics.models import HotTopic
+from src.hot_topics.clustering import group_by_cluster
+from src.hot_topics.scheduler import CrawlScheduler
+from src.hot_topics.trends import get_trending_topics
+from src.storage import SearchIndex
+from src.service.singleflight import ResearchCoalescer
+from src.service.prefetch import ReportPrefetcher
+from src.service.scheduler import Priority, ResearchScheduler
+
+# 热榜排序方式 -> trends 排序字段（None 表示按热度值）
+TOPIC_SORT_OPTIONS = {
+    "热度": None,
+    "上升最快": "growth",
+    "综合趋势": "trend_score",
+}
+
+
+@st.cache_resource(show_spinner=False)
+def get_crawl_scheduler(refresh_interval: int, platform_intervals_json: str,
+                        platforms_json: str, search_index_path: str | None) -> CrawlScheduler:
+    """启动跨会话共享的后台热榜爬取，页面加载只读数据库"""
+    scheduler = CrawlScheduler(
+        HotTopicCrawler(json.loads(platforms_json)),
+        DatabaseManager(),
+        interval=refresh_interval,
+        platform_intervals=json.loads(platform_intervals_json),
+        search_index=get_search_index(search_index_path) if search_index_path else None,
+    )
+    scheduler.start()
+    return scheduler
+
+
+@st.cache_resource(show_spinner=False)
+def get_search_index(search_index_path: str) -> SearchIndex:
+    """跨会话共享的话题与报告全文索引"""
+    return SearchIndex(search_index_path)
+
+
+@st.cache_resource(show_spinner=False)
+def get_research_coalescer(config_json: str) -> ResearchCoalescer:
+    """按配置缓存 Agent 与请求合并器，跨会话共享以合并相同话题的并发分析"""
+    return ResearchCoalescer(DeepSearchAgent(Config(**json.loads(config_json))))
+
+
+@st.cache_resource(show_spinner=False)
+def get_research_scheduler(config_json: str) -> ResearchScheduler:
+    """按配置缓存研究调度器，交互分析与后台预取共享并发配额"""
+    return ResearchScheduler(get_research_coalescer(config_json))
+
+
+@st.cache_resource(show_spinner=False)
+def get_prefetcher_registry() -> dict:
+    """进程内唯一的报告预取器，以及它的配置与注册回调的数据库"""
+    return {"lock": threading.Lock(), "config_json": None, "db": None, "prefetcher": None}
+
+
+def get_report_prefetcher(config_json: str | None, db: DatabaseManager) -> ReportPrefetcher | None:
+    """
+    进程内只保留一个报告预取器，与交互分析共用同一个请求合并器与调度器
+
+    配置变化或关闭预取时，先停止旧预取器并从数据库注销其保存回调，避免多个预取器重复预取同一话题。
+
+    Args:
+        config_json: 研究配置，None 表示关闭预取
+        db: 爬取调度器的数据库
+
+    Returns:
+        当前的预取器，关闭预取时返回 None
+    """
+    registry = get_prefetcher_registry()
+    with registry["lock"]:
+        prefetcher = registry["prefetcher"]
+        if prefetcher is not None and (registry["config_json"] != config_json or registry["db"] is not db):
+            prefetcher.detach(registry["db"])
+            prefetcher.stop()
+            prefetcher = None
+        if prefetcher is None and config_json is not None:
+            config = Config(**json.loads(config_json))
+            prefetcher = ReportPrefetcher(
+                get_research_coalescer(config_json),
+                db,
+                top_n=config.prefetch_top_n,
+                daily_budget=config.prefetch_daily_budget,
+                scheduler=get_research_scheduler(config_json),
+            )
+            prefetcher.start()
+            prefetcher.attach(db)
+        registry.update(config_json=config_json, db=db, prefetcher=prefetcher)
+        return prefetcher
+
+
+def run_research_with_progress(
+    config_json: str,
+    query: str,
+    save_report: bool,
+    hot_topic_info: dict | None,
+    fresh_outline: bool = False,
+) -> tuple[str | None, float]:
+    """运行研究并实时展示进度与已完成段落，返回 (最终报告, 运行时间)"""
+    # 初始化 Agent（相同配置的会话共享同一个 Agent、请求合并器与调度器）
+    with st.spinner("正在初始化 Agent..."):
+        scheduler = get_research_scheduler(config_json)
+    st.success("✅ Agent 初始化成功")
+
+    # ---- 实时进度展示 ----
+    st.markdown("---")
+    st.header("🔄 分析进度")
+
+    progress_placeholder = st.empty()
+    status_placeholder = st.empty()
+
+    # 已定稿段落逐段展示，无需等待最终报告
+    st.subheader("📑 已完成段落")
+    partial_report_container = st.container()
+
+    # 节点中文映射
+    node_names = {
+        "retrieve": "📚 检索历史报告",
+        "structure": "📋 生成报告结构",
+        "search": "🔍 执行搜索",
+        "summary": "📝 生成总结",
+        "reflect": "🤔 反思搜索",
+        "reflect_summary": "✍️ 更新总结",
+        "next_paragraph": "➡️ 移动到下一段落",
+        "format": "📄 格式化最终报告",
+        "refresh_search": "🔁 重新搜索",
+        "refresh_summary": "✍️ 更新变化段落",
+    }
+
+    final_report = None
+    run_time = 0.0
+    user_id = st.session_state.setdefault("user_id", uuid.uuid4().hex)
+    for progress_data in scheduler.research(
+        query,
+        save_report=save_report,
+        hot_topic_info=hot_topic_info,
+        priority=Priority.INTERACTIVE,
+        user=user_id,
+        fresh_outline=fresh_outline,
+    ):
+        if progress_data["node"] == "completed":
+            final_report = progress_data["report"]
+            run_time = progress_data["run_time"]
+            if progress_data.get("cached"):
+                status_placeholder.success("⚡ 已返回近期相同分析的报告")
+            else:
+                status_placeholder.success("✅ 分析完成！")
+            break
+        elif progress_data["node"] == "failed":
+            raise RuntimeError(progress_data["error"])
+        elif progress_data["node"] == "queued":
+            status_placeholder.info(f"⏳ 排队中，前方约 {progress_data['position'] - 1} 个任务")
+        elif progress_data["node"] == "cancelled":
+            final_report = progress_data["report"]
+            run_time = progress_data["run_time"]
+            status_placeholder.warning(
+                f"⏹️ 分析已中止（{progress_data['reason']}），以下为部分报告"
+            )
+            break
+        elif progress_data["node"] == "paragraph_completed":
+            with partial_report_container:
+                st.markdown(
+                    f"### {progress_data['paragraph_index'] + 1}. {progress_data['title']}"
+                )
+                st.markdown(progress_data["summary"])
+                if progress_data["sources"]:
+                    with st.expander(f"🔗 参考来源（{len(progress_data['sources'])}）"):
+                        for source in progress_data["sources"]:
+                            st.markdown(f"- [{source['title'] or source['url']}]({source['url']})")
+        else:
+            node = progress_data["node"]
+            node_display = node_names.get(node, node)
+            status_placeholder.info(
+                f"当前阶段：{node_display}（已用时 {progress_data['elapsed']:.0f} 秒，"
+                f"累计搜索 {progress_data['search_count']} 次）"
+            )
+
+            # 段落进度条
+            current_idx = progress_data["paragraph_index"]
+            total = progress_data["total_paragraphs"]
+            if total > 0:
+                progress_placeholder.progress(
+                    (current_idx + 1) / total,
+                    text=f"段落进度：{current_idx + 1}/{total}",
+                )
 
+    return final_report, run_time
 
 def main() -> None:
     # -------------------- 页面配置 --------------------
@@ -89,6 +278,14 @@ def main() -> None:
             step=5000,
             help="搜索内容的最大字符数",
         )
+        research_timeout = st.number_input(
+            "最长运行时间（秒）",
+            min_value=0,
+            max_value=3600,
+            value=(default_config.research_timeout or 0) if has_config_file else 0,
+            step=60,
+            help="超过该时间后中止研究并返回已完成部分的报告，0 表示不限制",
+        )
         output_dir = st.text_input(
             "报告保存目录",
             value=default_config.output_dir if has_config_file else "reports",
@@ -109,6 +306,11 @@ def main() -> None:
             value=10,
             help="每个平台显示的热榜话题数量",
         )
+        enable_prefetch = st.checkbox(
+            "后台预取热点报告",
+            value=default_config.enable_prefetch if has_config_file else False,
+            help="刷新热榜后为新上榜或快速上升的头部话题预先生成报告，点击即可查看",
+        )
 
         st.markdown("---")
         st.markdown("### 关于")
@@ -119,17 +321,46 @@ def main() -> None:
             """
         )
 
+    # 构造配置
+    config = Config(
+        openai_api_key=openai_api_key,
+        tavily_api_key=tavily_api_key,
+        default_llm_provider="openai",
+        openai_model=openai_model,
+        max_reflections=max_reflections,
+        max_search_results=max_search_results,
+        max_content_length=max_content_length,
+        research_timeout=research_timeout or None,
+        output_dir=output_dir,
+        search_index_path=default_config.search_index_path if has_config_file else "cache/search_index.db",
+        save_intermediate_states=False,
+        hot_topics_refresh_interval=default_config.hot_topics_refresh_interval if has_config_file else 300,
+        hot_topics_platform_intervals=default_config.hot_topics_platform_intervals if has_config_file else None,
+        hot_topics_platforms=default_config.hot_topics_platforms if has_config_file else None,
+        enable_prefetch=enable_prefetch,
+        prefetch_top_n=default_config.prefetch_top_n if has_config_file else 3,
+        prefetch_daily_budget=default_config.prefetch_daily_budget if has_config_file else 20,
+    )
+    config_json = json.dumps(asdict(config), sort_keys=True)
+    prefetcher = None
+
     # -------------------- 热榜展示区域 --------------------
     if enable_hot_topics:
         st.markdown("---")
         st.header("🔥 实时热榜")
 
-        # 初始化热榜相关组件
-        if "hot_topics_initialized" not in st.session_state:
-            st.session_state.crawler = HotTopicCrawler()
-            st.session_state.db = DatabaseManager()
-            st.session_state.hot_topics = []
-            st.session_state.hot_topics_initialized = True
+        # 后台爬取按平台间隔更新数据库，页面只读取数据库
+        crawl_scheduler = get_crawl_scheduler(
+            config.hot_topics_refresh_interval,
+            json.dumps(config.hot_topics_platform_intervals or {}, sort_keys=True),
+            json.dumps(config.hot_topics_platforms),
+            config.search_index_path,
+        )
+        db = crawl_scheduler.db
+
+        # 预取器跨会话共享且只有一个，在爬取调度器的数据库上注册保存回调
+        prefetch_enabled = enable_prefetch and openai_api_key and tavily_api_key
+        prefetcher = get_report_prefetcher(config_json if prefetch_enabled else None, db)
 
         # 刷新热榜按钮和统计信息
         col1, col2, col3 = st.columns([1, 2, 1])
@@ -137,34 +368,65 @@ def main() -> None:
             if st.button("🔄 刷新热榜", use_container_width=True):
                 with st.spinner("正在获取最新热榜..."):
                     try:
-                        topics = st.session_state.crawler.crawl_all_platforms()
-                        st.session_state.db.save_topics(topics)
-                        st.session_state.hot_topics = topics
-                        st.success(f"✅ 已获取 {len(topics)} 个热点话题")
+                        results = crawl_scheduler.refresh()
+                        if sum(results.values()):
+                            st.success(f"✅ 已更新 {sum(results.values())} 个热点话题")
+                        elif results:
+                            st.info("热榜内容无变化，已是最新")
+                        else:
+                            st.info("热榜刚刚更新过，已显示最新数据")
                     except Exception as e:
                         st.error(f"❌ 热榜获取失败：{str(e)}")
 
+        hot_topics = db.get_all_topics()
+
         with col2:
-            if st.session_state.hot_topics:
-                latest_time = st.session_state.db.get_latest_crawl_time()
-                st.info(f"📅 最后更新：{latest_time}")
+            if hot_topics:
+                latest_time = db.get_latest_crawl_time()
+                st.info(f"📅 最后更新：{latest_time}（后台每 {config.hot_topics_refresh_interval // 60} 分钟自动刷新）")
+            else:
+                st.info("⏳ 后台正在获取热榜，请稍后刷新页面")
 
         with col3:
-            if st.session_state.hot_topics:
-                stats = st.session_state.db.get_platform_stats()
+            if hot_topics:
+                stats = db.get_platform_stats()
                 total_count = sum(stat["count"] for stat in stats.values())
                 st.metric("总话题数", total_count)
 
         # 展示热榜
-        if st.session_state.hot_topics:
+        if hot_topics:
             # 平台筛选
-            platforms = list({topic.platform for topic in st.session_state.hot_topics})
-            selected_platform = st.selectbox("筛选平台", ["全部"] + platforms)
+            platforms = list({topic.platform for topic in hot_topics})
+            filter_col, sort_col, merge_col = st.columns([2, 2, 1])
+            with filter_col:
+                selected_platform = st.selectbox("筛选平台", ["全部"] + platforms)
+            with sort_col:
+                sort_label = st.selectbox(
+                    "排序方式",
+                    list(TOPIC_SORT_OPTIONS),
+                    help="上升最快：最近一小时热度相对增长；综合趋势：平台内热度、增长与排名上升的加权",
+                )
+            with merge_col:
+                merge_clusters = st.checkbox(
+                    "合并同一事件",
+                    value=True,
+                    help="不同平台上措辞不同的同一事件只显示热度最高的一条",
+                )
+
+            # 按趋势排序（合并同一事件时保留排序后簇内的第一条）
+            trends = {}
+            if TOPIC_SORT_OPTIONS[sort_label]:
+                trend_list = get_trending_topics(db, sort_by=TOPIC_SORT_OPTIONS[sort_label])
+                trends = {trend.topic.id: trend for trend in trend_list}
+                hot_topics = [trend.topic for trend in trend_list]
 
             # 过滤话题
-            filtered_topics = st.session_state.hot_topics
+            filtered_topics = hot_topics
             if selected_platform != "全部":
                 filtered_topics = [t for t in filtered_topics if t.platform == selected_platform]
+            clusters = group_by_cluster(hot_topics)
+            if merge_clusters:
+                filtered_topics = [members[0] for members in group_by_cluster(filtered_topics).values()]
 
             # 话题列表
             st.subheader(f"📊 {selected_platform} 热榜")
@@ -194,12 +456,60 @@ def main() -> None:
                     with col3:
                         st.write(f"🔥{topic.hot_value:,}")
                         st.write(f"`{topic.platform}`")
+                        trend = trends.get(topic.id)
+                        if trend and (trend.velocity or trend.rank_delta):
+                            rank_change = f"，排名 {trend.rank_delta:+d}" if trend.rank_delta else ""
+                            st.caption(f"📈 {trend.velocity:+,.0f}/小时{rank_change}")
+                        related = clusters.get(topic.cluster_id or topic.id, [])
+                        if len(related) > 1:
+                            st.caption(
+                                "🔗 同一事件：" + "、".join(sorted({t.platform for t in related}))
+                            )
+                        if prefetcher and prefetcher.get_report(topic.platform, topic.title):
+                            st.write("⚡ 报告已就绪")
                     with col4:
                         st.markdown(f"[🔗]({topic.url})")
 
                 if i < len(filtered_topics[:max_hot_topics_display]) - 1:
                     st.divider()
 
+    # -------------------- 历史检索区域 --------------------
+    if config.search_index_path:
+        st.markdown("---")
+        st.header("🔎 历史检索")
+        search_col, kind_col = st.columns([4, 1])
+        with search_col:
+            search_query = st.text_input(
+                "检索历史话题与报告",
+                placeholder="输入关键词，例如：香港 火灾",
+                help="检索历次爬取过的热点话题标题与已保存的研究报告，多个关键词用空格分隔",
+            )
+        with kind_col:
+            search_kind = st.selectbox("范围", ["全部", "话题", "报告"])
+        if search_query.strip():
+            kind = {"全部": None, "话题": "topic", "报告": "report"}[search_kind]
+            results = get_search_index(config.search_index_path).search(search_query, kind=kind)
+            if not results:
+                st.info("没有找到匹配的话题或报告")
+            for j, result in enumerate(results):
+                if result["kind"] == "topic":
+                    topic_col, action_col = st.columns([5, 1])
+                    with topic_col:
+                        st.write(f"📱 **{result['title']}**")
+                        st.caption(f"{result['platform']} · 首次上榜 {result['created_at']} · 最近上榜 {result['updated_at']}")
+                    with action_col:
+                        if st.button("分析", key=f"search_topic_{j}_{result['key']}"):
+                            st.session_state.selected_topic = result["title"]
+                            st.session_state.selected_platform = result["platform"]
+                            st.session_state.pop("selected_hot_topic", None)
+                            st.rerun()
+                else:
+                    with st.expander(f"📄 {result['title']}（{result['created_at']}）"):
+                        st.caption(result["snippet"])
+                        if os.path.exists(result["key"]):
+                            with open(result["key"], encoding="utf-8") as f:
+                                st.markdown(f.read())
+
     # -------------------- 舆情分析区域 --------------------
     st.markdown("---")
     st.header("📝 舆情分析")
@@ -210,6 +520,12 @@ def main() -> None:
             f"🎯 已选择热点话题：**{st.session_state.selected_topic}** "
             f"({st.session_state.get('selected_platform', '')})"
         )
+        selected_hot_topic = st.session_state.get("selected_hot_topic")
+        if prefetcher and selected_hot_topic:
+            ready_report = prefetcher.get_report(selected_hot_topic["platform"], selected_hot_topic["title"])
+            if ready_report:
+                with st.expander(f"⚡ 预取报告已就绪（生成于 {ready_report['created_at']}）", expanded=True):
+                    st.markdown(ready_report["report"])
         query = st.text_area(
             "分析主题",
             value=st.session_state.selected_topic,
@@ -229,6 +545,8 @@ def main() -> None:
         start_research = st.button("🚀 开始分析", type="primary", use_container_width=True)
     with col2:
         save_report = st.checkbox("保存报告到文件", value=True)
+        fresh_outline = st.checkbox("重新生成报告结构", value=False,
+                                    help="默认复用相近话题的报告结构以加快分析，勾选后强制重新生成")
 
     # -------------------- 研究执行 --------------------
     if start_research:
@@ -244,68 +562,22 @@ def main() -> None:
             return
 
         try:
-            # 构造配置
-            config = Config(
-                openai_api_key=openai_api_key,
-                tavily_api_key=tavily_api_key,
-                default_llm_provider="openai",
-                openai_model=openai_model,
-                max_reflections=max_reflections,
-                max_search_results=max_search_results,
-                max_content_length=max_content_length,
-                output_dir=output_dir,
-                save_intermediate_states=False,
-            )
-
-            # 初始化 Agent
-            with st.spinner("正在初始化 Agent..."):
-                agent = DeepSearchAgent(config)
-            st.success("✅ Agent 初始化成功")
-
-            # ---- 实时进度展示 ----
-            st.markdown("---")
-            st.header("🔄 分析进度")
-
-            progress_placeholder = st.empty()
-            status_placeholder = st.empty()
-
-            # 节点中文映射
-            node_names = {
-                "structure": "📋 生成报告结构",
-                "search": "🔍 执行搜索",
-                "summary": "📝 生成总结",
-                "reflect": "🤔 反思搜索",
-                "reflect_summary": "✍️ 更新总结",
-                "next_paragraph": "➡️ 移动到下一段落",
-                "format": "📄 格式化最终报告",
-            }
-
-            final_report = None
             # 获取热点信息
             hot_topic_info = st.session_state.get("selected_hot_topic", None)
 
-            for progress_data in agent.research(
-                query, save_report=save_report, hot_topic_info=hot_topic_info
-            ):
-                if progress_data["node"] == "completed":
-                    final_report = progress_data["report"]
-                    status_placeholder.success("✅ 分析完成！")
-                    break
-                else:
-                    node = progress_data["node"]
-                    state = progress_data["state"]
-                    node_display = node_names.get(node, node)
-                    status_placeholder.info(f"当前阶段：{node_display}")
-
-                    # 段落进度条
-                    if "current_paragraph_index" in state and "paragraphs" in state:
-                        current_idx = state["current_paragraph_index"]
-                        total = len(state["paragraphs"])
-                        if total > 0:
-                            progress_placeholder.progress(
-                                (current_idx + 1) / total,
-                                text=f"段落进度：{current_idx + 1}/{total}",
-                            )
+            # 已有预取报告时直接展示
+            prefetched = None
+            if prefetcher and hot_topic_info and query.strip() == hot_topic_info["title"]:
+                prefetched = prefetcher.get_report(hot_topic_info["platform"], hot_topic_info["title"])
+
+            if prefetched:
+                final_report = prefetched["report"]
+                run_time = 0.0
+                st.success(f"⚡ 已展示预取报告（生成于 {prefetched['created_at']}）")
+            else:
+                final_report, run_time = run_research_with_progress(
+                    config_json, query, save_report, hot_topic_info, fresh_outline
+                )
 
             # -------------------- 结果展示 --------------------
             if final_report:
@@ -314,7 +586,7 @@ def main() -> None:
                 tab1, tab2 = st.tabs(["📄 最终报告", "💾 下载"])
                 with tab1:
                     st.subheader("⏱️ 运行统计")
-                    st.metric("运行时间", f"{progress_data['run_time']:.2f} 秒")
+                    st.metric("运行时间", f"{run_time:.2f} 秒")
 
                     # 显示分析主题信息
                     if "selected_topic" in st.session_state:
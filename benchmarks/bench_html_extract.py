@@ -0,0 +1,112 @@
+"""
+热榜 HTML 提取微基准
+比较 src.hot_topics.html_extract 各后端与原 BeautifulSoup 全树解析的单页耗时
+
+用法：
+    python benchmarks/bench_html_extract.py                      # 使用 benchmarks/fixtures/*.html，没有时生成模拟页面
+    python benchmarks/bench_html_extract.py --fixture page.html  # 指定保存的页面
+    python benchmarks/bench_html_extract.py --save               # 把模拟页面保存到 benchmarks/fixtures/
+
+保存真实页面：curl -o benchmarks/fixtures/baidu_buzz.html "http://top.baidu.com/buzz?b=1&c=513&fr=topbuzz_b1_c513"
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.hot_topics.html_extract import available_backends, extract_texts  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+SELECTOR = ".c-single-text-ellipsis"
+
+
+def make_synthetic_page(items: int = 50, filler_blocks: int = 400, seed: int = 0) -> str:
+    """生成与百度热榜结构相近的模拟页面：大量脚本、样式与导航块中夹着榜单条目"""
+    rng = random.Random(seed)
+    words = ["热点", "发布", "回应", "事件", "最新", "进展", "官方", "网友", "讨论", "视频", "现场", "通报"]
+    parts = ["<!DOCTYPE html><html><head><meta charset='utf-8'><title>百度热搜</title>"]
+    parts.append("<style>" + ".c-x{color:#333}" * 500 + "</style>")
+    parts.append("<script>" + "var a=[1,2,3];" * 2000 + "</script></head><body>")
+    for i in range(filler_blocks):
+        parts.append(
+            f"<div class='nav-item item-{i}'><a href='/link/{i}'><span>{rng.choice(words)}</span>"
+            f"<img src='/img/{i}.png'></a><p>{''.join(rng.choices(words, k=8))}</p></div>"
+        )
+        if i == filler_blocks // 4:
+            parts.append("<div class='category-wrap_iQLoo'>")
+            for rank in range(items):
+                title = "".join(rng.choices(words, k=5))
+                parts.append(
+                    f"<div class='category-wrap_iQLoo horizontal_1eKyQ'><a class='img-wrapper_29V76' href='#'>"
+                    f"<div class='index_1Ew5p c-index-bg{rank + 1}'>{rank + 1}</div></a>"
+                    f"<div class='content_1YWBm'><a href='https://www.baidu.com/s?wd={title}' class='title_dIF3B'>"
+                    f"<div class='c-single-text-ellipsis'>  {title}&amp;{rank}  </div></a>"
+                    f"<div class='hot-desc_1m_jR'>{''.join(rng.choices(words, k=30))}<br/></div></div>"
+                    f"<div class='trend_2RttY'><div class='hot-index_1Bl1a'>{rng.randint(10000, 999999)}</div></div></div>"
+                )
+            parts.append("</div>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def bench(func, repeat: int) -> float:
+    """返回单次调用的最短耗时（毫秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="热榜 HTML 提取微基准")
+    parser.add_argument("--fixture", action="append", help="保存的页面文件，可多次指定")
+    parser.add_argument("--selector", default=SELECTOR, help="标题选择器")
+    parser.add_argument("--limit", type=int, default=20, help="提取条数")
+    parser.add_argument("--repeat", type=int, default=20, help="每个后端重复次数")
+    parser.add_argument("--save", action="store_true", help="把模拟页面保存到 benchmarks/fixtures/")
+    args = parser.parse_args(argv)
+
+    if args.save:
+        os.makedirs(FIXTURE_DIR, exist_ok=True)
+        path = os.path.join(FIXTURE_DIR, "synthetic_baidu_buzz.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(make_synthetic_page())
+        print(f"已保存: {path}")
+        return
+
+    fixtures = args.fixture or sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html")))
+    pages = {}
+    for path in fixtures:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages[os.path.basename(path)] = f.read()
+    if not pages:
+        pages["synthetic"] = make_synthetic_page()
+
+    backends = available_backends()
+    print(f"可用后端: {', '.join(backends)}")
+    for name, html in pages.items():
+        print(f"\n{name} ({len(html) / 1024:.0f} KB)")
+        baseline = None
+        expected = None
+        for backend in reversed(backends):  # bs4 全树解析作为基线
+            try:
+                texts = extract_texts(html, args.selector, args.limit, backend=backend)
+                elapsed = bench(lambda: extract_texts(html, args.selector, args.limit, backend=backend), args.repeat)
+            except ImportError as e:
+                print(f"  {backend:<11} 不可用: {e}")
+                continue
+            if baseline is None:
+                baseline, expected = elapsed, texts
+            same = "一致" if texts == expected else "结果不一致"
+            print(f"  {backend:<11} {elapsed:8.2f} ms  x{baseline / elapsed:5.1f}  {len(texts)} 条 {same}")
+
+
+if __name__ == "__main__":
+    main()
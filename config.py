@@ -19,7 +19,19 @@ DEEPSEEK_MODEL = "deepseek-ai/DeepSeek-V3"
 OPENAI_MODEL = "deepseek-ai/DeepSeek-V3"
 
 MAX_REFLECTIONS = 2
+# REFLECTION_QUERIES = 3  # 每轮反思并发执行的互补查询数，默认 1
 SEARCH_RESULTS_PER_QUERY = 3
 SEARCH_CONTENT_MAX_LENGTH = 20000
 OUTPUT_DIR = "reports"
+# RESEARCH_TIMEOUT = 900  # 单次研究最长运行秒数，超时返回部分报告
+# SPECULATIVE_SEARCH = True  # 写当前段落时后台提前搜索下一段落
 # SAVE_INTERMEDIATE_STATES = True
+# SEARCH_INDEX_PATH = "cache/search_index.db"  # 话题与报告全文索引，设为 None 关闭
+# OUTLINE_CACHE_PATH = "cache/outline_cache.db"  # 报告结构缓存，默认关闭（每次都重新生成结构）
+# OUTLINE_MIN_SIMILARITY = 0.7  # 复用同类别历史结构所需的最低查询相似度
+# RETRIEVAL_MAX_REPORTS = 2  # 研究前检索的相近历史报告数，0 表示不检索
+# SEARCH_CACHE_TTL = 3600  # 相近查询的搜索结果复用有效期（秒），None 表示不复用
+# SOURCE_NOTE_MIN_LENGTH = 2000  # 超过该长度的搜索正文先压缩为笔记再总结，None 表示直接截断
+# HOT_TOPICS_REFRESH_INTERVAL = 300  # 热榜后台刷新间隔（秒）
+# HOT_TOPICS_PLATFORMS = ["baidu", "bilibili", "weibo", "toutiao"]  # 启用的热榜平台，默认百度与 B站；知乎需登录 Cookie、抖音需签名参数
+# HOT_TOPICS_PLATFORM_INTERVALS = {"bilibili": 600}  # 按平台覆盖刷新间隔
@@ -7,11 +7,15 @@ import json
 import os
 from datetime import datetime
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Generator, Union
 
 from .llms import OpenAILLM, BaseLLM
-from .graph import create_research_graph, AgentState
+from .graph import create_research_graph, create_refresh_graph, AgentState, apply_state_update
 from .utils import Config, load_config
+from .utils.cancellation import CancellationToken, ResearchCancelled
+from .utils.speculation import Speculator
+from .events import build_progress_event
+from .storage import ContentStore, SearchIndex, OutlineCache
 
 
 class DeepSearchAgent:
@@ -32,10 +36,22 @@ class DeepSearchAgent:
 
         # 创建LangGraph图
         self.graph = create_research_graph()
+        self.refresh_graph = create_refresh_graph()
+
+        # 搜索正文侧存储，图状态中只保留内容 ID
+        self.content_store = ContentStore(self.config.content_store_path) if self.config.content_store_path else None
+
+        # 报告结构缓存，相近查询复用已生成的结构
+        self.outline_cache = OutlineCache(self.config.outline_cache_path) if self.config.outline_cache_path else None
 
         # 确保输出目录存在
         os.makedirs(self.config.output_dir, exist_ok=True)
 
+        # 话题与报告全文索引，补建输出目录中尚未索引的历史报告
+        self.search_index = SearchIndex(self.config.search_index_path) if self.config.search_index_path else None
+        if self.search_index:
+            self.search_index.sync_reports(self.config.output_dir)
+
         print(f"Deep Search Agent 已初始化 (LangGraph版本)")
         print(f"使用LLM: {self.llm_client.get_model_info()}")
 
@@ -61,7 +77,11 @@ class DeepSearchAgent:
         save_report: bool = True,
         hot_topic_info: Optional[Dict[str, Any]] = None, 
         *,
-        stream_config: Optional[Dict[str, Any]] = None
+        stream_config: Optional[Dict[str, Any]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        timeout: Optional[float] = None,
+        include_state: bool = False,
+        fresh_outline: bool = False
     ) -> Generator[Dict[str, Any], None, None]:
         """
         执行深度研究，以生成器方式实时返回节点进度与最终报告。
@@ -70,30 +90,105 @@ class DeepSearchAgent:
             query: 研究问题
             save_report: 是否保存报告
             stream_config: 透传给 graph.stream 的额外配置（如 debug、recursion_limit）
+            cancel_token: 外部持有的取消令牌，调用 cancel() 即可中止运行
+            timeout: 最长运行秒数，默认使用 config.research_timeout
+            include_state: 是否在进度事件中附带完整节点输出（默认关闭，仅调试时使用）
+            fresh_outline: 不复用结构缓存，强制重新生成报告结构
 
         Yields:
-            {"node": 节点名, "state": 当前状态快照}
-            最后一条为 {"node": "completed", "report": 最终报告}
+            节点进度为精简的 ProgressEvent：{"node", "paragraph_index", "total_paragraphs",
+            "reflection_count", "search_count", "elapsed", "node_time", "delta"}
+            段落定稿时为 {"node": "paragraph_completed", "paragraph_index", "title", "summary", "sources"}
+            最后一条为 {"node": "completed", "report": 最终报告, "report_path": 报告文件路径}；
+            被取消或超时则为 {"node": "cancelled", "report": 部分报告, "reason": 原因}
         """
-        start_time = time.time()
         print(f"\n{'='*60}\n开始深度研究: {query}\n{'='*60}")
 
-        try:
-            # 1. 初始状态
-            initial_state: AgentState = {
-                "query": query,
-                "hot_topic_info": hot_topic_info,  # 传递完整的 HotTopic 信息
-                "report_title": "",
-                "paragraphs": [],
-                "current_paragraph_index": 0,
-                "reflection_count": 0,
-                "max_reflections": self.config.max_reflections,
-                "final_report": None,
-                "completed": False,
-            }
+        # 1. 初始状态
+        initial_state: AgentState = {
+            "query": query,
+            "hot_topic_info": hot_topic_info,  # 传递完整的 HotTopic 信息
+            "prior_reports": [],
+            "report_title": "",
+            "paragraphs": [],
+            "current_paragraph_index": 0,
+            "reflection_count": 0,
+            "max_reflections": self.config.max_reflections,
+            "changed_paragraphs": [],
+            "final_report": None,
+            "completed": False,
+        }
+
+        print(f"🤖 [DEBUG] Agent接收到热点信息: {hot_topic_info}")  
+
+        yield from self._run_graph(
+            self.graph, initial_state, save_report,
+            stream_config=stream_config, cancel_token=cancel_token,
+            timeout=timeout, include_state=include_state, fresh_outline=fresh_outline
+        )
+
+    def refresh(
+        self,
+        previous: Union[str, Dict[str, Any]],
+        save_report: bool = True,
+        *,
+        stream_config: Optional[Dict[str, Any]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        timeout: Optional[float] = None,
+        include_state: bool = False
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        刷新已有报告：重新执行上次研究的全部搜索，只对出现新来源（新 URL 或内容哈希变化）的段落
+        重新总结，再重新格式化；没有段落变化时直接返回上次的报告，不调用 LLM。
+
+        Args:
+            previous: 上次运行的最终状态，或其状态文件 / 报告文件路径（报告旁的 .state.json）
+            save_report: 是否保存刷新后的报告（没有变化时不保存）
+            其余参数同 research
+
+        Yields:
+            同 research；最终事件额外包含 "changed_paragraphs"（重新总结的段落索引）
+        """
+        state = self.load_run_state(previous) if isinstance(previous, str) else previous
+        query = state["query"]
+        print(f"\n{'='*60}\n刷新报告: {query}\n{'='*60}")
+
+        initial_state: AgentState = {
+            **state,
+            "max_reflections": self.config.max_reflections,
+            "changed_paragraphs": [],
+            "completed": False,
+        }
+        yield from self._run_graph(
+            self.refresh_graph, initial_state, save_report,
+            stream_config=stream_config, cancel_token=cancel_token,
+            timeout=timeout, include_state=include_state
+        )
+
+    def _run_graph(
+        self,
+        graph,
+        initial_state: AgentState,
+        save_report: bool,
+        *,
+        stream_config: Optional[Dict[str, Any]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        timeout: Optional[float] = None,
+        include_state: bool = False,
+        fresh_outline: bool = False
+    ) -> Generator[Dict[str, Any], None, None]:
+        """流式执行研究图或刷新图，产出进度事件与最终事件（参数含义同 research）"""
+        start_time = time.time()
+        query = initial_state["query"]
 
-            print(f"🤖 [DEBUG] Agent接收到热点信息: {hot_topic_info}")  
+        if cancel_token is None:
+            cancel_token = CancellationToken(timeout or self.config.research_timeout)
 
+        # 下一段落的初始搜索在当前段落运行期间后台执行
+        speculator = Speculator() if self.config.speculative_search else None
+
+        current_state: Dict[str, Any] = {}
+        try:
             # 2. 默认配置 & 支持外部透传
             config = {
                 "configurable": {
@@ -103,6 +198,18 @@ class DeepSearchAgent:
                     "search_timeout": self.config.search_timeout,
                     "max_content_length": self.config.max_content_length,
                     "max_reflections": self.config.max_reflections,
+                    "reflection_queries": self.config.reflection_queries,
+                    "cancel_token": cancel_token,
+                    "speculator": speculator,
+                    "content_store": self.content_store,
+                    "search_index": self.search_index,
+                    "retrieval_max_reports": self.config.retrieval_max_reports,
+                    "retrieval_max_age": self.config.retrieval_max_age,
+                    "search_cache_ttl": self.config.search_cache_ttl,
+                    "outline_cache": self.outline_cache,
+                    "outline_min_similarity": self.config.outline_min_similarity,
+                    "fresh_outline": fresh_outline,
+                    "source_note_min_length": self.config.source_note_min_length,
                 },
                 "recursion_limit": 100,          # 防死循环兜底
                 "debug": False,                  # 默认关闭调试日志
@@ -112,39 +219,195 @@ class DeepSearchAgent:
 
             # 3. 流式执行
             print("\n执行研究工作流...")
-            final_state = None
-            for chunk in self.graph.stream(initial_state, config):
+            current_state = dict(initial_state)
+            # 刷新时已定稿的段落不再重复推送
+            emitted_paragraphs = {
+                index for index, paragraph in enumerate(initial_state.get("paragraphs") or [])
+                if paragraph.get("completed")
+            }
+            step_start = time.time()
+            for chunk in graph.stream(initial_state, config):
                 node_name = next(iter(chunk))   # 更安全地取键
                 node_output = chunk[node_name]
-                final_state = node_output
-
-                yield {"node": node_name, "state": node_output}
+                current_state = apply_state_update(current_state, node_output)
+
+                now = time.time()
+                event = build_progress_event(
+                    node_name, current_state,
+                    elapsed=now - start_time,
+                    node_time=now - step_start
+                )
+                if include_state:
+                    event["state"] = node_output
+                yield event
+
+                # 段落一旦定稿立即推送，无需等待最终格式化
+                for index, paragraph in enumerate(current_state.get("paragraphs") or []):
+                    if paragraph.get("completed") and index not in emitted_paragraphs:
+                        emitted_paragraphs.add(index)
+                        yield self._paragraph_event(index, paragraph)
+                    elif not paragraph.get("completed"):
+                        emitted_paragraphs.discard(index)
+
+                step_start = time.time()
 
             # 4. 后处理
-            if not final_state:
-                raise RuntimeError("工作流未产生任何状态")
-
-            final_report = final_state.get("final_report")
+            final_report = current_state.get("final_report")
             if not final_report:
                 raise RuntimeError("最终报告为空，可能图未正确填充 final_report 字段")
 
-            if save_report:
-                self._save_report(final_report, query)
+            changed = current_state.get("changed_paragraphs")
+            unchanged_refresh = graph is self.refresh_graph and not changed
+            report_path = None
+            state_path = None
+            if save_report and not unchanged_refresh:
+                report_path = self._save_report(final_report, query)
+                state_path = self._save_state(current_state, report_path)
 
             end_time = time.time()
             run_time = end_time - start_time
             print("\n深度研究完成！")
             print(f"总用时: {run_time:.2f} 秒")
-            yield {"node": "completed", "report": final_report, "run_time": run_time}
+            final_event = {"node": "completed", "report": final_report, "run_time": run_time,
+                           "report_path": report_path, "state_path": state_path}
+            if graph is self.refresh_graph:
+                final_event["changed_paragraphs"] = changed or []
+            yield final_event
+
+        except ResearchCancelled as e:
+            # 截止时间已到或被取消：用已完成的段落总结拼出部分报告
+            partial_report = self._build_partial_report(current_state, query)
+            report_path = self._save_report(partial_report, query) if save_report else None
+
+            run_time = time.time() - start_time
+            print(f"\n研究已中止 ({e.reason})，已生成部分报告")
+            yield {
+                "node": "cancelled",
+                "report": partial_report,
+                "run_time": run_time,
+                "reason": e.reason,
+                "report_path": report_path,
+            }
+
+        except GeneratorExit:
+            # 调用方关闭生成器：通知仍在进行中的调用尽快退出
+            cancel_token.cancel("generator closed")
+            raise
 
         except Exception as e:
             print(f"[research] 研究过程中发生错误: {e}")
             raise
 
-        
+        finally:
+            # 令牌只属于本次运行：无论以何种方式结束都取消，中断仍在进行的推测搜索等后台请求
+            cancel_token.cancel("run ended")
+            if speculator is not None:
+                speculator.shutdown()
 
-    def _save_report(self, report_content: str, query: str):
-        """保存报告到文件"""
+    def _paragraph_event(self, index: int, paragraph: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        构造段落完成事件
+
+        Args:
+            index: 段落索引
+            paragraph: 已定稿的段落状态
+
+        Returns:
+            {"node": "paragraph_completed", ...} 事件
+        """
+        sources = []
+        seen_urls = set()
+        for record in paragraph.get("search_history", []):
+            for result in record.get("results", []):
+                url = result.get("url")
+                if url and url not in seen_urls:
+                    seen_urls.add(url)
+                    sources.append({"title": result.get("title", ""), "url": url})
+
+        return {
+            "node": "paragraph_completed",
+            "paragraph_index": index,
+            "title": paragraph["title"],
+            "summary": paragraph["latest_summary"],
+            "sources": sources,
+        }
+
+    def _build_partial_report(self, state: Dict[str, Any], query: str) -> str:
+        """
+        根据当前状态中已有的段落总结拼接部分报告，不再调用 LLM
+
+        Args:
+            state: 中止时的累计状态
+            query: 研究问题
+
+        Returns:
+            Markdown 格式的部分报告
+        """
+        title = state.get("report_title") or query
+        lines = [f"# {title}", "", "> ⚠️ 研究在完成前被中止，以下为已完成部分的内容。", ""]
+
+        finished = 0
+        for paragraph in state.get("paragraphs") or []:
+            lines.append(f"## {paragraph['title']}")
+            lines.append("")
+            if paragraph.get("latest_summary"):
+                lines.append(paragraph["latest_summary"])
+                finished += 1
+            else:
+                lines.append("（本段尚未完成）")
+            lines.append("")
+
+        if finished == 0:
+            lines.append("（尚无已完成的段落）")
+
+        return "\n".join(lines).rstrip() + "\n"
+
+
+    def run(self, query: str, save_report: bool = True,
+            hot_topic_info: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+        """
+        同步执行研究，消费全部进度事件后返回最终事件（供批处理等非交互场景使用）
+
+        Args:
+            query: 研究问题
+            save_report: 是否保存报告
+            hot_topic_info: 热点话题信息
+            **kwargs: 透传给 research 的关键字参数
+
+        Returns:
+            {"node": "completed" | "cancelled", "report", "run_time", "report_path", ...}
+        """
+        final_event = None
+        for event in self.research(query, save_report=save_report, hot_topic_info=hot_topic_info, **kwargs):
+            if event["node"] in ("completed", "cancelled"):
+                final_event = event
+        if final_event is None:
+            raise RuntimeError("研究未产生最终结果")
+        return final_event
+
+    def run_refresh(self, previous: Union[str, Dict[str, Any]], save_report: bool = True,
+                    **kwargs) -> Dict[str, Any]:
+        """
+        同步刷新已有报告，消费全部进度事件后返回最终事件
+
+        Args:
+            previous: 上次运行的最终状态，或其状态文件 / 报告文件路径
+            save_report: 是否保存刷新后的报告
+            **kwargs: 透传给 refresh 的关键字参数
+
+        Returns:
+            {"node": "completed" | "cancelled", "report", "run_time", "report_path", "changed_paragraphs", ...}
+        """
+        final_event = None
+        for event in self.refresh(previous, save_report=save_report, **kwargs):
+            if event["node"] in ("completed", "cancelled"):
+                final_event = event
+        if final_event is None:
+            raise RuntimeError("刷新未产生最终结果")
+        return final_event
+
+    def _save_report(self, report_content: str, query: str) -> str:
+        """保存报告到文件，返回文件路径"""
         # 生成文件名
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         query_safe = "".join(c for c in query if c.isalnum() or c in (' ', '-', '_')).rstrip()
@@ -159,6 +422,42 @@ class DeepSearchAgent:
 
         print(f"报告已保存到: {filepath}")
 
+        if self.search_index:
+            try:
+                self.search_index.index_report(filepath, query, report_content)
+            except Exception as e:
+                print(f"报告索引失败: {e}")
+        return filepath
+
+    def _save_state(self, state: Dict[str, Any], report_path: str) -> Optional[str]:
+        """把最终状态保存到报告旁的 .state.json，供之后增量刷新；失败不影响报告"""
+        state_path = os.path.splitext(report_path)[0] + ".state.json"
+        try:
+            with open(state_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False, default=str)
+        except Exception as e:
+            print(f"状态保存失败: {e}")
+            return None
+        return state_path
+
+    @staticmethod
+    def load_run_state(path: str) -> Dict[str, Any]:
+        """
+        读取保存的运行状态
+
+        Args:
+            path: .state.json 文件路径，或对应的报告 .md 路径
+
+        Returns:
+            状态字典
+        """
+        if not path.endswith(".state.json"):
+            path = os.path.splitext(path)[0] + ".state.json"
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"找不到运行状态文件: {path}（只有保存过状态的报告才能刷新）")
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
     def get_progress_summary(self) -> Dict[str, Any]:
         """获取进度摘要 - LangGraph版本暂不支持"""
         return {
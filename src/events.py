@@ -0,0 +1,109 @@
+"""
+研究进度事件定义
+DeepSearchAgent.research 产出的精简事件结构，默认不携带完整状态
+"""
+
+from typing import Any, Dict, List, Optional, TypedDict
+
+
+class ProgressEvent(TypedDict, total=False):
+    """节点进度事件"""
+    node: str                       # 节点名
+    paragraph_index: int            # 当前段落索引
+    total_paragraphs: int           # 段落总数
+    reflection_count: int           # 当前段落已完成的反思次数
+    search_count: int               # 本次运行累计搜索次数
+    elapsed: float                  # 运行已用时间（秒）
+    node_time: float                # 本节点耗时（秒）
+    delta: Dict[str, Any]           # 本节点产生的少量增量信息
+    state: Dict[str, Any]           # 完整节点输出，仅在 include_state=True 时提供
+
+
+class ParagraphCompletedEvent(TypedDict):
+    """段落定稿事件"""
+    node: str
+    paragraph_index: int
+    title: str
+    summary: str
+    sources: List[Dict[str, str]]
+
+
+def build_node_delta(node: str, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    提取节点执行后的增量信息，只包含界面展示所需的少量字段
+
+    Args:
+        node: 节点名
+        state: 节点执行后的累计状态
+
+    Returns:
+        增量信息字典，没有可展示内容时返回 None
+    """
+    paragraphs = state.get("paragraphs") or []
+
+    if node == "retrieve":
+        return {"prior_reports": [report["title"] for report in state.get("prior_reports") or []]}
+
+    if node == "structure":
+        return {
+            "report_title": state.get("report_title", ""),
+            "paragraph_titles": [p["title"] for p in paragraphs],
+        }
+
+    if node in ("refresh_search", "refresh_summary"):
+        return {"changed_paragraphs": list(state.get("changed_paragraphs") or [])}
+
+    if node == "format":
+        return {"report_chars": len(state.get("final_report") or "")}
+
+    index = state.get("current_paragraph_index", 0)
+    if not 0 <= index < len(paragraphs):
+        return None
+    paragraph = paragraphs[index]
+
+    if node in ("search", "reflect") and paragraph["search_history"]:
+        # 多查询反思的同一轮记录时间戳相同，合并展示
+        timestamp = paragraph["search_history"][-1]["timestamp"]
+        latest = [record for record in paragraph["search_history"] if record["timestamp"] == timestamp]
+        return {
+            "search_query": "；".join(record["query"] for record in latest),
+            "result_count": sum(len(record["results"]) for record in latest),
+        }
+
+    if node in ("summary", "reflect_summary"):
+        return {"summary_chars": len(paragraph.get("latest_summary") or "")}
+
+    return None
+
+
+def build_progress_event(node: str, state: Dict[str, Any], elapsed: float,
+                         node_time: float) -> ProgressEvent:
+    """
+    根据累计状态构造精简进度事件
+
+    Args:
+        node: 节点名
+        state: 节点执行后的累计状态
+        elapsed: 运行已用时间（秒）
+        node_time: 本节点耗时（秒）
+
+    Returns:
+        ProgressEvent
+    """
+    paragraphs = state.get("paragraphs") or []
+    index = state.get("current_paragraph_index", 0)
+
+    event = ProgressEvent(
+        node=node,
+        paragraph_index=index,
+        total_paragraphs=len(paragraphs),
+        reflection_count=paragraphs[index]["reflection_count"] if 0 <= index < len(paragraphs) else 0,
+        search_count=sum(len(p["search_history"]) for p in paragraphs),
+        elapsed=round(elapsed, 3),
+        node_time=round(node_time, 3),
+    )
+
+    delta = build_node_delta(node, state)
+    if delta:
+        event["delta"] = delta
+    return event
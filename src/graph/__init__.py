@@ -1,8 +1,12 @@
-from .state import AgentState, ParagraphState
-from .graph_builder import create_research_graph
+from .state import AgentState, ParagraphState, ParagraphUpdate, merge_paragraphs, apply_state_update
+from .graph_builder import create_research_graph, create_refresh_graph
 
 __all__ = [
     "AgentState",
     "ParagraphState",
-    "create_research_graph"
+    "ParagraphUpdate",
+    "merge_paragraphs",
+    "apply_state_update",
+    "create_research_graph",
+    "create_refresh_graph"
 ]
\ No newline at end of file
@@ -6,12 +6,15 @@ from typing import Any, Dict, Literal
 from langgraph.graph import StateGraph, END
 from .state import AgentState
 from .nodes import (
+    retrieve_context,
     generate_structure,
     initial_search,
     initial_summary,
     reflection_search,
     reflection_summary,
-    format_report
+    format_report,
+    refresh_search,
+    refresh_summary
 )
 
 
@@ -51,11 +54,12 @@ def check_reflection_complete(state: AgentState) -> Literal["continue", "done"]:
     return "done"
 
 
-def move_to_next_paragraph(state: AgentState) -> AgentState:
+def move_to_next_paragraph(state: AgentState) -> Dict[str, Any]:
     """移动到下一段落"""
-    state["current_paragraph_index"] += 1
-    state["reflection_count"] = 0
-    return state
+    return {
+        "current_paragraph_index": state["current_paragraph_index"] + 1,
+        "reflection_count": 0
+    }
 
 
 
@@ -78,6 +82,7 @@ def create_research_graph(config=None):
     workflow = StateGraph(AgentState)
 
     # 添加节点
+    workflow.add_node("retrieve", retrieve_context)
     workflow.add_node("structure", generate_structure)
     workflow.add_node("search", initial_search)
     workflow.add_node("summary", initial_summary)
@@ -87,9 +92,10 @@ def create_research_graph(config=None):
     workflow.add_node("format", format_report)
 
     # 设置入口点
-    workflow.set_entry_point("structure")
+    workflow.set_entry_point("retrieve")
 
     # 定义边
+    workflow.add_edge("retrieve", "structure")
     workflow.add_edge("structure", "search")
     workflow.add_edge("search", "summary")
 
@@ -106,7 +112,16 @@ def create_research_graph(config=None):
 
     # 反思循环
     workflow.add_edge("reflect", "reflect_summary")
-    workflow.add_edge("reflect_summary", "summary") 
+    # 反思总结已整合本轮全部搜索结果，直接决定继续反思还是进入下一段落，不再回到 summary 重新总结
+    workflow.add_conditional_edges(
+        "reflect_summary",
+        should_reflect,
+        {
+            "reflect": "reflect",
+            "next_paragraph": "next_paragraph",
+            "format": "format"
+        }
+    )
     # workflow.add_conditional_edges(
     #     "reflect_summary",
     #     check_reflection_complete,
@@ -123,4 +138,38 @@ def create_research_graph(config=None):
     workflow.add_edge("format", END)
 
     # 编译图
-    return workflow.compile()
\ No newline at end of file
+    return workflow.compile()
+
+
+def has_changed_paragraphs(state: AgentState) -> Literal["summary", "done"]:
+    """刷新搜索后是否有段落需要重新总结"""
+    return "summary" if state.get("changed_paragraphs") else "done"
+
+
+def create_refresh_graph():
+    """
+    创建报告刷新工作流:重新执行上次的全部搜索,只重新总结有新结果的段落,再重新格式化;
+    没有段落变化时直接结束,保留上次的报告
+
+    Returns:
+        编译后的 LangGraph 图对象
+    """
+    workflow = StateGraph(AgentState)
+
+    workflow.add_node("refresh_search", refresh_search)
+    workflow.add_node("refresh_summary", refresh_summary)
+    workflow.add_node("format", format_report)
+
+    workflow.set_entry_point("refresh_search")
+    workflow.add_conditional_edges(
+        "refresh_search",
+        has_changed_paragraphs,
+        {
+            "summary": "refresh_summary",
+            "done": END
+        }
+    )
+    workflow.add_edge("refresh_summary", "format")
+    workflow.add_edge("format", END)
+
+    return workflow.compile()
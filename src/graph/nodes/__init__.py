@@ -2,17 +2,22 @@
 LangGraph 节点函数模块
 导出所有节点函数供图构建器使用
 """
+from .retrieval_node import retrieve_context
 from .structure_node import generate_structure
 from .search_node import initial_search
 from .summary_node import initial_summary
 from .reflection_node import reflection_search, reflection_summary
 from .formatting_node import format_report
+from .refresh_node import refresh_search, refresh_summary
 
 __all__ = [
+    "retrieve_context",
     "generate_structure",
     "initial_search",
     "initial_summary",
     "reflection_search",
     "reflection_summary",
-    "format_report"
+    "format_report",
+    "refresh_search",
+    "refresh_summary"
 ]
\ No newline at end of file
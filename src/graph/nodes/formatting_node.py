@@ -5,10 +5,13 @@
 from typing import Dict, Any
 from ..state import AgentState
 from langgraph.types import RunnableConfig
+from ...utils.cancellation import check_cancelled, get_cancel_token
 
 def format_report(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
     
+    check_cancelled(config)
     llm_client = config["configurable"]["llm_client"]
+    cancel_token = get_cancel_token(config)
 
     from ...prompts.prompts import SYSTEM_PROMPT_REPORT_FORMATTING
     from ...utils.text_processing import remove_reasoning_from_output, clean_markdown_tags
@@ -32,7 +35,7 @@ def format_report(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
     ]
 
     # 不需要 JSON Schema,直接返回 Markdown 文本
-    response = llm_client.chat(messages)
+    response = llm_client.chat(messages, cancel_token=cancel_token)
 
     # 如果 response 是字典,提取内容
     if isinstance(response, dict):
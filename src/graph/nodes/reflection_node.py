@@ -2,23 +2,29 @@
 反思节点
 负责反思搜索和更新总结
 """
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 from datetime import datetime
 from ..state import AgentState, SearchRecord
 from langgraph.types import RunnableConfig
+from ...utils.cancellation import check_cancelled, get_cancel_token
+from .source_notes import format_source_notes
+from .retrieval_node import run_search
 import json
 
 def reflection_search(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
 
+    check_cancelled(config)
     llm_client = config["configurable"]["llm_client"]
+    cancel_token = get_cancel_token(config)
 
-    from ...tools.search import tavily_search
-    from ...prompts.prompts import SYSTEM_PROMPT_REFLECTION
+    from ...prompts.prompts import SYSTEM_PROMPT_REFLECTION, SYSTEM_PROMPT_REFLECTION_MULTI
 
     current_idx = state["current_paragraph_index"]
     current_paragraph = state["paragraphs"][current_idx]
     hot_topic_info = state.get("hot_topic_info", {})
-
+    # 一次反思提出的互补查询数，大于 1 时查询并发执行
+    num_queries = max(1, config["configurable"].get("reflection_queries", 1))
 
     user_content1 = (
         f"\n\n查询主题: {state['query']}\n"
@@ -26,55 +32,69 @@ def reflection_search(state: AgentState, config: RunnableConfig) -> Dict[str, An
         f"段落标题: {current_paragraph['title']}\n"
         f"段落内容: {current_paragraph['content']}\n"
         f"当前总结: {current_paragraph['latest_summary']}\n"
-        + SYSTEM_PROMPT_REFLECTION)
+        + (f"查询数量: {num_queries}\n" + SYSTEM_PROMPT_REFLECTION_MULTI if num_queries > 1
+           else SYSTEM_PROMPT_REFLECTION))
     # 生成反思查询
     messages = [
         {"role": "system", "content": "你是一个批判性思维专家,擅长发现知识盲点。"},
         {"role": "user", "content": user_content1}
     ]
 
-    json_schema = {
-        "type": "object",
-        "properties": {
-            "search_query": {"type": "string"},
-            "reasoning": {"type": "string"}
-        },
-        "required": ["search_query", "reasoning"]
-    }
-
-    response = llm_client.chat(messages, json_schema=json_schema)
-    search_query = response["search_query"]
-
-    # 执行搜索
-    search_results = tavily_search(
-        search_query,
-        max_results=config["configurable"].get("max_search_results", 3),
-        timeout=config["configurable"].get("search_timeout", 30),
-        api_key=config["configurable"]["tavily_api_key"]
-    )
-
-    # 记录搜索
-    search_record = SearchRecord(
-        query=search_query,
-        results=search_results or [],
-        timestamp=datetime.now().isoformat()
-    )
-
-    # 更新状态
-    updated_paragraphs = state["paragraphs"].copy()
-    updated_paragraphs[current_idx]["search_history"].append(search_record)
-    updated_paragraphs[current_idx]["reflection_count"] += 1
+    if num_queries > 1:
+        json_schema = {
+            "type": "object",
+            "properties": {
+                "search_queries": {"type": "array", "items": {"type": "string"}},
+                "reasoning": {"type": "string"}
+            },
+            "required": ["search_queries", "reasoning"]
+        }
+        response = llm_client.chat(messages, json_schema=json_schema, cancel_token=cancel_token)
+        search_queries = list(dict.fromkeys(
+            query.strip() for query in response["search_queries"] if query and query.strip()
+        ))[:num_queries] or [f"{state['query']} {current_paragraph['title']}"]
+    else:
+        json_schema = {
+            "type": "object",
+            "properties": {
+                "search_query": {"type": "string"},
+                "reasoning": {"type": "string"}
+            },
+            "required": ["search_query", "reasoning"]
+        }
+        response = llm_client.chat(messages, json_schema=json_schema, cancel_token=cancel_token)
+        search_queries = [response["search_query"]]
+
+    # 执行搜索(有效期内相近查询的结果直接复用)，多个查询并发执行
+    if len(search_queries) > 1:
+        with ThreadPoolExecutor(max_workers=len(search_queries), thread_name_prefix="reflect-search") as executor:
+            all_results = list(executor.map(lambda query: run_search(query, config), search_queries))
+    else:
+        all_results = [run_search(query, config) for query in search_queries]
+
+    # 记录搜索；同一轮的记录使用相同时间戳，反思总结据此一次整合本轮全部结果
+    timestamp = datetime.now().isoformat()
+    search_records = [
+        SearchRecord(query=query, results=results, timestamp=timestamp)
+        for query, results in zip(search_queries, all_results)
+    ]
 
+    # 追加搜索记录并累加反思次数
     return {
-        "paragraphs": updated_paragraphs
+        "paragraphs": {
+            current_idx: {
+                "search_history": search_records,
+                "reflection_count": current_paragraph["reflection_count"] + 1
+            }
+        }
     }
-    # return state
 
 def reflection_summary(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
 
+    check_cancelled(config)
     llm_client = config["configurable"]["llm_client"]
+    cancel_token = get_cancel_token(config)
 
-    from ...utils.text_processing import format_search_results_for_prompt
     from ...prompts.prompts import SYSTEM_PROMPT_REFLECTION_SUMMARY
 
     current_idx = state["current_paragraph_index"]
@@ -84,20 +104,21 @@ def reflection_summary(state: AgentState, config: RunnableConfig) -> Dict[str, A
     if not current_paragraph["search_history"]:
         return {}
 
-    latest_search = current_paragraph["search_history"][-1]
+    # 本轮反思的全部搜索记录（同一轮的记录时间戳相同）
+    timestamp = current_paragraph["search_history"][-1]["timestamp"]
+    latest_searches = [record for record in current_paragraph["search_history"] if record["timestamp"] == timestamp]
 
-    # 格式化搜索结果
-    formatted_results = format_search_results_for_prompt(
-        latest_search["results"],
-        max_length=config["configurable"].get("max_content_length", 20000)
-    )
+    # 长正文先压缩为来源笔记（按内容哈希缓存），不再截断后直接放入提示词
+    # 多个查询可能返回同一来源，按 URL 去重
+    results = {result.get("url") or id(result): result for record in latest_searches for result in record["results"]}
+    formatted_results = format_source_notes(list(results.values()), config)
 
     # 生成更新后的总结
     user_content2 = (
         f"\n\n查询主题: {state['query']}\n"
         f"段落标题: {current_paragraph['title']}\n"
         f"段落内容: {current_paragraph['content']}\n"
-        f"搜索查询: {latest_search['query']}\n"
+        f"搜索查询: {'；'.join(record['query'] for record in latest_searches)}\n"
         f"搜索结果: {formatted_results}\n"
         f"当前总结: {current_paragraph['latest_summary']}"
         + SYSTEM_PROMPT_REFLECTION_SUMMARY)
@@ -116,15 +137,16 @@ def reflection_summary(state: AgentState, config: RunnableConfig) -> Dict[str, A
         "required": ["summary"]
     }
 
-    response = llm_client.chat(messages, json_schema=json_schema)
+    response = llm_client.chat(messages, json_schema=json_schema, cancel_token=cancel_token)
     updated_summary = response["summary"]
 
     # 更新段落
-    updated_paragraphs = state["paragraphs"].copy()
-    updated_paragraphs[current_idx]["content"] = updated_summary
-    updated_paragraphs[current_idx]["latest_summary"] = updated_summary
-
     return {
-        "paragraphs": updated_paragraphs
-    }
-    # return state
\ No newline at end of file
+        "paragraphs": {
+            current_idx: {
+                "content": updated_summary,
+                "latest_summary": updated_summary,
+                "completed": current_paragraph["reflection_count"] >= state["max_reflections"]
+            }
+        }
+    }
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+报告刷新节点
+重新执行上次研究的全部搜索，只对出现新来源或来源内容变化的段落重新总结
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+from ..state import AgentState, SearchRecord
+from langgraph.types import RunnableConfig
+from ...utils.cancellation import check_cancelled, get_cancel_token
+from ...storage.content_store import ContentStore
+from .source_notes import format_source_notes
+from .retrieval_node import run_search
+
+
+def result_fingerprint(result: Dict[str, Any]) -> Tuple[str, str]:
+    """搜索结果的 (URL, 内容哈希)，内容 ID 即正文的 sha256，两种状态表示得到相同的指纹"""
+    content_hash = result.get("content_id") or ContentStore.content_id(result.get("content") or "")
+    return result.get("url", ""), content_hash
+
+
+def refresh_search(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+
+    check_cancelled(config)
+    paragraphs = state["paragraphs"]
+
+    # 上次研究的全部查询去重后并发重新搜索，不复用搜索缓存
+    queries = list(dict.fromkeys(
+        record["query"] for paragraph in paragraphs for record in paragraph["search_history"]
+    ))
+    if not queries:
+        return {"changed_paragraphs": []}
+    max_workers = min(len(queries), config["configurable"].get("refresh_max_workers", 4))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="refresh-search") as executor:
+        fresh = dict(zip(queries, executor.map(lambda query: run_search(query, config, use_cache=False), queries)))
+    check_cancelled(config)
+
+    # 段落内未见过的 URL，或同一 URL 的内容哈希变化，视为新结果
+    timestamp = datetime.now().isoformat()
+    updates: Dict[int, Dict[str, Any]] = {}
+    changed: List[int] = []
+    for index, paragraph in enumerate(paragraphs):
+        known = {result_fingerprint(result) for record in paragraph["search_history"] for result in record["results"]}
+        records = []
+        for query in dict.fromkeys(record["query"] for record in paragraph["search_history"]):
+            new_results = [result for result in fresh[query] if result_fingerprint(result) not in known]
+            if new_results:
+                records.append(SearchRecord(query=query, results=new_results, timestamp=timestamp))
+        if records:
+            updates[index] = {"search_history": records, "completed": False}
+            changed.append(index)
+
+    print(f"刷新搜索完成: {len(queries)} 个查询，{len(changed)}/{len(paragraphs)} 个段落有新结果")
+    return {"paragraphs": updates, "changed_paragraphs": changed}
+
+
+def refresh_summary(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+
+    check_cancelled(config)
+    llm_client = config["configurable"]["llm_client"]
+    cancel_token = get_cancel_token(config)
+
+    from ...prompts.prompts import SYSTEM_PROMPT_REFRESH_SUMMARY
+
+    json_schema = {
+        "type": "object",
+        "properties": {
+            "summary": {"type": "string"}
+        },
+        "required": ["summary"]
+    }
+
+    def summarize(index: int) -> str:
+        paragraph = state["paragraphs"][index]
+        # refresh_search 追加的记录带有相同的时间戳
+        timestamp = paragraph["search_history"][-1]["timestamp"]
+        records = [record for record in paragraph["search_history"] if record["timestamp"] == timestamp]
+        new_results = [result for record in records for result in record["results"]]
+        formatted_results = format_source_notes(new_results, config)
+        user_content = (
+            f"\n\n查询主题: {state['query']}\n"
+            f"段落标题: {paragraph['title']}\n"
+            f"搜索查询: {'；'.join(record['query'] for record in records)}\n"
+            f"新的搜索结果: {formatted_results}\n"
+            f"当前总结: {paragraph['latest_summary']}"
+            + SYSTEM_PROMPT_REFRESH_SUMMARY)
+        messages = [
+            {"role": "system", "content": "你是一个专业的内容总结专家。"},
+            {"role": "user", "content": user_content}
+        ]
+        return llm_client.chat(messages, json_schema=json_schema, cancel_token=cancel_token)["summary"]
+
+    # 各段落互不依赖，并发更新
+    changed = state.get("changed_paragraphs") or []
+    max_workers = max(1, min(len(changed), config["configurable"].get("refresh_max_workers", 4)))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="refresh-summary") as executor:
+        summaries = list(executor.map(summarize, changed))
+
+    return {
+        "paragraphs": {
+            index: {
+                "content": summary,
+                "latest_summary": summary,
+                "completed": True
+            }
+            for index, summary in zip(changed, summaries)
+        }
+    }
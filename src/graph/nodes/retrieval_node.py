@@ -0,0 +1,145 @@
+"""
+检索节点
+在生成报告结构前查找相近查询的历史报告作为背景；搜索节点经 run_search 复用有效期内相近查询的搜索结果
+"""
+import re
+from typing import Any, Dict, List
+from ..state import AgentState
+from langgraph.types import RunnableConfig
+from ...utils.cancellation import check_cancelled, get_cancel_token
+from ...storage.content_store import store_search_results
+from ...storage.search_index import query_similarity
+
+_HEADING = re.compile(r"^#{1,6}\s+(.*)$")
+
+
+def split_report_sections(report: str, max_chars: int = 1500) -> List[Dict[str, str]]:
+    """
+    按 Markdown 标题切分报告
+
+    Args:
+        report: 报告正文
+        max_chars: 每节保留的最大字符数
+
+    Returns:
+        [{"heading", "text"}]，跳过没有正文的标题
+    """
+    sections = []
+    heading, lines = "", []
+
+    def flush():
+        text = "\n".join(lines).strip()
+        if text:
+            sections.append({"heading": heading, "text": text[:max_chars]})
+
+    for line in (report or "").splitlines():
+        match = _HEADING.match(line.strip())
+        if match:
+            flush()
+            heading, lines = match.group(1).strip(), []
+        else:
+            lines.append(line)
+    flush()
+    return sections
+
+
+def format_prior_outlines(prior_reports: List[Dict[str, Any]]) -> str:
+    """历史报告的标题结构，供生成报告结构时参考"""
+    blocks = []
+    for report in prior_reports:
+        headings = [section["heading"] for section in report["sections"] if section["heading"]]
+        blocks.append(f"《{report['title']}》（生成于 {report['created_at']}）: " + "；".join(headings))
+    return "\n".join(blocks)
+
+
+def related_prior_sections(prior_reports: List[Dict[str, Any]], paragraph_title: str,
+                           min_similarity: float = 0.2, limit: int = 2) -> str:
+    """
+    历史报告中与段落标题相近的章节
+
+    Args:
+        prior_reports: 状态中的历史报告
+        paragraph_title: 段落标题
+        min_similarity: 章节标题与段落标题的最低相似度
+        limit: 最多返回几节
+
+    Returns:
+        拼接后的章节文本，没有相近章节时返回空字符串
+    """
+    candidates = []
+    for report in prior_reports or []:
+        for section in report["sections"]:
+            similarity = query_similarity(paragraph_title, section["heading"])
+            if similarity >= min_similarity:
+                candidates.append((similarity, report, section))
+    candidates.sort(key=lambda item: item[0], reverse=True)
+    return "\n\n".join(
+        f"[{report['title']}（生成于 {report['created_at']}）- {section['heading']}]\n{section['text']}"
+        for _, report, section in candidates[:limit]
+    )
+
+
+def run_search(query: str, config: RunnableConfig, use_cache: bool = True) -> List[Dict[str, Any]]:
+    """
+    执行搜索：有效期内有相近查询的搜索记录时直接复用，否则调用 Tavily 并记录
+
+    Args:
+        query: 搜索查询
+        config: RunnableConfig
+        use_cache: 是否复用已有搜索记录（刷新报告时需要最新结果，传 False）
+
+    Returns:
+        写入状态的结果列表（配置了 content_store 时只含 ID 与元数据）
+    """
+    from ...tools.search import tavily_search
+
+    configurable = config["configurable"]
+    store = configurable.get("content_store")
+    ttl = configurable.get("search_cache_ttl")
+    if store is not None and ttl and use_cache:
+        cached = store.find_search(query, ttl)
+        if cached is not None:
+            print(f"复用 {cached['created_at']} 的搜索结果: {cached['query']}")
+            return cached["results"]
+
+    search_results = tavily_search(
+        query,
+        max_results=configurable.get("max_search_results", 3),
+        timeout=configurable.get("search_timeout", 30),
+        api_key=configurable["tavily_api_key"],
+        cancel_token=get_cancel_token(config)
+    )
+    results = store_search_results(config, search_results or [])
+    if store is not None and ttl and results:
+        store.record_search(query, results)
+    return results
+
+
+def retrieve_context(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+
+    check_cancelled(config)
+    search_index = config["configurable"].get("search_index")
+    max_reports = config["configurable"].get("retrieval_max_reports", 0)
+    if search_index is None or not max_reports:
+        return {"prior_reports": []}
+
+    reports = search_index.similar(
+        state["query"],
+        kind="report",
+        limit=max_reports,
+        max_age=config["configurable"].get("retrieval_max_age"),
+    )
+    prior_reports = [
+        {
+            "title": report["title"],
+            "path": report["key"],
+            "created_at": report["created_at"],
+            "similarity": report["similarity"],
+            "sections": split_report_sections(report["body"]),
+        }
+        for report in reports
+    ]
+    if prior_reports:
+        print(f"找到 {len(prior_reports)} 篇相关历史报告: " + "、".join(r["title"] for r in prior_reports))
+
+    return {"prior_reports": prior_reports}
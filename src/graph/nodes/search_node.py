@@ -7,16 +7,27 @@ from typing import Dict, Any
 from datetime import datetime
 from ..state import AgentState, SearchRecord
 from langgraph.types import RunnableConfig
+from ...utils.cancellation import ResearchCancelled, check_cancelled, get_cancel_token
+from ...utils.speculation import get_speculator
+from .retrieval_node import run_search
 
-def initial_search(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+def search_paragraph(state: AgentState, index: int, config: RunnableConfig) -> SearchRecord:
+    """
+    为指定段落生成搜索查询并执行搜索；只依赖查询主题与段落结构，不依赖其他段落的总结
 
-    llm_client = config["configurable"]["llm_client"]
+    Args:
+        state: 当前状态
+        index: 段落索引
+        config: RunnableConfig
 
-    # 获取 Tavily 搜索工具
-    from ...tools.search import tavily_search
+    Returns:
+        搜索记录
+    """
+    check_cancelled(config)
+    llm_client = config["configurable"]["llm_client"]
+    cancel_token = get_cancel_token(config)
 
-    current_idx = state["current_paragraph_index"]
-    current_paragraph = state["paragraphs"][current_idx]
+    current_paragraph = state["paragraphs"][index]
 
     # 导入提示词
     from ...prompts.prompts import SYSTEM_PROMPT_FIRST_SEARCH
@@ -47,28 +58,46 @@ def initial_search(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
         "required": ["search_query", "reasoning"]
     }
 
-    response = llm_client.chat(messages, json_schema=json_schema)
+    response = llm_client.chat(messages, json_schema=json_schema, cancel_token=cancel_token)
     search_query = response["search_query"]
 
-    # 执行搜索(使用原项目的 tavily_search 函数)
-    search_results = tavily_search(
-        search_query,
-        max_results=config["configurable"].get("max_search_results", 3),
-        timeout=config["configurable"].get("search_timeout", 30),
-        api_key=config["configurable"]["tavily_api_key"]
-    )
+    # 执行搜索(有效期内相近查询的结果直接复用)
+    search_results = run_search(search_query, config)
 
     # 记录搜索历史
-    search_record = SearchRecord(
+    return SearchRecord(
         query=search_query,
-        results=search_results or [],
+        results=search_results,
         timestamp=datetime.now().isoformat()
     )
 
-    # 更新段落的搜索历史
-    updated_paragraphs = state["paragraphs"].copy()
-    updated_paragraphs[current_idx]["search_history"].append(search_record)
 
+def initial_search(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+
+    check_cancelled(config)
+    current_idx = state["current_paragraph_index"]
+    paragraphs = state["paragraphs"]
+    speculator = get_speculator(config)
+
+    # 取用上一段落运行期间在后台完成的搜索；推测任务失败时（取消除外）同步重新搜索
+    search_record = None
+    future = speculator.take((current_idx, paragraphs[current_idx]["title"])) if speculator else None
+    if future is not None:
+        try:
+            search_record = future.result()
+        except ResearchCancelled:
+            raise
+        except Exception as e:
+            print(f"后台搜索失败，重新搜索: {e}")
+    if search_record is None:
+        search_record = search_paragraph(state, current_idx, config)
+
+    # 下一段落的初始搜索不依赖本段落的总结，在本段落总结与反思期间后台执行
+    next_idx = current_idx + 1
+    if speculator and next_idx < len(paragraphs):
+        speculator.submit((next_idx, paragraphs[next_idx]["title"]), search_paragraph, state, next_idx, config)
+
+    # 追加到当前段落的搜索历史
     return {
-        "paragraphs": updated_paragraphs
-    }
\ No newline at end of file
+        "paragraphs": {current_idx: {"search_history": [search_record]}}
+    }
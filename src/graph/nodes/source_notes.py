@@ -0,0 +1,208 @@
+"""
+来源笔记（map 阶段）
+总结节点不再把截断后的长正文直接塞进段落提示词：每篇长正文先按块并发压缩为要点笔记，
+笔记与段落无关，按内容哈希缓存在 content_store 中，同一篇文章出现在多个段落或多次研究中只总结一次；
+段落总结（reduce 阶段）只读取这些笔记，短正文原样使用。
+并发的段落（如增量刷新）遇到同一篇正文时只有一个调用方压缩，其余等待它的结果
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+from langgraph.types import RunnableConfig
+from ...utils.cancellation import ResearchCancelled, check_cancelled, get_cancel_token
+from ...utils.text_processing import format_search_results_for_prompt, truncate_content
+from ...storage.content_store import ContentStore, load_search_results
+
+
+def split_content(content: str, chunk_size: int) -> List[str]:
+    """
+    把长正文切分为不超过 chunk_size 的块，尽量在换行处切分
+
+    Args:
+        content: 正文
+        chunk_size: 每块最大字符数
+
+    Returns:
+        块列表
+    """
+    chunks = []
+    while len(content) > chunk_size:
+        cut = content.rfind("\n", 0, chunk_size)
+        if cut < chunk_size * 0.8:
+            cut = chunk_size
+        chunks.append(content[:cut])
+        content = content[cut:].lstrip("\n")
+    if content:
+        chunks.append(content)
+    return chunks
+
+
+# 正在压缩的正文：{内容 ID: Future[(笔记, 是否全部块都压缩成功)]}
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def condense_results(results: List[Dict[str, Any]], config: RunnableConfig) -> List[Dict[str, Any]]:
+    """
+    map 阶段：把长正文替换为来源笔记
+
+    Args:
+        results: 状态中的结果列表（可以只含内容 ID）
+        config: RunnableConfig，configurable 中的 source_note_min_length 为压缩阈值（为空时退回截断），
+            source_note_max_workers 为并发数
+
+    Returns:
+        带 content 字段的结果列表，长正文的 content 为笔记并带 "condensed": True
+    """
+    configurable = config["configurable"]
+    results = load_search_results(config, results)
+    min_length = configurable.get("source_note_min_length")
+    if not min_length:
+        return results
+
+    store = configurable.get("content_store")
+    long_contents = {}
+    for result in results:
+        content = result.get("content") or ""
+        if len(content) > min_length:
+            long_contents[result.get("content_id") or ContentStore.content_id(content)] = content
+
+    notes = store.get_notes(long_contents) if store is not None else {}
+    missing, waiting = [], {}
+    with _inflight_lock:
+        for content_id in long_contents:
+            if content_id in notes:
+                continue
+            if content_id in _inflight:
+                waiting[content_id] = _inflight[content_id]
+            else:
+                _inflight[content_id] = Future()
+                missing.append(content_id)
+    try:
+        if missing:
+            notes.update(_summarize_contents(results, long_contents, missing, config))
+    except BaseException as e:
+        with _inflight_lock:
+            for content_id in missing:
+                future = _inflight.pop(content_id, None)
+                if future is not None:
+                    future.set_exception(e)
+        raise
+    for content_id, future in waiting.items():
+        try:
+            notes[content_id] = future.result()[0]
+        except Exception:
+            # 负责压缩的调用方被取消或出错，本次退回截断后的原文
+            check_cancelled(config)
+            notes[content_id] = truncate_content(long_contents[content_id], min_length)
+
+    condensed = []
+    for result in results:
+        content = result.get("content") or ""
+        if len(content) > min_length:
+            result = {**result, "content": notes[result.get("content_id") or ContentStore.content_id(content)],
+                      "condensed": True}
+        condensed.append(result)
+    return condensed
+
+
+def _summarize_contents(results: List[Dict[str, Any]], long_contents: Dict[str, str],
+                        missing: List[str], config: RunnableConfig) -> Dict[str, str]:
+    """
+    压缩本调用方负责的正文，写入缓存并通知等待同一正文的调用方
+
+    Args:
+        results: 带 content 字段的结果列表
+        long_contents: {内容 ID: 长正文}
+        missing: 需要压缩的内容 ID（已在 _inflight 中登记）
+        config: RunnableConfig
+
+    Returns:
+        {内容 ID: 笔记}
+    """
+    configurable = config["configurable"]
+    store = configurable.get("content_store")
+    chunk_size = configurable.get("max_content_length", 20000)
+    min_length = configurable["source_note_min_length"]
+    check_cancelled(config)
+    llm_client = configurable["llm_client"]
+    cancel_token = get_cancel_token(config)
+
+    from ...prompts.prompts import SYSTEM_PROMPT_SOURCE_NOTES
+
+    json_schema = {
+        "type": "object",
+        "properties": {
+            "notes": {"type": "string"}
+        },
+        "required": ["notes"]
+    }
+    titles = {}
+    for result in results:
+        content = result.get("content") or ""
+        titles.setdefault(result.get("content_id") or ContentStore.content_id(content), result)
+
+    def summarize(task) -> Tuple[str, bool]:
+        content_id, chunk = task
+        source = titles[content_id]
+        messages = [
+            {"role": "system", "content": "你是一个专业的信息整理员。"},
+            {"role": "user", "content": (
+                f"\n\n标题: {source.get('title', '')}\n"
+                f"链接: {source.get('url', '')}\n"
+                f"正文: {chunk}\n"
+                + SYSTEM_PROMPT_SOURCE_NOTES)}
+        ]
+        try:
+            return llm_client.chat(messages, json_schema=json_schema, cancel_token=cancel_token)["notes"], True
+        except ResearchCancelled:
+            raise
+        except Exception as e:
+            # 单篇压缩失败不影响段落总结，退回截断后的原文（不写入缓存）
+            print(f"来源笔记生成失败，使用截断正文: {source.get('url', '')}: {e}")
+            return truncate_content(chunk, min_length), False
+
+    # 所有长正文的所有块一起并发压缩
+    tasks = [(content_id, chunk) for content_id in missing
+             for chunk in split_content(long_contents[content_id], chunk_size)]
+    max_workers = min(len(tasks), configurable.get("source_note_max_workers", 4))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="source-notes") as executor:
+        chunk_notes = list(executor.map(summarize, tasks))
+
+    texts: Dict[str, List[str]] = {}
+    complete = dict.fromkeys(missing, True)
+    for (content_id, _), (text, ok) in zip(tasks, chunk_notes):
+        texts.setdefault(content_id, []).append(text)
+        complete[content_id] = complete[content_id] and ok
+    new_notes = {content_id: "\n".join(chunks) for content_id, chunks in texts.items()}
+    # 只缓存每一块都压缩成功的笔记，含截断回退的笔记下次重新压缩
+    if store is not None:
+        store.put_notes({content_id: text for content_id, text in new_notes.items() if complete[content_id]})
+    with _inflight_lock:
+        for content_id in missing:
+            _inflight.pop(content_id).set_result((new_notes[content_id], complete[content_id]))
+    print(f"来源笔记: 新压缩 {len(missing)} 篇（{len(tasks)} 块），复用 {len(long_contents) - len(missing)} 篇")
+    return new_notes
+
+
+def format_source_notes(results: List[Dict[str, Any]], config: RunnableConfig) -> List[str]:
+    """
+    reduce 阶段的输入：来源笔记与短正文，带标题与链接便于段落引用
+
+    Args:
+        results: 状态中的结果列表
+        config: RunnableConfig
+
+    Returns:
+        格式化后的内容列表；未启用来源笔记时与原先一样截断正文
+    """
+    if not config["configurable"].get("source_note_min_length"):
+        return format_search_results_for_prompt(
+            load_search_results(config, results),
+            max_length=config["configurable"].get("max_content_length", 20000)
+        )
+    return [
+        f"{result.get('title', '')}（{result.get('url', '')}）\n{result['content']}"
+        for result in condense_results(results, config)
+        if result.get("content")
+    ]
@@ -5,16 +5,35 @@
 from typing import Dict, Any
 from ..state import AgentState, ParagraphState
 from langgraph.types import RunnableConfig
+from ...utils.cancellation import check_cancelled, get_cancel_token
+from .retrieval_node import format_prior_outlines
 
 def generate_structure(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
 
+    check_cancelled(config)
     llm_client = config["configurable"]["llm_client"]
+    cancel_token = get_cancel_token(config)
     query = state["query"]
 
+    # 同类别的相近查询已有结构时直接复用，省去一次 LLM 调用；fresh_outline 强制重新生成
+    outline_cache = config["configurable"].get("outline_cache")
+    cached = None
+    if outline_cache is not None and not config["configurable"].get("fresh_outline"):
+        cached = outline_cache.find(query, min_similarity=config["configurable"].get("outline_min_similarity", 0.7))
+    if cached is not None:
+        print(f"复用 {cached['created_at']} 生成的报告结构: {cached['query']}（相似度 {cached['similarity']}）")
+        return build_structure_update(cached, config)
+
     # 导入提示词(需要从原项目复用)
     from ...prompts.prompts import SYSTEM_PROMPT_REPORT_STRUCTURE
+    prior_reports = state.get("prior_reports") or []
+    prior_outlines = (
+        f"\n近期相关报告的结构（可参考，按本次查询主题调整）:\n{format_prior_outlines(prior_reports)}"
+        if prior_reports else ""
+    )
     user_content = (
         f"\n\n查询主题: {query}"
+        + prior_outlines
         + SYSTEM_PROMPT_REPORT_STRUCTURE)
     
     # 构建提示词
@@ -44,8 +63,19 @@ def generate_structure(state: AgentState, config: RunnableConfig) -> Dict[str, A
     }
 
     # 调用 LLM
-    result = llm_client.chat(messages, json_schema=json_schema)
+    result = llm_client.chat(messages, json_schema=json_schema, cancel_token=cancel_token)
+
+    if outline_cache is not None:
+        try:
+            outline_cache.save(query, result["report_title"], result["paragraphs"])
+        except Exception as e:
+            print(f"报告结构缓存失败: {e}")
+
+    return build_structure_update(result, config)
 
+
+def build_structure_update(outline: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+    """由报告结构 {"report_title", "paragraphs": [{"title", "content"}]} 构建状态更新"""
     # 构建段落状态列表
     paragraphs = [
         ParagraphState(
@@ -56,13 +86,13 @@ def generate_structure(state: AgentState, config: RunnableConfig) -> Dict[str, A
             completed=False,
             reflection_count=0
         )
-        for p in result["paragraphs"]
+        for p in outline["paragraphs"]
     ]
 
     return {
-        "report_title": result["report_title"],
+        "report_title": outline["report_title"],
         "paragraphs": paragraphs,
         "current_paragraph_index": 0,
         "reflection_count": 0,
         "max_reflections": config["configurable"].get("max_reflections", 2)
-    }
\ No newline at end of file
+    }
@@ -5,14 +5,16 @@
 from typing import Dict, Any
 from ..state import AgentState
 from langgraph.types import RunnableConfig
+from ...utils.cancellation import check_cancelled, get_cancel_token
+from .source_notes import format_source_notes
+from .retrieval_node import related_prior_sections
 
 
 def initial_summary(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
 
+    check_cancelled(config)
     llm_client = config["configurable"]["llm_client"]
-
-    # 导入文本处理工具
-    from ...utils.text_processing import format_search_results_for_prompt
+    cancel_token = get_cancel_token(config)
 
     current_idx = state["current_paragraph_index"]
     current_paragraph = state["paragraphs"][current_idx]
@@ -23,21 +25,26 @@ def initial_summary(state: AgentState, config: RunnableConfig) -> Dict[str, Any]
 
     latest_search = current_paragraph["search_history"][-1]
 
-    # 格式化搜索结果
-    formatted_results = format_search_results_for_prompt(
-        latest_search["results"],
-        max_length=config["configurable"].get("max_content_length", 20000)
-    )
+    # 长正文先压缩为来源笔记（按内容哈希缓存），不再截断后直接放入提示词
+    formatted_results = format_source_notes(latest_search["results"], config)
 
     # 导入提示词
     from ...prompts.prompts import SYSTEM_PROMPT_FIRST_SUMMARY
 
+    # 历史报告中的相近章节只作背景，时效以本次搜索结果为准
+    prior_sections = related_prior_sections(state.get("prior_reports") or [], current_paragraph["title"])
+    prior_context = (
+        f"历史报告相关内容（可能已过时，与搜索结果冲突时以搜索结果为准）: {prior_sections};\n"
+        if prior_sections else ""
+    )
+
     user_content = (
         f"\n\n查询主题: {state['query']};\n"
         f"段落标题: {current_paragraph['title']};\n"
         f"段落内容: {current_paragraph['content']};\n"
         f"搜索查询: {latest_search['query']};\n"
-        f"搜索结果: {formatted_results}"
+        f"搜索结果: {formatted_results}\n"
+        + prior_context
     + SYSTEM_PROMPT_FIRST_SUMMARY)
     # 生成总结
     messages = [
@@ -55,14 +62,16 @@ def initial_summary(state: AgentState, config: RunnableConfig) -> Dict[str, Any]
         "required": ["summary"]
     }
 
-    response = llm_client.chat(messages, json_schema=json_schema)
+    response = llm_client.chat(messages, json_schema=json_schema, cancel_token=cancel_token)
     summary = response["summary"]
 
-    # 更新段落内容
-    updated_paragraphs = state["paragraphs"].copy()
-    updated_paragraphs[current_idx]["content"] = summary
-    updated_paragraphs[current_idx]["latest_summary"] = summary
-
+    # 更新段落内容;反思次数已用完时,本次总结即为该段落的最终内容
     return {
-        "paragraphs": updated_paragraphs
+        "paragraphs": {
+            current_idx: {
+                "content": summary,
+                "latest_summary": summary,
+                "completed": current_paragraph["reflection_count"] >= state["max_reflections"]
+            }
+        }
     }
\ No newline at end of file
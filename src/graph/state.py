@@ -2,13 +2,13 @@
 LangGraph 状态定义  
 使用 TypedDict 定义研究过程的状态结构  
 """
-from typing import TypedDict, List, Optional, Annotated, Dict, Any
-from operator import add
+from typing import TypedDict, List, Optional, Annotated, Dict, Any, Union
 
 
 class SearchRecord(TypedDict):
     """单次搜索记录"""
     query: str
+    # 配置了 content_store 时,结果只保留 title/url/score 与 content_id/content_length,正文按需加载
     results: List[Dict[str, Any]]
     timestamp: str
 
@@ -23,6 +23,68 @@ class ParagraphState(TypedDict):
     reflection_count: int
 
 
+class ParagraphUpdate(TypedDict, total=False):
+    """单个段落的增量更新,search_history 为追加,其余字段为覆盖"""
+    title: str
+    content: str
+    search_history: List[SearchRecord]
+    latest_summary: str
+    completed: bool
+    reflection_count: int
+
+
+# 节点对 paragraphs 的更新:完整列表(整体替换)或 {段落索引: ParagraphUpdate}
+ParagraphsUpdate = Union[List[ParagraphState], Dict[int, ParagraphUpdate]]
+
+
+def merge_paragraphs(current: List[ParagraphState], update: ParagraphsUpdate) -> List[ParagraphState]:
+    """
+    paragraphs 通道的 reducer
+
+    列表更新整体替换(用于生成结构);按索引的更新只重建被修改的段落,
+    search_history 以追加方式合并,未修改的段落与既有搜索记录均共享引用,不做复制或原地修改。
+
+    Args:
+        current: 当前段落列表
+        update: 节点返回的更新
+
+    Returns:
+        合并后的段落列表
+    """
+    if isinstance(update, list):
+        return update
+    if not update:
+        return current
+
+    merged = list(current)
+    for index, changes in update.items():
+        paragraph = merged[index]
+        new_paragraph = {**paragraph, **changes}
+        if "search_history" in changes:
+            new_paragraph["search_history"] = paragraph["search_history"] + changes["search_history"]
+        merged[index] = new_paragraph
+    return merged
+
+
+def apply_state_update(state: Dict[str, Any], update: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    按 AgentState 的 reducer 语义把节点输出合并进累计状态(供图外部跟踪进度使用)
+
+    Args:
+        state: 当前累计状态
+        update: 节点输出
+
+    Returns:
+        合并后的新状态
+    """
+    if not update:
+        return state
+    merged = {**state, **update}
+    if "paragraphs" in update:
+        merged["paragraphs"] = merge_paragraphs(state.get("paragraphs") or [], update["paragraphs"])
+    return merged
+
+
 class AgentState(TypedDict):
     """研究代理的完整状态"""
     # 输入  
@@ -31,16 +93,21 @@ class AgentState(TypedDict):
     # 热点话题信息  
     hot_topic_info: Optional[Dict[str, Any]]  # 存储完整的HotTopic信息  
 
+    # 检索到的相近历史报告：[{"title", "path", "created_at", "similarity", "sections": [{"heading", "text"}]}]
+    prior_reports: List[Dict[str, Any]]
+
     # 报告结构  
     report_title: str
-    # paragraphs: Annotated[List[ParagraphState], add]  # 使用 add reducer 合并段落列表
-    paragraphs: List[ParagraphState]  
+    paragraphs: Annotated[List[ParagraphState], merge_paragraphs]  # 按段落索引增量合并
 
     # 流程控制  
     current_paragraph_index: int
     reflection_count: int
     max_reflections: int
 
+    # 刷新报告时有新搜索结果的段落索引
+    changed_paragraphs: List[int]
+
     # 输出  
     final_report: Optional[str]
     completed: bool  
\ No newline at end of file
@@ -1,89 +1,156 @@
-
 """
-热榜数据爬虫类 - 爬取百度和B站热榜数据
+热榜数据爬虫类 - 按平台注册表并发爬取各平台热榜
+平台适配器见 src/hot_topics/platforms，本模块负责共享的请求、限速、条件请求与并发执行
 """
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
-from typing import List
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Tuple
 from .models import HotTopic
+from .platforms import PlatformAdapter, create_adapters
 
 
 class HotTopicCrawler:
-    """热榜数据爬虫类"""
+    """热榜数据爬虫类
+
+    平台爬取方法返回话题列表；上游内容自上次成功解析后未变化时返回 None（跳过解析与入库），
+    失败时返回空列表。
+    """
+
+    def __init__(self, platforms: Optional[List[str]] = None, timeout: Optional[float] = None,
+                 max_workers: Optional[int] = None):
+        """
+        初始化爬虫
 
-    def __init__(self):
+        Args:
+            platforms: 启用的平台标识，None 表示默认启用的平台（见 create_adapters）
+            timeout: 覆盖各平台的请求超时（秒）
+            max_workers: 并发爬取的线程数，默认每个平台一个
+        """
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        self.adapters: Dict[str, PlatformAdapter] = create_adapters(platforms)
+        if timeout is not None:
+            for adapter in self.adapters.values():
+                adapter.timeout = timeout
+        # 平台标识 -> 爬取函数
         self.platforms = {
-            'baidu': self.crawl_baidu,
-            'bilibili': self.crawl_bilibili
+            name: (lambda name=name: self.crawl_platform(name)) for name in self.adapters
         }
+        # 平台标识 -> 入库使用的平台名称（HotTopic.platform）
+        self.platform_names = {name: adapter.display_name for name, adapter in self.adapters.items()}
 
-    def crawl_baidu(self) -> List[HotTopic]:
-        """爬取百度热榜"""
+        # 复用连接的会话，避免每次爬取重新建立 TCP/TLS 连接
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=len(self.adapters), pool_maxsize=4)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or max(1, len(self.adapters)),
+                                           thread_name_prefix="hot-topic-crawl")
+
+        # 条件请求的校验值（ETag / Last-Modified）与上次成功解析的负载哈希，按平台记录
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self._payload_hashes: Dict[str, str] = {}
+        self._last_topics: Dict[str, List[HotTopic]] = {}
+        # 按平台限速
+        self._last_request: Dict[str, float] = {}
+        self._rate_locks = {name: threading.Lock() for name in self.adapters}
+
+    def _wait_rate_limit(self, platform: str):
+        """距上次请求不足 min_request_interval 时等待（只阻塞该平台自己的线程）"""
+        wait = self._last_request.get(platform, 0) + self.adapters[platform].min_request_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_request[platform] = time.monotonic()
+
+    def _fetch(self, platform: str, url: str) -> Optional[Tuple[requests.Response, str]]:
+        """
+        条件请求平台页面
+
+        Args:
+            platform: 平台标识
+            url: 请求地址
+
+        Returns:
+            (响应, 负载哈希)；上游返回 304 或负载与上次成功解析时相同则返回 None
+        """
+        adapter = self.adapters[platform]
+        headers = dict(adapter.headers)
+        validators = self._validators.get(platform, {})
+        if 'ETag' in validators:
+            headers['If-None-Match'] = validators['ETag']
+        if 'Last-Modified' in validators:
+            headers['If-Modified-Since'] = validators['Last-Modified']
+
+        response = self.session.get(url, headers=headers, timeout=adapter.timeout)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+
+        payload_hash = hashlib.sha256(response.content).hexdigest()
+        if self._payload_hashes.get(platform) == payload_hash:
+            return None
+        return response, payload_hash
+
+    def _remember(self, platform: str, response: requests.Response, payload_hash: str,
+                  topics: List[HotTopic]):
+        """解析成功后记录校验值、负载哈希与话题（解析失败时不记录，下次仍会完整请求）"""
+        self._validators[platform] = {
+            key: response.headers[key] for key in ('ETag', 'Last-Modified') if key in response.headers
+        }
+        self._payload_hashes[platform] = payload_hash
+        self._last_topics[platform] = topics
+
+    def crawl_platform(self, platform: str) -> Optional[List[HotTopic]]:
+        """
+        爬取单个平台
+
+        Args:
+            platform: 平台标识
+
+        Returns:
+            话题列表；内容未变化时返回 None；失败时返回空列表
+        """
+        adapter = self.adapters[platform]
         try:
-            url = "http://top.baidu.com/buzz?b=1&c=513&fr=topbuzz_b1_c513"
-            response = requests.get(url, headers=self.headers)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                topics = []
-                items = soup.select('.c-single-text-ellipsis')
-                for i, item in enumerate(items[:20]):
-                    title = item.get_text().strip()
-                    topic = HotTopic(
-                        id=f"baidu_{i}",
-                        title=title,
-                        platform="百度",
-                        hot_value=10000 - i * 100,  # 模拟热度值
-                        url=f"https://www.baidu.com/s?wd={title}",
-                        timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        rank=i + 1
-                    )
-                    topics.append(topic)
-                return topics
+            with self._rate_locks[platform]:
+                self._wait_rate_limit(platform)
+                fetched = self._fetch(platform, adapter.url)
+            if fetched is None:
+                return None
+            response, payload_hash = fetched
+            topics = adapter.build_topics(adapter.parse(response))
+            if topics:
+                self._remember(platform, response, payload_hash, topics)
+            return topics
         except Exception as e:
-            print(f"百度热榜爬取失败: {e}")
+            print(f"{adapter.display_name}热榜爬取失败: {e}")
         return []
 
-    def crawl_bilibili(self) -> List[HotTopic]:
+    def crawl_baidu(self) -> Optional[List[HotTopic]]:
+        """爬取百度热榜"""
+        return self.crawl_platform('baidu')
+
+    def crawl_bilibili(self) -> Optional[List[HotTopic]]:
         """爬取B站热榜"""
-        try:
-            url = "https://api.bilibili.com/x/web-interface/ranking/v2"
-            response = requests.get(url, headers=self.headers)
-            if response.status_code == 200:
-                data = response.json()
-                topics = []
-                for i, item in enumerate(data['data']['list'][:20]):
-                    topic = HotTopic(
-                        id=f"bilibili_{i}",
-                        title=item['title'],
-                        platform="B站",
-                        hot_value=int(item.get('stat', {}).get('view', 0)),
-                        url=f"https://www.bilibili.com/video/{item['bvid']}",
-                        timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        rank=i + 1
-                    )
-                    topics.append(topic)
-                return topics
-        except Exception as e:
-            print(f"B站热榜爬取失败: {e}")
-        return []
+        return self.crawl_platform('bilibili')
 
     def crawl_all_platforms(self) -> List[HotTopic]:
-        """爬取所有平台数据"""
+        """并发爬取所有平台数据（内容未变化的平台返回上次解析的话题）"""
+        futures = {platform: self.executor.submit(self.crawl_platform, platform) for platform in self.adapters}
         all_topics = []
-        for platform, crawler_func in self.platforms.items():
-            print(f"正在爬取{platform}...")
-            try:
-                topics = crawler_func()
-                all_topics.extend(topics)
-                print(f"{platform}爬取完成，获取{len(topics)}个话题")
-            except Exception as e:
-                print(f"{platform}爬取失败: {e}")
+        for platform, future in futures.items():
+            topics = future.result()
+            if topics is None:
+                print(f"{platform}内容未变化，使用上次结果")
+                topics = self._last_topics.get(platform, [])
+            all_topics.extend(topics)
+            print(f"{platform}爬取完成，获取{len(topics)}个话题")
 
         print(f"总共获取{len(all_topics)}个话题")
         return all_topics
-
-
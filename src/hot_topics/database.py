@@ -4,7 +4,7 @@
 """  
   
 import sqlite3  
-from typing import List, Dict  
+from typing import Callable, Dict, List, Optional, Tuple  
 from datetime import datetime  
 from .models import HotTopic  
   
@@ -20,6 +20,7 @@ class DatabaseManager:
             db_path: 数据库文件路径  
         """  
         self.db_path = db_path  
+        self._save_listeners: List[Callable[[List[HotTopic], Dict[Tuple[str, str], int]], None]] = []  
         self.init_db()  
       
     def init_db(self):  
@@ -36,10 +37,16 @@ class DatabaseManager:
                 hot_value INTEGER,  
                 url TEXT,  
                 timestamp TEXT,  
-                rank INTEGER  
+                rank INTEGER,  
+                cluster_id TEXT  
             )  
         ''')  
           
+        # 旧版本的话题表没有簇 ID 列  
+        cursor.execute("PRAGMA table_info(hot_topics)")  
+        if "cluster_id" not in [row[1] for row in cursor.fetchall()]:  
+            cursor.execute("ALTER TABLE hot_topics ADD COLUMN cluster_id TEXT")  
+          
         # 创建爬取历史表  
         cursor.execute('''  
             CREATE TABLE IF NOT EXISTS crawl_history (  
@@ -50,33 +57,97 @@ class DatabaseManager:
             )  
         ''')  
           
+        # 创建话题历史表，只记录排名/热度的变化（新上榜、变化、落榜）  
+        cursor.execute('''  
+            CREATE TABLE IF NOT EXISTS topic_history (  
+                id INTEGER PRIMARY KEY AUTOINCREMENT,  
+                topic_id TEXT,  
+                platform TEXT NOT NULL,  
+                title TEXT NOT NULL,  
+                rank INTEGER,  
+                hot_value INTEGER,  
+                rank_delta INTEGER,  
+                hot_delta INTEGER,  
+                recorded_at TEXT NOT NULL  
+            )  
+        ''')  
+        cursor.execute('''  
+            CREATE INDEX IF NOT EXISTS idx_topic_history_topic  
+            ON topic_history (platform, title, recorded_at)  
+        ''')  
+        # 旧版本的历史表没有话题 ID 列  
+        cursor.execute("PRAGMA table_info(topic_history)")  
+        if "topic_id" not in [row[1] for row in cursor.fetchall()]:  
+            cursor.execute("ALTER TABLE topic_history ADD COLUMN topic_id TEXT")  
+        cursor.execute('''  
+            CREATE INDEX IF NOT EXISTS idx_topic_history_id  
+            ON topic_history (topic_id, recorded_at)  
+        ''')  
+          
+        # 创建预取报告表  
+        cursor.execute('''  
+            CREATE TABLE IF NOT EXISTS prefetched_reports (  
+                topic_key TEXT PRIMARY KEY,  
+                query TEXT NOT NULL,  
+                platform TEXT,  
+                report TEXT NOT NULL,  
+                report_path TEXT,  
+                created_at TEXT  
+            )  
+        ''')  
+          
+        # 预取尝试日志：每次预取（含失败、取消）一行，用于每日预算  
+        cursor.execute('''  
+            CREATE TABLE IF NOT EXISTS prefetch_attempts (  
+                id INTEGER PRIMARY KEY AUTOINCREMENT,  
+                topic_key TEXT NOT NULL,  
+                query TEXT NOT NULL,  
+                status TEXT NOT NULL,  
+                created_at TEXT NOT NULL  
+            )  
+        ''')  
+        cursor.execute('''  
+            CREATE INDEX IF NOT EXISTS idx_prefetch_attempts_created  
+            ON prefetch_attempts (created_at)  
+        ''')  
+          
         conn.commit()  
         conn.close()  
       
+    def add_save_listener(self, callback: Callable[[List[HotTopic], Dict[Tuple[str, str], int]], None]):  
+        """  
+        注册保存回调，每次 save_topics / save_platform_topics 写入成功后调用（重复注册会被忽略）  
+          
+        Args:  
+            callback: callback(新话题列表, {(平台, 标题): 上一次的排名})  
+        """  
+        if callback not in self._save_listeners:  
+            self._save_listeners.append(callback)  
+      
+    def remove_save_listener(self, callback: Callable[[List[HotTopic], Dict[Tuple[str, str], int]], None]):  
+        """注销保存回调（未注册时忽略）"""  
+        if callback in self._save_listeners:  
+            self._save_listeners.remove(callback)  
+      
     def save_topics(self, topics: List[HotTopic]):  
         """  
-        保存话题到数据库  
+        保存话题到数据库（全量：不在 topics 中的话题会被删除）  
+          
+        话题 ID 在多次爬取间稳定，只写入新增或排名/热度变化的话题。  
           
         Args:  
             topics: 热点话题列表  
         """  
         conn = sqlite3.connect(self.db_path)  
         cursor = conn.cursor()  
+        crawl_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  
           
-        # 清空当前数据  
-        cursor.execute("DELETE FROM hot_topics")  
-          
-        # 插入新数据  
-        for topic in topics:  
-            cursor.execute('''  
-                INSERT OR REPLACE INTO hot_topics   
-                (id, title, platform, hot_value, url, timestamp, rank)  
-                VALUES (?, ?, ?, ?, ?, ?, ?)  
-            ''', (topic.id, topic.title, topic.platform,   
-                  topic.hot_value, topic.url, topic.timestamp, topic.rank))  
+        # 记录上一次的榜单，供历史记录与保存回调判断新上榜/快速上升的话题  
+        previous = self._load_previous(cursor)  
+        self._apply_topics(cursor, previous, topics)  
           
-        # 记录爬取历史  
-        crawl_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  
+        # 记录爬取历史与排名/热度变化  
+        self._record_history(cursor, previous, topics, crawl_time)  
         platforms = list(set(topic.platform for topic in topics))  
         for platform in platforms:  
             platform_count = len([t for t in topics if t.platform == platform])  
@@ -87,6 +158,140 @@ class DatabaseManager:
           
         conn.commit()  
         conn.close()  
+          
+        self._notify_listeners(topics, previous)  
+      
+    def _load_previous(self, cursor, platform: Optional[str] = None) -> Dict[str, Tuple[str, str, int, int]]:  
+        """读取当前榜单 {话题ID: (平台, 标题, 排名, 热度值)}"""  
+        if platform is None:  
+            cursor.execute("SELECT id, platform, title, rank, hot_value FROM hot_topics")  
+        else:  
+            cursor.execute("SELECT id, platform, title, rank, hot_value FROM hot_topics WHERE platform = ?", (platform,))  
+        return {row[0]: (row[1], row[2], row[3], row[4]) for row in cursor.fetchall()}  
+      
+    def _apply_topics(self, cursor, previous: Dict[str, Tuple[str, str, int, int]],  
+                      topics: List[HotTopic]) -> int:  
+        """  
+        增量写入榜单：删除已落榜的话题，只插入/更新新增或有变化的话题  
+          
+        Args:  
+            cursor: 数据库游标  
+            previous: 写入前的榜单（_load_previous 的结果）  
+            topics: 新榜单  
+              
+        Returns:  
+            变更的行数，0 表示榜单未变化  
+        """  
+        current_ids = {topic.id for topic in topics}  
+        stale = [(topic_id,) for topic_id in previous if topic_id not in current_ids]  
+        cursor.executemany("DELETE FROM hot_topics WHERE id = ?", stale)  
+          
+        rows = [  
+            (topic.id, topic.title, topic.platform, topic.hot_value, topic.url, topic.timestamp, topic.rank)  
+            for topic in topics  
+            if previous.get(topic.id) != (topic.platform, topic.title, topic.rank, topic.hot_value)  
+        ]  
+        cursor.executemany('''  
+            INSERT INTO hot_topics   
+            (id, title, platform, hot_value, url, timestamp, rank)  
+            VALUES (?, ?, ?, ?, ?, ?, ?)  
+            ON CONFLICT(id) DO UPDATE SET  
+                title = excluded.title, platform = excluded.platform, hot_value = excluded.hot_value,  
+                url = excluded.url, timestamp = excluded.timestamp, rank = excluded.rank  
+        ''', rows)  
+        return len(stale) + len(rows)  
+      
+    def _record_history(self, cursor, previous: Dict[str, Tuple[str, str, int, int]],  
+                        topics: List[HotTopic], recorded_at: str):  
+        """  
+        只记录排名/热度发生变化的话题（新上榜、变化、落榜），未变化的话题不写入  
+          
+        Args:  
+            cursor: 数据库游标  
+            previous: 保存前的榜单 {话题ID: (平台, 标题, 排名, 热度值)}  
+            topics: 新榜单  
+            recorded_at: 记录时间  
+        """  
+        rows = []  
+        for topic in topics:  
+            old = previous.get(topic.id)  
+            if old is not None and old[2:] == (topic.rank, topic.hot_value):  
+                continue  
+            rank_delta = None if old is None else old[2] - topic.rank  
+            hot_delta = None if old is None else topic.hot_value - (old[3] or 0)  
+            rows.append((topic.id, topic.platform, topic.title, topic.rank, topic.hot_value,  
+                         rank_delta, hot_delta, recorded_at))  
+          
+        # 落榜的话题记录为排名/热度为空  
+        current = {topic.id for topic in topics}  
+        for topic_id, (platform, title, _, _) in previous.items():  
+            if topic_id not in current:  
+                rows.append((topic_id, platform, title, None, None, None, None, recorded_at))  
+          
+        cursor.executemany('''  
+            INSERT INTO topic_history  
+            (topic_id, platform, title, rank, hot_value, rank_delta, hot_delta, recorded_at)  
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)  
+        ''', rows)  
+      
+    def _notify_listeners(self, topics: List[HotTopic], previous: Dict[str, Tuple[str, str, int, int]]):  
+        """调用保存回调"""  
+        previous_ranks = {(value[0], value[1]): value[2] for value in previous.values()}  
+        for callback in self._save_listeners:  
+            try:  
+                callback(topics, previous_ranks)  
+            except Exception as e:  
+                print(f"热榜保存回调执行失败: {e}")  
+      
+    def save_platform_topics(self, platform: str, topics: List[HotTopic]) -> bool:  
+        """  
+        增量更新单个平台的话题，其他平台的数据保持不变（供按平台调度的后台爬取使用）  
+          
+        榜单与数据库中完全一致时只记录爬取时间，不写话题、不写历史、不触发保存回调。  
+          
+        Args:  
+            platform: 平台名称（与 HotTopic.platform 一致）  
+            topics: 该平台的热点话题列表  
+              
+        Returns:  
+            榜单是否有变化  
+        """  
+        conn = sqlite3.connect(self.db_path)  
+        cursor = conn.cursor()  
+        crawl_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  
+          
+        previous = self._load_previous(cursor, platform)  
+        changed = self._apply_topics(cursor, previous, topics) > 0  
+        if changed:  
+            self._record_history(cursor, previous, topics, crawl_time)  
+          
+        cursor.execute('''  
+            INSERT INTO crawl_history (platform, crawl_time, topic_count)  
+            VALUES (?, ?, ?)  
+        ''', (platform, crawl_time, len(topics)))  
+          
+        conn.commit()  
+        conn.close()  
+          
+        if changed:  
+            self._notify_listeners(topics, previous)  
+        return changed  
+      
+    def record_crawl(self, platform: str):  
+        """  
+        记录一次内容未变化的爬取（上游返回 304 或负载哈希相同），只更新爬取时间  
+          
+        Args:  
+            platform: 平台名称  
+        """  
+        conn = sqlite3.connect(self.db_path)  
+        cursor = conn.cursor()  
+        cursor.execute('''  
+            INSERT INTO crawl_history (platform, crawl_time, topic_count)  
+            SELECT ?, ?, COUNT(*) FROM hot_topics WHERE platform = ?  
+        ''', (platform, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), platform))  
+        conn.commit()  
+        conn.close()  
       
     def get_all_topics(self) -> List[HotTopic]:  
         """  
@@ -113,10 +318,27 @@ class DatabaseManager:
                 hot_value=row[3],  
                 url=row[4],  
                 timestamp=row[5],  
-                rank=row[6]  
+                rank=row[6],  
+                cluster_id=row[7]  
             ))  
         return topics  
       
+    def update_clusters(self, assignments: Dict[str, str]):  
+        """  
+        写入话题的簇 ID  
+          
+        Args:  
+            assignments: {话题ID: 簇ID}  
+        """  
+        conn = sqlite3.connect(self.db_path)  
+        cursor = conn.cursor()  
+        cursor.executemany(  
+            "UPDATE hot_topics SET cluster_id = ? WHERE id = ? AND cluster_id IS NOT ?",  
+            [(cluster_id, topic_id, cluster_id) for topic_id, cluster_id in assignments.items()]  
+        )  
+        conn.commit()  
+        conn.close()  
+      
     def get_platform_stats(self) -> Dict:  
         """  
         获取各平台统计信息  
@@ -171,7 +393,8 @@ class DatabaseManager:
                 hot_value=row[3],  
                 url=row[4],  
                 timestamp=row[5],  
-                rank=row[6]  
+                rank=row[6],  
+                cluster_id=row[7]  
             ))  
         return topics  
       
@@ -192,6 +415,77 @@ class DatabaseManager:
           
         return result[0] if result and result[0] else "暂无数据"  
       
+    def get_platform_crawl_times(self) -> Dict[str, str]:  
+        """  
+        获取各平台最近一次爬取时间  
+          
+        Returns:  
+            {平台名称: 最近爬取时间字符串}  
+        """  
+        conn = sqlite3.connect(self.db_path)  
+        cursor = conn.cursor()  
+        cursor.execute('''  
+            SELECT platform, MAX(crawl_time) FROM crawl_history  
+            GROUP BY platform  
+        ''')  
+        rows = cursor.fetchall()  
+        conn.close()  
+          
+        return {row[0]: row[1] for row in rows}  
+      
+    def get_topic_history(self, since: str) -> List[Tuple[str, str, Optional[int], Optional[int], str]]:  
+        """  
+        获取当前话题的历史记录  
+          
+        历史表只记录变化，因此除 since 之后的记录外，还返回每个话题在 since 之前的最后一条记录，  
+        作为窗口起点的状态。两部分查询都走 (topic_id, recorded_at) 索引，只与当前上榜话题数有关，  
+        历史积累数周也不会变慢。  
+          
+        Args:  
+            since: 起始时间字符串（%Y-%m-%d %H:%M:%S）  
+              
+        Returns:  
+            [(话题ID, 平台, 排名, 热度值, 记录时间)]，按记录时间升序；落榜记录的排名与热度值为 None  
+        """  
+        conn = sqlite3.connect(self.db_path)  
+        cursor = conn.cursor()  
+        cursor.execute('''  
+            SELECT topic_id, platform, rank, hot_value, recorded_at FROM topic_history  
+            WHERE topic_id IN (SELECT id FROM hot_topics) AND recorded_at >= ?  
+            UNION ALL  
+            SELECT h.topic_id, h.platform, h.rank, h.hot_value, h.recorded_at  
+            FROM hot_topics t  
+            JOIN topic_history h ON h.id = (  
+                SELECT id FROM topic_history  
+                WHERE topic_id = t.id AND recorded_at < ?  
+                ORDER BY recorded_at DESC LIMIT 1  
+            )  
+            ORDER BY recorded_at  
+        ''', (since, since))  
+        rows = cursor.fetchall()  
+        conn.close()  
+          
+        return rows  
+      
+    def get_topic_titles(self) -> List[Tuple[str, str, str, str]]:  
+        """  
+        获取历史上出现过的全部话题（按话题 ID 去重）  
+          
+        Returns:  
+            [(话题ID, 平台, 标题, 首次记录时间)]  
+        """  
+        conn = sqlite3.connect(self.db_path)  
+        cursor = conn.cursor()  
+        cursor.execute('''  
+            SELECT topic_id, platform, title, MIN(recorded_at) FROM topic_history  
+            WHERE topic_id IS NOT NULL  
+            GROUP BY topic_id  
+        ''')  
+        rows = cursor.fetchall()  
+        conn.close()  
+          
+        return rows  
+      
     def clear_old_data(self, days: int = 7):  
         """  
         清除指定天数前的历史数据  
@@ -211,4 +505,96 @@ class DatabaseManager:
         ''', (cutoff_str,))  
           
         conn.commit()  
-        conn.close()
\ No newline at end of file
+        conn.close()  
+      
+    def save_prefetched_report(self, topic_key: str, query: str, platform: Optional[str],  
+                               report: str, report_path: Optional[str] = None):  
+        """  
+        保存预取的研究报告  
+          
+        Args:  
+            topic_key: 话题键  
+            query: 研究问题  
+            platform: 来源平台  
+            report: 报告内容  
+            report_path: 报告文件路径  
+        """  
+        conn = sqlite3.connect(self.db_path)  
+        cursor = conn.cursor()  
+        cursor.execute('''  
+            INSERT OR REPLACE INTO prefetched_reports  
+            (topic_key, query, platform, report, report_path, created_at)  
+            VALUES (?, ?, ?, ?, ?, ?)  
+        ''', (topic_key, query, platform, report, report_path,  
+              datetime.now().strftime("%Y-%m-%d %H:%M:%S")))  
+        conn.commit()  
+        conn.close()  
+      
+    def get_prefetched_report(self, topic_key: str, max_age_seconds: Optional[int] = None) -> Optional[Dict]:  
+        """  
+        获取预取的研究报告  
+          
+        Args:  
+            topic_key: 话题键  
+            max_age_seconds: 最大报告年龄（秒），超过则视为不存在  
+              
+        Returns:  
+            {"query", "platform", "report", "report_path", "created_at"}，不存在时返回 None  
+        """  
+        conn = sqlite3.connect(self.db_path)  
+        cursor = conn.cursor()  
+        cursor.execute('''  
+            SELECT query, platform, report, report_path, created_at  
+            FROM prefetched_reports WHERE topic_key = ?  
+        ''', (topic_key,))  
+        row = cursor.fetchone()  
+        conn.close()  
+          
+        if not row:  
+            return None  
+        if max_age_seconds is not None:  
+            created = datetime.strptime(row[4], "%Y-%m-%d %H:%M:%S")  
+            if (datetime.now() - created).total_seconds() > max_age_seconds:  
+                return None  
+        return {  
+            'query': row[0],  
+            'platform': row[1],  
+            'report': row[2],  
+            'report_path': row[3],  
+            'created_at': row[4]  
+        }  
+      
+    def record_prefetch_attempt(self, topic_key: str, query: str, status: str):  
+        """  
+        记录一次预取尝试  
+          
+        Args:  
+            topic_key: 话题键  
+            query: 研究问题  
+            status: 结果（completed / cancelled / failed / preempted）  
+        """  
+        conn = sqlite3.connect(self.db_path)  
+        cursor = conn.cursor()  
+        cursor.execute('''  
+            INSERT INTO prefetch_attempts (topic_key, query, status, created_at)  
+            VALUES (?, ?, ?, ?)  
+        ''', (topic_key, query, status, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))  
+        conn.commit()  
+        conn.close()  
+      
+    def count_prefetched_today(self) -> int:  
+        """  
+        统计今天已发起的预取数（用于每日预算），失败与取消的预取同样消耗了 LLM / 搜索调用，一并计入；  
+        排队中即被抢占、尚未运行的预取不计入  
+          
+        Returns:  
+            今天的预取次数  
+        """  
+        conn = sqlite3.connect(self.db_path)  
+        cursor = conn.cursor()  
+        cursor.execute('''  
+            SELECT COUNT(*) FROM prefetch_attempts WHERE created_at >= ? AND status != 'preempted'  
+        ''', (datetime.now().strftime("%Y-%m-%d 00:00:00"),))  
+        result = cursor.fetchone()  
+        conn.close()  
+        return result[0] if result else 0
@@ -0,0 +1,176 @@
+"""
+热榜 HTML 提取
+只按选择器取出少量元素的文本，不构建完整文档树。后端按可用性依次选择：
+- selectolax：C 实现的 HTML5 解析器，支持任意 CSS 选择器
+- lxml：简单选择器转换为 XPath，复杂选择器需要 cssselect
+- 标准库 html.parser 定向提取：只跟踪匹配的元素，取够数量后停止解析
+无法处理的复杂选择器回退到 BeautifulSoup。
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Set, Tuple
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
+
+try:
+    import lxml.html as lxml_html
+except ImportError:
+    lxml_html = None
+
+# 支持的简单选择器：tag、.class、tag.class、.a.b
+_SIMPLE_SELECTOR = re.compile(r"^([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)$")
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+              "param", "source", "track", "wbr"}
+_CHUNK_SIZE = 16 * 1024
+
+
+def _parse_simple_selector(selector: str) -> Optional[Tuple[Optional[str], Set[str]]]:
+    """把简单选择器解析为 (标签, 类名集合)，复杂选择器返回 None"""
+    match = _SIMPLE_SELECTOR.match(selector.strip())
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    tag = match.group(1).lower() if match.group(1) else None
+    classes = {cls for cls in match.group(2).split(".") if cls}
+    return tag, classes
+
+
+class _TargetedExtractor(HTMLParser):
+    """只收集匹配元素文本的流式解析器"""
+
+    def __init__(self, tag: Optional[str], classes: Set[str], limit: Optional[int]):
+        super().__init__(convert_charrefs=True)
+        self.tag = tag
+        self.classes = classes
+        self.limit = limit
+        self.texts: List[str] = []
+        self._depth = 0
+        self._buffer: List[str] = []
+
+    @property
+    def done(self) -> bool:
+        return self.limit is not None and len(self.texts) >= self.limit
+
+    def _matches(self, tag: str, attrs) -> bool:
+        if self.tag and tag != self.tag:
+            return False
+        if self.classes:
+            for name, value in attrs:
+                if name == "class" and value:
+                    return self.classes.issubset(value.split())
+            return False
+        return True
+
+    def handle_starttag(self, tag, attrs):
+        if self._depth:
+            if tag not in _VOID_TAGS:
+                self._depth += 1
+        elif not self.done and self._matches(tag, attrs) and tag not in _VOID_TAGS:
+            self._depth = 1
+            self._buffer = []
+
+    def handle_startendtag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        if self._depth:
+            self._depth -= 1
+            if not self._depth:
+                text = "".join(self._buffer).strip()
+                if text:
+                    self.texts.append(text)
+
+    def handle_data(self, data):
+        if self._depth:
+            self._buffer.append(data)
+
+
+def _extract_stdlib(html: str, tag: Optional[str], classes: Set[str], limit: Optional[int]) -> List[str]:
+    parser = _TargetedExtractor(tag, classes, limit)
+    for start in range(0, len(html), _CHUNK_SIZE):
+        parser.feed(html[start:start + _CHUNK_SIZE])
+        if parser.done:
+            break
+    return parser.texts[:limit] if limit is not None else parser.texts
+
+
+def _extract_selectolax(html: str, selector: str, limit: Optional[int]) -> List[str]:
+    texts = []
+    for node in SelectolaxParser(html).css(selector):
+        text = node.text(strip=False).strip()
+        if text:
+            texts.append(text)
+            if limit is not None and len(texts) >= limit:
+                break
+    return texts
+
+
+def _extract_lxml(html: str, tag: Optional[str], classes: Set[str], limit: Optional[int]) -> List[str]:
+    conditions = "".join(
+        f"[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]" for cls in sorted(classes)
+    )
+    texts = []
+    for element in lxml_html.fromstring(html).xpath(f"//{tag or '*'}{conditions}"):
+        text = element.text_content().strip()
+        if text:
+            texts.append(text)
+            if limit is not None and len(texts) >= limit:
+                break
+    return texts
+
+
+def _extract_bs4(html: str, selector: str, limit: Optional[int]) -> List[str]:
+    from bs4 import BeautifulSoup
+
+    texts = []
+    for element in BeautifulSoup(html, 'html.parser').select(selector):
+        text = element.get_text().strip()
+        if text:
+            texts.append(text)
+            if limit is not None and len(texts) >= limit:
+                break
+    return texts
+
+
+def available_backends() -> List[str]:
+    """当前环境可用的解析后端（按优先级）"""
+    backends = []
+    if SelectolaxParser is not None:
+        backends.append("selectolax")
+    if lxml_html is not None:
+        backends.append("lxml")
+    backends.append("stdlib")
+    backends.append("bs4")
+    return backends
+
+
+def extract_texts(html: str, selector: str, limit: Optional[int] = None,
+                  backend: Optional[str] = None) -> List[str]:
+    """
+    提取匹配选择器的元素文本（去除首尾空白，跳过空文本）
+
+    Args:
+        html: HTML 文本
+        selector: CSS 选择器
+        limit: 最多提取多少个，取够后停止
+        backend: 指定后端（selectolax / lxml / stdlib / bs4），默认自动选择
+
+    Returns:
+        文本列表，按文档顺序
+    """
+    simple = _parse_simple_selector(selector)
+    backend = backend or available_backends()[0]
+
+    if backend == "selectolax":
+        return _extract_selectolax(html, selector, limit)
+    if backend == "lxml" and simple is not None:
+        return _extract_lxml(html, *simple, limit)
+    if backend in ("lxml", "stdlib") and simple is not None:
+        return _extract_stdlib(html, *simple, limit)
+    return _extract_bs4(html, selector, limit)
@@ -0,0 +1,43 @@
+"""
+热点话题稳定 ID
+ID 由平台标识与规范化标题（或平台原生 ID，如 B站 bvid）的哈希派生，
+同一话题在多次爬取间排名变化时 ID 保持不变，可用于历史关联、研究结果缓存与增量入库
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Any, Optional
+
+# 去掉空白、标点与符号（保留中日韩文字、字母与数字）
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize_title(title: str) -> str:
+    """
+    规范化话题标题：NFKC、小写、去掉空白与标点（"#某事件#"、"某 事件！" 视为同一标题）
+
+    Args:
+        title: 原始标题
+
+    Returns:
+        规范化后的标题
+    """
+    return _NON_WORD.sub("", unicodedata.normalize("NFKC", title).lower())
+
+
+def make_topic_id(platform: str, title: str, native_id: Optional[Any] = None) -> str:
+    """
+    生成稳定的话题 ID
+
+    Args:
+        platform: 平台标识（如 baidu、bilibili）
+        title: 话题标题
+        native_id: 平台原生 ID（如 bvid），提供时优先使用
+
+    Returns:
+        形如 "bilibili_3f2a9c0d1e4b" 的 ID
+    """
+    key = str(native_id) if native_id not in (None, "") else normalize_title(title) or title
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+    return f"{platform}_{digest}"
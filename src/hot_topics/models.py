@@ -1,5 +1,5 @@
 from dataclasses import dataclass  
-from typing import List  
+from typing import List, Optional  
   
 @dataclass  
 class HotTopic:  
@@ -10,4 +10,5 @@ class HotTopic:
     hot_value: int  
     url: str  
     timestamp: str  
-    rank: int
\ No newline at end of file
+    rank: int  
+    cluster_id: Optional[str] = None  # 跨平台同一事件的簇 ID
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+热榜平台注册表
+新增平台时在本包中添加一个适配器模块并用 @register_platform 注册，爬取与调度逻辑无需修改
+"""
+
+from typing import Dict, List, Optional, Type
+
+from .base import HtmlListAdapter, JsonListAdapter, PlatformAdapter, get_path, parse_hot_value
+
+PLATFORM_REGISTRY: Dict[str, Type[PlatformAdapter]] = {}
+
+
+def register_platform(cls: Type[PlatformAdapter]) -> Type[PlatformAdapter]:
+    """注册平台适配器（类装饰器）"""
+    if not cls.name:
+        raise ValueError(f"{cls.__name__} 未设置平台标识 name")
+    PLATFORM_REGISTRY[cls.name] = cls
+    return cls
+
+
+def create_adapters(names: Optional[List[str]] = None) -> Dict[str, PlatformAdapter]:
+    """
+    创建平台适配器实例
+
+    Args:
+        names: 启用的平台标识，None 表示默认启用的平台（default_enabled 为 True，即百度与 B站）
+
+    Returns:
+        {平台标识: 适配器实例}
+    """
+    if names is None:
+        names = [name for name, cls in PLATFORM_REGISTRY.items() if cls.default_enabled]
+    unknown = [name for name in names if name not in PLATFORM_REGISTRY]
+    if unknown:
+        raise ValueError(f"未知的热榜平台: {', '.join(unknown)}")
+    return {name: PLATFORM_REGISTRY[name]() for name in names}
+
+
+# 注册内置平台
+from . import baidu, bilibili, weibo, zhihu, douyin, toutiao  # noqa: E402,F401
+
+__all__ = [
+    "PLATFORM_REGISTRY",
+    "register_platform",
+    "create_adapters",
+    "PlatformAdapter",
+    "JsonListAdapter",
+    "HtmlListAdapter",
+    "get_path",
+    "parse_hot_value",
+]
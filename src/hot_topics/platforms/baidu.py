@@ -0,0 +1,14 @@
+"""百度热榜"""
+
+from . import register_platform
+from .base import HtmlListAdapter
+
+
+@register_platform
+class BaiduAdapter(HtmlListAdapter):
+    name = "baidu"
+    display_name = "百度"
+    default_enabled = True
+    url = "http://top.baidu.com/buzz?b=1&c=513&fr=topbuzz_b1_c513"
+    selector = ".c-single-text-ellipsis"
+    url_template = "https://www.baidu.com/s?wd={title}"
@@ -0,0 +1,148 @@
+"""
+热榜平台适配器基类
+每个平台只声明请求地址、调度参数与解析规则，请求、限速、条件请求与 HotTopic 构造由 HotTopicCrawler 统一处理
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+from ..html_extract import extract_texts
+from ..ids import make_topic_id
+from ..models import HotTopic
+
+
+def get_path(data: Any, path: str, default: Any = None) -> Any:
+    """按点分路径取值，例如 get_path(data, "data.list")"""
+    for key in path.split("."):
+        if isinstance(data, dict):
+            data = data.get(key)
+        elif isinstance(data, list) and key.isdigit() and int(key) < len(data):
+            data = data[int(key)]
+        else:
+            return default
+        if data is None:
+            return default
+    return data
+
+
+_HOT_VALUE_PATTERN = re.compile(r"([\d.]+)\s*(万|亿)?")
+
+
+def parse_hot_value(value: Any) -> int:
+    """
+    解析热度值，支持数字与 "123万热度"、"1.2亿" 等文本
+
+    Args:
+        value: 原始热度值
+
+    Returns:
+        整数热度值，无法解析时返回 0
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _HOT_VALUE_PATTERN.search(str(value or ""))
+    if not match:
+        return 0
+    number = float(match.group(1))
+    unit = {"万": 10_000, "亿": 100_000_000}.get(match.group(2), 1)
+    return int(number * unit)
+
+
+class PlatformAdapter:
+    """平台适配器基类"""
+
+    name: str = ""                      # 平台标识，注册表的键
+    display_name: str = ""              # 入库使用的平台名称（HotTopic.platform）
+    url: str = ""                       # 热榜地址
+    headers: Dict[str, str] = {}        # 额外请求头
+    interval: Optional[int] = None      # 刷新间隔（秒），None 表示使用调度器默认值
+    timeout: float = 10                 # 请求超时（秒）
+    min_request_interval: float = 10    # 两次请求的最小间隔（秒），限速
+    max_items: int = 20                 # 最多保留的话题数
+    default_enabled: bool = False       # 未指定启用平台时是否启用（只有无需登录或签名、已验证可用的平台为 True）
+
+    def parse(self, response) -> List[Dict[str, Any]]:
+        """
+        解析响应
+
+        Args:
+            response: requests.Response
+
+        Returns:
+            按排名排序的条目列表，每项包含 title，可选 hot_value、url、native_id（平台原生 ID）
+        """
+        raise NotImplementedError
+
+    def topic_url(self, title: str, item: Any) -> str:
+        """话题链接，默认使用百度搜索"""
+        return f"https://www.baidu.com/s?wd={quote(title)}"
+
+    def build_topics(self, items: List[Dict[str, Any]]) -> List[HotTopic]:
+        """把解析出的条目转换为 HotTopic 列表，ID 由标题或原生 ID 派生，重复话题只保留排名靠前的一条"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        topics = []
+        seen = set()
+        for item in items:
+            if len(topics) >= self.max_items:
+                break
+            topic_id = make_topic_id(self.name, item["title"], item.get("native_id"))
+            if topic_id in seen:
+                continue
+            seen.add(topic_id)
+            i = len(topics)
+            topics.append(HotTopic(
+                id=topic_id,
+                title=item["title"],
+                platform=self.display_name,
+                hot_value=item["hot_value"] if item.get("hot_value") is not None else 10000 - i * 100,  # 无热度值时按排名模拟
+                url=item.get("url") or self.topic_url(item["title"], item),
+                timestamp=timestamp,
+                rank=i + 1
+            ))
+        return topics
+
+
+class JsonListAdapter(PlatformAdapter):
+    """声明式 JSON 榜单适配器"""
+
+    list_path: str = ""                 # 榜单列表在 JSON 中的点分路径
+    title_field: str = "title"          # 标题字段（点分路径）
+    hot_field: Optional[str] = None     # 热度字段（点分路径），None 表示按排名模拟
+    id_field: Optional[str] = None      # 平台原生 ID 字段（点分路径），None 表示按标题派生 ID
+    url_field: Optional[str] = None     # 链接字段（点分路径），优先于 url_template
+    url_template: Optional[str] = None  # 链接模板，可用 {title}（已 URL 编码）与 {item[...]}
+
+    def parse(self, response) -> List[Dict[str, Any]]:
+        items = []
+        for raw in get_path(response.json(), self.list_path, []) or []:
+            title = str(get_path(raw, self.title_field, "") or "").strip()
+            if not title:
+                continue
+            url = get_path(raw, self.url_field) if self.url_field else None
+            if not url and self.url_template:
+                url = self.url_template.format(title=quote(title), item=raw)
+            items.append({
+                "title": title,
+                "hot_value": parse_hot_value(get_path(raw, self.hot_field)) if self.hot_field else None,
+                "url": url,
+                "native_id": get_path(raw, self.id_field) if self.id_field else None,
+            })
+        return items
+
+
+class HtmlListAdapter(PlatformAdapter):
+    """声明式 HTML 榜单适配器：按 CSS 选择器提取标题，不构建完整文档树"""
+
+    selector: str = ""                  # 标题元素的 CSS 选择器（简单选择器可走最快路径）
+    url_template: Optional[str] = None  # 链接模板，可用 {title}（已 URL 编码）
+
+    def parse(self, response) -> List[Dict[str, Any]]:
+        return [
+            {
+                "title": title,
+                "url": self.url_template.format(title=quote(title)) if self.url_template else None,
+            }
+            for title in extract_texts(response.text, self.selector, limit=self.max_items)
+        ]
@@ -0,0 +1,16 @@
+"""B站排行榜"""
+
+from . import register_platform
+from .base import JsonListAdapter
+
+
+@register_platform
+class BilibiliAdapter(JsonListAdapter):
+    name = "bilibili"
+    display_name = "B站"
+    default_enabled = True
+    url = "https://api.bilibili.com/x/web-interface/ranking/v2"
+    list_path = "data.list"
+    hot_field = "stat.view"
+    id_field = "bvid"
+    url_template = "https://www.bilibili.com/video/{item[bvid]}"
@@ -0,0 +1,16 @@
+"""抖音热榜（接口要求签名参数，默认不启用，可通过 hot_topics_platforms 手动启用）"""
+
+from . import register_platform
+from .base import JsonListAdapter
+
+
+@register_platform
+class DouyinAdapter(JsonListAdapter):
+    name = "douyin"
+    display_name = "抖音"
+    url = "https://www.douyin.com/aweme/v1/web/hot/search/list/"
+    headers = {"Referer": "https://www.douyin.com/"}
+    list_path = "data.word_list"
+    title_field = "word"
+    hot_field = "hot_value"
+    url_template = "https://www.douyin.com/search/{title}"
@@ -0,0 +1,16 @@
+"""今日头条热榜（未经验证，默认不启用，可通过 hot_topics_platforms 启用）"""
+
+from . import register_platform
+from .base import JsonListAdapter
+
+
+@register_platform
+class ToutiaoAdapter(JsonListAdapter):
+    name = "toutiao"
+    display_name = "头条"
+    url = "https://www.toutiao.com/hot-event/hot-board/?origin=toutiao_pc"
+    list_path = "data"
+    title_field = "Title"
+    hot_field = "HotValue"
+    url_field = "Url"
+    url_template = "https://www.toutiao.com/search/?keyword={title}"
@@ -0,0 +1,16 @@
+"""微博热搜（未经验证，默认不启用，可通过 hot_topics_platforms 启用）"""
+
+from . import register_platform
+from .base import JsonListAdapter
+
+
+@register_platform
+class WeiboAdapter(JsonListAdapter):
+    name = "weibo"
+    display_name = "微博"
+    url = "https://weibo.com/ajax/side/hotSearch"
+    headers = {"Referer": "https://weibo.com/"}
+    list_path = "data.realtime"
+    title_field = "word"
+    hot_field = "num"
+    url_template = "https://s.weibo.com/weibo?q=%23{title}%23"
@@ -0,0 +1,17 @@
+"""知乎热榜（接口需要登录 Cookie，默认不启用，需在 headers 中配置 Cookie 后通过 hot_topics_platforms 启用）"""
+
+from . import register_platform
+from .base import JsonListAdapter
+
+
+@register_platform
+class ZhihuAdapter(JsonListAdapter):
+    name = "zhihu"
+    display_name = "知乎"
+    url = "https://www.zhihu.com/api/v3/feed/topstory/hot-lists/total?limit=50"
+    interval = 600
+    list_path = "data"
+    title_field = "target.title"
+    hot_field = "detail_text"  # 例如 "1234 万热度"
+    id_field = "target.id"
+    url_template = "https://www.zhihu.com/question/{item[target][id]}"
@@ -0,0 +1,272 @@
+"""
+热榜后台爬取调度器
+按平台独立调度爬取，结果写入数据库，页面与 API 只读数据库：
+- 每个平台有自己的刷新间隔（配置 > 适配器声明 > Config.hot_topics_refresh_interval），并加入随机抖动避免同时请求
+- 各平台在爬虫的线程池中并发爬取，慢平台不会拖延其他平台
+- 爬取失败（异常或返回空列表）时按指数退避重试，成功后恢复正常间隔
+- 以数据库中的最近爬取时间为准，多个进程或手动刷新不会在间隔内重复请求上游站点
+- 热榜变化后对全部当前话题做跨平台聚类，写回 cluster_id；配置了全文索引时同时索引新上榜的话题
+"""
+
+import argparse
+import random
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+from .clustering import TopicClusterer
+from .crawler import HotTopicCrawler
+from .database import DatabaseManager
+from ..storage.search_index import SearchIndex
+
+
+class _PlatformState:
+    """单个平台的调度状态"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.next_due = 0.0
+        self.failures = 0
+        self.last_attempt: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+
+class CrawlScheduler:
+    """按平台调度的后台热榜爬取"""
+
+    def __init__(self, crawler: HotTopicCrawler, db: DatabaseManager, interval: int = 300,
+                 platform_intervals: Optional[Dict[str, int]] = None, jitter: float = 0.1,
+                 max_backoff: int = 3600, min_refresh_interval: int = 60,
+                 clusterer: Optional[TopicClusterer] = None, search_index: Optional[SearchIndex] = None):
+        """
+        初始化爬取调度器
+
+        Args:
+            crawler: 热榜爬虫
+            db: 热榜数据库
+            interval: 默认刷新间隔（秒），适配器声明了 interval 时以适配器为准
+            platform_intervals: 按平台标识覆盖刷新间隔，例如 {"bilibili": 600}
+            jitter: 间隔随机抖动比例（0.1 表示 ±10%）
+            max_backoff: 失败退避的最长间隔（秒）
+            min_refresh_interval: 手动刷新的最小间隔（秒），间隔内爬取过（无论成败）的平台直接使用已有数据
+            clusterer: 跨平台话题聚类器，默认使用 TopicClusterer()
+            search_index: 话题与报告全文索引，None 表示不索引
+        """
+        self.crawler = crawler
+        self.db = db
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.min_refresh_interval = min_refresh_interval
+        self.clusterer = clusterer or TopicClusterer()
+        self.clusterer.attach(db)
+        self.search_index = search_index
+        if search_index is not None:
+            search_index.attach(db)
+
+        platform_intervals = platform_intervals or {}
+        self._states = {
+            platform: _PlatformState(platform_intervals.get(platform, adapter.interval or interval))
+            for platform, adapter in crawler.adapters.items()
+        }
+        self._lock = threading.RLock()
+        self._in_flight: Dict[str, Future] = {}
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---------- 调度 ----------
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _last_crawl_times(self) -> Dict[str, float]:
+        """数据库中各平台最近一次成功爬取的时间戳（按平台标识）"""
+        crawl_times = self.db.get_platform_crawl_times()
+        result = {}
+        for platform in self._states:
+            crawl_time = crawl_times.get(self.crawler.platform_names.get(platform, platform))
+            if crawl_time:
+                result[platform] = datetime.strptime(crawl_time, "%Y-%m-%d %H:%M:%S").timestamp()
+        return result
+
+    def _sync_from_db(self):
+        """按数据库中的最近爬取时间推迟调度，避免重启或其他进程刚爬取后重复请求（在锁内调用）"""
+        for platform, last_crawl in self._last_crawl_times().items():
+            if platform in self._in_flight:
+                continue
+            state = self._states[platform]
+            if state.last_success is None or last_crawl > state.last_success:
+                state.last_success = last_crawl
+            if state.failures == 0:
+                state.next_due = max(state.next_due, last_crawl + state.interval)
+
+    def _crawl(self, platform: str) -> int:
+        """爬取单个平台并写入数据库，返回写入的话题数（失败或榜单未变化返回 0）"""
+        state = self._states[platform]
+        state.last_attempt = time.time()
+        try:
+            topics = self.crawler.platforms[platform]()
+            if topics is not None and not topics:
+                raise RuntimeError("未获取到话题")
+        except Exception as e:
+            state.failures += 1
+            state.last_error = str(e)
+            backoff = min(state.interval * 2 ** state.failures, self.max_backoff)
+            state.next_due = time.time() + self._jittered(backoff)
+            print(f"[crawl] {platform} 爬取失败（连续 {state.failures} 次），{backoff:.0f} 秒后重试: {e}")
+            return 0
+
+        platform_name = self.crawler.platform_names.get(platform, platform)
+        if topics is None:
+            # 上游内容未变化：跳过解析与入库，只记录爬取时间
+            self.db.record_crawl(platform_name)
+            changed = False
+        else:
+            changed = self.db.save_platform_topics(platform_name, topics)
+        state.failures = 0
+        state.last_error = None
+        state.last_success = time.time()
+        state.next_due = state.last_success + self._jittered(state.interval)
+        if not changed:
+            print(f"[crawl] {platform} 热榜未变化")
+            return 0
+        print(f"[crawl] {platform} 爬取完成，获取{len(topics)}个话题")
+        return len(topics)
+
+    def _submit(self, platform: str) -> Future:
+        """把平台爬取提交到爬虫线程池（在锁内调用），已在爬取中的平台返回进行中的任务"""
+        future = self._in_flight.get(platform)
+        if future is None:
+            future = self.crawler.executor.submit(self._crawl, platform)
+            self._in_flight[platform] = future
+            future.add_done_callback(lambda _, platform=platform: self._finish(platform))
+        return future
+
+    def _finish(self, platform: str):
+        with self._lock:
+            self._in_flight.pop(platform, None)
+        self._wakeup.set()
+
+    def run_pending(self, wait: bool = True) -> Dict[str, int]:
+        """
+        并发爬取所有已到期的平台
+
+        Args:
+            wait: 是否等待爬取完成（后台循环不等待，完成后自行唤醒）
+
+        Returns:
+            {平台标识: 写入的话题数}，wait=False 时返回空字典
+        """
+        with self._lock:
+            self._sync_from_db()
+            now = time.time()
+            futures = {
+                platform: self._submit(platform)
+                for platform, state in self._states.items()
+                if state.next_due <= now and platform not in self._in_flight
+            }
+        if not wait:
+            return {}
+        return {platform: future.result() for platform, future in futures.items()}
+
+    def refresh(self, platforms: Optional[List[str]] = None, force: bool = False) -> Dict[str, int]:
+        """
+        立即刷新（手动刷新按钮使用），min_refresh_interval 内已爬取过的平台会被跳过
+
+        Args:
+            platforms: 要刷新的平台标识，默认全部
+            force: 忽略 min_refresh_interval
+
+        Returns:
+            {平台标识: 写入的话题数}，只包含本次实际爬取的平台
+        """
+        with self._lock:
+            self._sync_from_db()
+            now = time.time()
+            futures = {}
+            for platform in platforms or list(self._states):
+                state = self._states[platform]
+                last_attempt = max(state.last_attempt or 0, state.last_success or 0)
+                if platform not in self._in_flight and not force and now - last_attempt < self.min_refresh_interval:
+                    continue
+                futures[platform] = self._submit(platform)
+        return {platform: future.result() for platform, future in futures.items()}
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_pending(wait=False)
+            except Exception as e:
+                print(f"[crawl] 调度循环异常: {e}")
+            with self._lock:
+                pending = [state.next_due for platform, state in self._states.items()
+                           if platform not in self._in_flight]
+            next_due = min(pending) if pending else time.time() + 60
+            self._wakeup.wait(max(1.0, next_due - time.time()))
+            self._wakeup.clear()
+
+    def start(self):
+        """启动后台爬取线程"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, daemon=True, name="hot-topic-crawler")
+            self._thread.start()
+
+    def stop(self):
+        """停止后台爬取线程"""
+        self._stop.set()
+        self._wakeup.set()
+
+    def status(self) -> Dict[str, Dict]:
+        """
+        各平台调度状态
+
+        Returns:
+            {平台标识: {"interval", "next_crawl", "last_success", "failures", "last_error"}}
+        """
+        def fmt(timestamp: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S") if timestamp else None
+
+        return {
+            platform: {
+                "interval": state.interval,
+                "next_crawl": fmt(state.next_due),
+                "last_success": fmt(state.last_success),
+                "failures": state.failures,
+                "last_error": state.last_error,
+            }
+            for platform, state in self._states.items()
+        }
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口：独立运行后台爬取"""
+    parser = argparse.ArgumentParser(description="热榜后台爬取")
+    parser.add_argument("--db", default="hot_topics.db", help="热榜数据库路径")
+    parser.add_argument("--interval", type=int, default=300, help="默认刷新间隔（秒）")
+    parser.add_argument("--platforms", default=None, help="启用的平台标识，逗号分隔，默认全部")
+    parser.add_argument("--once", action="store_true", help="只爬取一次已到期的平台后退出")
+    parser.add_argument("--search-index", default="cache/search_index.db", help="全文索引路径，传空字符串关闭")
+    args = parser.parse_args(argv)
+
+    platforms = args.platforms.split(",") if args.platforms else None
+    search_index = SearchIndex(args.search_index) if args.search_index else None
+    scheduler = CrawlScheduler(HotTopicCrawler(platforms), DatabaseManager(args.db), interval=args.interval,
+                               search_index=search_index)
+    if args.once:
+        print(scheduler.run_pending())
+        return
+
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+热榜趋势计算
+把话题历史载入 NumPy 数组，一次批量计算每个话题的热度速度、加速度、排名变化与跨平台归一化热度，
+用于按"上升最快"排序。历史表只记录变化，按固定时间步长对齐后前向填充；
+只读取当前上榜话题在两个窗口内的记录，历史积累数周（每 5 分钟一次快照）也只需几毫秒。
+"""
+
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .database import DatabaseManager
+from .models import HotTopic
+
+# 综合趋势分的权重：归一化热度、热度相对增长、排名上升
+_SCORE_WEIGHTS = (0.4, 0.4, 0.2)
+
+SORT_KEYS = ("trend_score", "growth", "velocity", "acceleration", "rank_delta", "heat_score")
+
+
+@dataclass
+class TopicTrend:
+    """话题趋势"""
+    topic: HotTopic
+    velocity: float       # 最近一个窗口内热度值的变化速度（每小时）
+    acceleration: float   # 速度相对上一个窗口的变化（每小时²）
+    growth: float         # 最近一个窗口内热度的相对增长，与平台量纲无关，可跨平台比较
+    rank_delta: int       # 最近一个窗口内排名上升的名次，新上榜按"榜单长度 + 1"计
+    heat_score: float     # 平台内热度百分位（0~1），不同平台的热度量纲不同，只比较相对位置
+    trend_score: float    # 综合趋势分
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self.topic)
+        data.update(
+            velocity=round(self.velocity, 2),
+            acceleration=round(self.acceleration, 2),
+            growth=round(self.growth, 4),
+            rank_delta=self.rank_delta,
+            heat_score=round(self.heat_score, 4),
+            trend_score=round(self.trend_score, 4),
+        )
+        return data
+
+
+def _group_sorted(codes: np.ndarray, values: np.ndarray):
+    """按平台分组并在组内按值升序排序，返回 (排序下标, 组内位置, 各组大小, 各组起点)"""
+    order = np.lexsort((values, codes))
+    counts = np.bincount(codes)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    positions = np.empty(len(codes), dtype=np.int64)
+    positions[order] = np.arange(len(codes)) - starts[codes[order]]
+    return order, positions, counts, starts
+
+
+def compute_trends(topics: List[HotTopic], history: List[tuple], window: int = 3600,
+                   step: int = 300, now: Optional[datetime] = None) -> List[TopicTrend]:
+    """
+    计算话题趋势
+
+    Args:
+        topics: 当前话题列表
+        history: DatabaseManager.get_topic_history 的返回值，需覆盖 now 之前两个窗口
+        window: 速度窗口（秒）
+        step: 时间对齐步长（秒），与爬取间隔一致即可
+        now: 计算时刻，默认当前时间
+
+    Returns:
+        与 topics 顺序一致的趋势列表
+    """
+    if not topics:
+        return []
+    now = now or datetime.now()
+    width = max(1, round(window / step))       # 一个窗口包含的步数
+    num_bins = 2 * width + 1
+    hours = width * step / 3600
+
+    # 第 k 列表示时刻 bins[k] 的状态：bins[k] 之前的最后一条记录
+    end = np.datetime64(now.replace(microsecond=0), "s").astype(np.int64)
+    bins = end - step * np.arange(num_bins - 1, -1, -1, dtype=np.int64)
+
+    index = {topic.id: i for i, topic in enumerate(topics)}
+    current_hot = np.array([topic.hot_value or 0 for topic in topics], dtype=np.float64)
+    current_rank = np.array([topic.rank or 0 for topic in topics], dtype=np.float64)
+    hot = np.full((len(topics), num_bins), np.nan)
+    rank = np.full((len(topics), num_bins), np.nan)
+    observed = np.zeros((len(topics), num_bins), dtype=bool)
+
+    rows = [row for row in history if row[0] in index]
+    if rows:
+        row_topic = np.fromiter((index[row[0]] for row in rows), dtype=np.int64, count=len(rows))
+        row_rank = np.array([row[2] for row in rows], dtype=np.float64)   # None → nan（落榜）
+        row_hot = np.array([row[3] for row in rows], dtype=np.float64)
+        row_time = np.array([row[4] for row in rows], dtype="datetime64[s]").astype(np.int64)
+        row_bin = np.minimum(np.searchsorted(bins, row_time, side="left"), num_bins - 1)
+
+        # 同一格内有多条记录时取最后一条（记录按时间升序）
+        cell = row_topic * num_bins + row_bin
+        _, last = np.unique(cell[::-1], return_index=True)
+        last = len(cell) - 1 - last
+        hot[row_topic[last], row_bin[last]] = row_hot[last]
+        rank[row_topic[last], row_bin[last]] = row_rank[last]
+        observed[row_topic[last], row_bin[last]] = True
+
+    # 前向填充：每格取不晚于它的最后一次观测
+    source = np.maximum.accumulate(np.where(observed, np.arange(num_bins), 0), axis=1)
+    row_ids = np.arange(len(topics))[:, None]
+    seen = observed[row_ids, source]
+    hot = np.where(seen, hot[row_ids, source], np.nan)
+    rank = np.where(seen, rank[row_ids, source], np.nan)
+
+    # 没有任何历史的话题（历史表启用前入库）无法判断趋势，视为一直保持当前状态
+    no_history = ~observed.any(axis=1)
+    hot[no_history] = current_hot[no_history, None]
+    rank[no_history] = current_rank[no_history, None]
+    # 最后一格以当前榜单为准
+    hot[:, -1] = current_hot
+    rank[:, -1] = current_rank
+
+    # 按平台分组：热度百分位、热度中位数与榜单长度
+    _, codes = np.unique([topic.platform for topic in topics], return_inverse=True)
+    codes = codes.astype(np.int64)
+    order, positions, counts, starts = _group_sorted(codes, current_hot)
+    sizes = counts[codes]
+    heat_score = np.where(sizes > 1, positions / np.maximum(sizes - 1, 1), 1.0)
+    median_hot = current_hot[order[starts + (counts - 1) // 2]][codes]
+
+    # 不在榜上时热度按 0、排名按榜单长度 + 1 计
+    hot = np.nan_to_num(hot, nan=0.0)
+    rank = np.where(np.isnan(rank), (sizes + 1)[:, None], rank)
+
+    hot_now, hot_mid, hot_start = hot[:, -1], hot[:, -1 - width], hot[:, 0]
+    velocity = (hot_now - hot_mid) / hours
+    acceleration = (velocity - (hot_mid - hot_start) / hours) / hours
+    rank_delta = rank[:, -1 - width] - rank[:, -1]
+
+    # 相对增长以平台热度中位数为下限，新上榜话题不会因基数为 0 而无穷大
+    growth = (hot_now - hot_mid) / np.maximum(np.maximum(hot_mid, median_hot), 1.0)
+    momentum = np.clip(rank_delta / sizes, -1.0, 1.0)
+    heat_weight, growth_weight, rank_weight = _SCORE_WEIGHTS
+    trend_score = heat_weight * heat_score + growth_weight * np.tanh(growth) + rank_weight * momentum
+
+    return [
+        TopicTrend(
+            topic=topic,
+            velocity=float(velocity[i]),
+            acceleration=float(acceleration[i]),
+            growth=float(growth[i]),
+            rank_delta=int(rank_delta[i]),
+            heat_score=float(heat_score[i]),
+            trend_score=float(trend_score[i]),
+        )
+        for i, topic in enumerate(topics)
+    ]
+
+
+def get_trending_topics(db: DatabaseManager, window: int = 3600, step: int = 300,
+                        sort_by: str = "trend_score", platform: Optional[str] = None,
+                        limit: Optional[int] = None) -> List[TopicTrend]:
+    """
+    查询当前话题的趋势并排序
+
+    Args:
+        db: 数据库管理器
+        window: 速度窗口（秒）
+        step: 时间对齐步长（秒）
+        sort_by: 排序字段，见 SORT_KEYS
+        platform: 只返回指定平台（归一化仍在全部话题上计算）
+        limit: 最多返回多少个
+
+    Returns:
+        按 sort_by 降序排列的趋势列表
+    """
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"不支持的排序字段: {sort_by}，可选: {', '.join(SORT_KEYS)}")
+    now = datetime.now()
+    since = (now - timedelta(seconds=2 * window + step)).strftime("%Y-%m-%d %H:%M:%S")
+    trends = compute_trends(db.get_all_topics(), db.get_topic_history(since), window, step, now)
+    if platform:
+        trends = [trend for trend in trends if trend.topic.platform == platform]
+    trends.sort(key=lambda trend: getattr(trend, sort_by), reverse=True)
+    return trends[:limit] if limit else trends
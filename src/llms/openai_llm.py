@@ -9,6 +9,8 @@ from typing import Optional, Dict, Any, List
 from openai import OpenAI  
 import json  
   
+from ..utils.cancellation import CancellationToken, ResearchCancelled  
+  
   
 class OpenAILLM:  
     """OpenAI LLM 客户端"""  
@@ -24,6 +26,7 @@ class OpenAILLM:
         """  
         self.api_key = api_key  
         self.model_name = model_name  
+        self.request_timeout = 600.0  
           
         # 初始化 OpenAI 客户端  
         if base_url:  
@@ -38,11 +41,12 @@ class OpenAILLM:
         Args:  
             messages: 消息列表,格式为 [{"role": "system", "content": "..."}, {"role": "user", "content": "..."}]  
             json_schema: JSON Schema 定义,用于结构化输出  
-            **kwargs: 其他参数(temperature, max_tokens 等)  
+            **kwargs: 其他参数(temperature, max_tokens, timeout, cancel_token 等)  
               
         Returns:  
             解析后的 JSON 对象(如果提供了 json_schema)或字符串响应  
         """  
+        cancel_token = kwargs.get("cancel_token")  
         try:  
             # 构建请求参数  
             params = {  
@@ -63,25 +67,67 @@ class OpenAILLM:
                     }  
                 }  
               
-            # 调用 OpenAI API  
-            response = self.client.chat.completions.create(**params)  
-              
-            # 提取响应内容  
-            if response.choices and response.choices[0].message:  
-                content = response.choices[0].message.content  
+            # 有取消令牌时走流式请求,以便取消时能中断进行中的 HTTP 连接  
+            if cancel_token is not None:  
+                content = self._chat_cancellable(params, cancel_token, kwargs.get("timeout"))  
+            else:  
+                # 调用 OpenAI API  
+                response = self.client.chat.completions.create(**params)  
                   
-                # 如果使用了 JSON Schema,解析 JSON  
-                if json_schema:  
-                    return json.loads(content)  
+                # 提取响应内容  
+                if response.choices and response.choices[0].message:  
+                    content = response.choices[0].message.content  
                 else:  
-                    return content  
+                    raise Exception("OpenAI API 返回空响应")  
+              
+            # 如果使用了 JSON Schema,解析 JSON  
+            if json_schema:  
+                return json.loads(content)  
             else:  
-                raise Exception("OpenAI API 返回空响应")  
+                return content  
                   
+        except ResearchCancelled:  
+            raise  
         except Exception as e:  
+            if cancel_token is not None and cancel_token.cancelled:  
+                raise ResearchCancelled(cancel_token.reason or "cancelled") from e  
             print(f"OpenAI API 调用错误: {str(e)}")  
             raise e  
       
+    def _chat_cancellable(self, params: Dict[str, Any], cancel_token: CancellationToken,  
+                          timeout: Optional[float] = None) -> str:  
+        """  
+        以流式方式调用 LLM,取消令牌触发时关闭连接  
+          
+        Args:  
+            params: chat.completions.create 的请求参数  
+            cancel_token: 取消令牌  
+            timeout: 单次请求超时(秒),会被截止时间进一步收紧  
+              
+        Returns:  
+            拼接后的完整响应文本  
+        """  
+        stream = self.client.chat.completions.create(  
+            **params,  
+            stream=True,  
+            timeout=cancel_token.bound_timeout(timeout or self.request_timeout)  
+        )  
+        remove_callback = cancel_token.add_callback(stream.close)  
+        try:  
+            parts = []  
+            for chunk in stream:  
+                cancel_token.check()  
+                if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:  
+                    parts.append(chunk.choices[0].delta.content)  
+        finally:  
+            remove_callback()  
+            stream.close()  
+          
+        cancel_token.check()  
+        if not parts:  
+            raise Exception("OpenAI API 返回空响应")  
+        return "".join(parts)  
+      
     def get_model_info(self) -> str:  
         """返回模型信息"""  
         return f"OpenAI ({self.model_name})"
\ No newline at end of file
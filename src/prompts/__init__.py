@@ -8,12 +8,16 @@ from .prompts import (
     SYSTEM_PROMPT_FIRST_SEARCH,
     SYSTEM_PROMPT_FIRST_SUMMARY,
     SYSTEM_PROMPT_REFLECTION,
+    SYSTEM_PROMPT_REFLECTION_MULTI,
     SYSTEM_PROMPT_REFLECTION_SUMMARY,
+    SYSTEM_PROMPT_REFRESH_SUMMARY,
+    SYSTEM_PROMPT_SOURCE_NOTES,
     SYSTEM_PROMPT_REPORT_FORMATTING,
     output_schema_report_structure,
     output_schema_first_search,
     output_schema_first_summary,
     output_schema_reflection,
+    output_schema_reflection_multi,
     output_schema_reflection_summary,
     input_schema_report_formatting
 )
@@ -23,12 +27,16 @@ __all__ = [
     "SYSTEM_PROMPT_FIRST_SEARCH", 
     "SYSTEM_PROMPT_FIRST_SUMMARY",
     "SYSTEM_PROMPT_REFLECTION",
+    "SYSTEM_PROMPT_REFLECTION_MULTI",
     "SYSTEM_PROMPT_REFLECTION_SUMMARY",
+    "SYSTEM_PROMPT_REFRESH_SUMMARY",
+    "SYSTEM_PROMPT_SOURCE_NOTES",
     "SYSTEM_PROMPT_REPORT_FORMATTING",
     "output_schema_report_structure",
     "output_schema_first_search",
     "output_schema_first_summary", 
     "output_schema_reflection",
+    "output_schema_reflection_multi",
     "output_schema_reflection_summary",
     "input_schema_report_formatting"
 ]
@@ -78,6 +78,18 @@ output_schema_reflection = {
     }
 }
 
+# 多查询反思输出Schema
+output_schema_reflection_multi = {
+    "type": "object",
+    "properties": {
+        "search_queries": {
+            "type": "array",
+            "items": {"type": "string"}
+        },
+        "reasoning": {"type": "string"}
+    }
+}
+
 # 反思总结输入Schema
 input_schema_reflection_summary = {
     "type": "object",
@@ -101,6 +113,24 @@ output_schema_reflection_summary = {
     }
 }
 
+# 来源笔记输入Schema
+input_schema_source_notes = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "url": {"type": "string"},
+        "content": {"type": "string"}
+    }
+}
+
+# 来源笔记输出Schema
+output_schema_source_notes = {
+    "type": "object",
+    "properties": {
+        "notes": {"type": "string"}
+    }
+}
+
 # 报告格式化输入Schema
 input_schema_report_formatting = {
     "type": "array",
@@ -216,6 +246,24 @@ SYSTEM_PROMPT_REFLECTION = f"""
 只返回符合 JSON schema 的 JSON 对象。
 """
 
+# 一次反思提出多个互补查询的系统提示词（查询并发执行，由反思总结一次整合）
+SYSTEM_PROMPT_REFLECTION_MULTI = f"""
+你是一位资深社媒分析师。你将获得段落标题、热点话题信息，预期内容以及该段落当前的最新状态，请反思当前段落遗漏了哪些重要的社媒维度或证据，并一次提出多个搜索查询（数量见输入中的"查询数量"）以补强分析。  
+这些查询会同时执行，请让它们彼此互补：每个查询针对一个不同的盲点（如不同平台、不同时间窗口、高传播帖/视频、关键账号、误导信息或官方回应），不要提出同义改写的查询。  
+
+输入/输出格式参考（保留原有 JSON schema 定义）：  
+
+<INPUT JSON SCHEMA>
+{json.dumps(input_schema_reflection, indent=2, ensure_ascii=False)}
+</INPUT JSON SCHEMA>
+
+<OUTPUT JSON SCHEMA>
+{json.dumps(output_schema_reflection_multi, indent=2, ensure_ascii=False)}
+</OUTPUT JSON SCHEMA>
+
+只返回符合 JSON schema 的 JSON 对象。
+"""
+
 # 反思总结的系统提示词（合并新证据以更新段落）
 SYSTEM_PROMPT_REFLECTION_SUMMARY = f"""
 你是一位资深社媒舆情分析师。你将获得反思阶段的搜索查询、搜索结果以及段落的当前最新状态。你的任务是用新搜索结果补强并更新段落最新状态（不要删除已有关键信息，仅在其基础上补充）。  
@@ -234,6 +282,44 @@ SYSTEM_PROMPT_REFLECTION_SUMMARY = f"""
 只返回符合 JSON schema 的 JSON 对象。
 """
 
+# 刷新报告时更新段落的系统提示词（只提供与上次研究相比新增或内容变化的来源）
+SYSTEM_PROMPT_REFRESH_SUMMARY = f"""
+你是一位资深社媒舆情分析师。你将获得段落的当前最新状态，以及该话题自上次研究以来新出现或内容有变化的搜索结果。你的任务是按最新进展更新段落：补充新的事实与引用（如帖 URL），修正已被新证据推翻或已过时的数字、状态与判断，保留仍然成立的关键信息。  
+如果新结果与段落无关或没有实质新信息，原样返回当前最新状态。  
+
+输入/输出格式参考（保留原有 JSON schema 定义）：  
+
+<INPUT JSON SCHEMA>
+{json.dumps(input_schema_reflection_summary, indent=2, ensure_ascii=False)}
+</INPUT JSON SCHEMA>
+
+<OUTPUT JSON SCHEMA>
+{json.dumps(output_schema_reflection_summary, indent=2, ensure_ascii=False)}
+</OUTPUT JSON SCHEMA>
+
+只返回符合 JSON schema 的 JSON 对象。
+"""
+
+# 单篇来源压缩为笔记的系统提示词（与段落无关，按内容哈希缓存后在各段落间复用）
+SYSTEM_PROMPT_SOURCE_NOTES = f"""
+你是一位信息整理员。你将获得一篇搜索结果（网页或社媒帖子）的正文，请把它压缩为要点笔记，供后续撰写多个不同主题的段落时引用。  
+- 保留全部具体事实：时间、地点、人物与账号、数字（热度、转发/评论量、伤亡、金额等）及其来源表述  
+- 保留有代表性的原话引用与帖子链接，注明发布者  
+- 保留不同立场与情绪表达，不做取舍与评价  
+- 删除导航、广告、版权声明与重复内容  
+输入可能只是长文的一部分，只整理给出的内容，不要补充正文以外的信息。
+
+<INPUT JSON SCHEMA>
+{json.dumps(input_schema_source_notes, indent=2, ensure_ascii=False)}
+</INPUT JSON SCHEMA>
+
+<OUTPUT JSON SCHEMA>
+{json.dumps(output_schema_source_notes, indent=2, ensure_ascii=False)}
+</OUTPUT JSON SCHEMA>
+
+只返回符合 JSON schema 的 JSON 对象。
+"""
+
 # 最终研究报告格式化的系统提示词（输出 Markdown，强调社媒要点）
 SYSTEM_PROMPT_REPORT_FORMATTING = f"""
 你是一位社媒舆情报告撰写者。你将获得所有段落的最终最新状态，请将其格式化为一份可发布的 Markdown 报告。报告应包含：标题、摘要（关键发现）、每个段落的详细分析（含数据点、示例帖链接、关键账号）、结论与行动建议（优先级排序），并对时间窗口与数据来源进行标注。  
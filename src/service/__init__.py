@@ -0,0 +1,27 @@
+"""
+研究服务模块
+提供批处理、任务队列等非交互方式运行 DeepSearchAgent 的入口
+"""
+
+from .batch import BatchJob, run_batch
+from .job_queue import JobQueue, ResearchJob
+from .worker import ResearchWorker, launch_workers
+from .singleflight import ResearchCoalescer, research_key
+from .scheduler import JobPreempted, Priority, ResearchScheduler, SchedulerFull
+from .prefetch import ReportPrefetcher
+
+__all__ = [
+    "BatchJob",
+    "run_batch",
+    "JobQueue",
+    "ResearchJob",
+    "ResearchWorker",
+    "launch_workers",
+    "ResearchCoalescer",
+    "research_key",
+    "Priority",
+    "ResearchScheduler",
+    "JobPreempted",
+    "SchedulerFull",
+    "ReportPrefetcher",
+]
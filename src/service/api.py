@@ -0,0 +1,353 @@
+"""
+HTTP API 服务
+基于 FastAPI 的异步服务：提交研究、SSE 推送进度、获取报告、查询当前热榜与趋势、检索历史话题与报告
+
+研究经 ResearchScheduler 按优先级分配并发槽位，相同请求经 ResearchCoalescer 合并为一次运行，
+超过排队上限的提交直接返回 429；
+每个 SSE 订阅者有独立的有界缓冲，慢客户端只会丢失中间进度事件，不会阻塞研究或其他客户端。
+
+用法:
+    python -m src.service.api --host 0.0.0.0 --port 8000 --max-concurrent 4
+"""
+
+import argparse
+import asyncio
+import json
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+
+from ..agent import DeepSearchAgent
+from ..hot_topics.crawler import HotTopicCrawler
+from ..hot_topics.database import DatabaseManager
+from ..hot_topics.scheduler import CrawlScheduler
+from ..hot_topics.trends import SORT_KEYS, get_trending_topics
+from ..utils.cancellation import CancellationToken, ResearchCancelled
+from ..utils.config import Config, load_config
+from .scheduler import Priority, ResearchScheduler
+from .singleflight import ResearchCoalescer
+
+# 终止事件，必须送达订阅者
+TERMINAL_NODES = ("completed", "cancelled", "failed")
+
+
+class ResearchRequest(BaseModel):
+    """提交研究的请求体"""
+    query: str
+    hot_topic_info: Optional[Dict[str, Any]] = None
+    timeout: Optional[float] = None
+    save_report: bool = True
+    priority: str = "interactive"        # interactive / prefetch / batch
+    user: str = "anonymous"
+
+
+class ResearchRun:
+    """一次研究运行：保存事件历史并向 SSE 订阅者广播"""
+
+    def __init__(self, run_id: str, request: ResearchRequest, loop: asyncio.AbstractEventLoop,
+                 subscriber_buffer: int = 64):
+        self.run_id = run_id
+        self.request = request
+        self.loop = loop
+        self.subscriber_buffer = subscriber_buffer
+        self.status = "queued"
+        self.created_at = datetime.now().isoformat()
+        self.events: List[Dict[str, Any]] = []
+        self.report: Optional[str] = None
+        self.report_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.token = CancellationToken(request.timeout)
+        self._subscribers: List[asyncio.Queue] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_NODES
+
+    def publish(self, event: Dict[str, Any]):
+        """在事件循环线程中调用：记录并广播事件，终止事件同时更新运行状态"""
+        self.events.append(event)
+        terminal = event["node"] in TERMINAL_NODES
+        if terminal:
+            # 与记录事件在同一回调中完成，订阅者看到 finished 时历史中必然已有终止事件
+            self.status = event["node"]
+            self.report = event.get("report")
+            self.report_path = event.get("report_path")
+            self.error = event.get("reason") or event.get("error")
+        for queue in self._subscribers:
+            if queue.full():
+                if not terminal:
+                    continue        # 慢客户端丢弃中间进度
+                queue.get_nowait()  # 为终止事件腾出位置
+            queue.put_nowait(event)
+
+    def publish_threadsafe(self, event: Dict[str, Any]):
+        """在工作线程中调用"""
+        self.loop.call_soon_threadsafe(self.publish, event)
+
+    def subscribe(self) -> asyncio.Queue:
+        """订阅事件，先回放已有事件"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_buffer)
+        history = self.events
+        if len(history) > self.subscriber_buffer:
+            # 回放超出缓冲时保留最近的事件
+            history = history[-self.subscriber_buffer:]
+        for event in history:
+            queue.put_nowait(event)
+        if not self.finished:
+            self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "query": self.request.query,
+            "status": self.status,
+            "created_at": self.created_at,
+            "event_count": len(self.events),
+            "report_path": self.report_path,
+            "error": self.error,
+        }
+
+
+class ResearchService:
+    """研究服务：限制并发与排队数量，管理运行记录"""
+
+    def __init__(self, agent: DeepSearchAgent, db: DatabaseManager, max_concurrent: int = 4,
+                 max_pending: int = 32, max_runs: int = 200):
+        """
+        初始化研究服务
+
+        Args:
+            agent: 共享的 DeepSearchAgent
+            db: 热榜数据库
+            max_concurrent: 同时运行的研究数
+            max_pending: 运行中 + 排队中的研究上限，超过则拒绝提交
+            max_runs: 内存中保留的运行记录数
+        """
+        self.agent = agent
+        self.coalescer = ResearchCoalescer(agent)
+        self.scheduler = ResearchScheduler(self.coalescer, max_concurrent=max_concurrent)
+        self.db = db
+        self.max_pending = max_pending
+        self.max_runs = max_runs
+        # 线程数不限制研究并发（由调度器控制），只为排队中的请求提供等待线程
+        self.executor = ThreadPoolExecutor(max_workers=max_pending, thread_name_prefix="api-research")
+        self.runs: "OrderedDict[str, ResearchRun]" = OrderedDict()
+
+    @property
+    def pending_count(self) -> int:
+        return sum(1 for run in self.runs.values() if not run.finished)
+
+    def submit(self, request: ResearchRequest) -> ResearchRun:
+        """提交研究，超过排队上限时抛出 HTTP 429"""
+        if self.pending_count >= self.max_pending:
+            raise HTTPException(status_code=429, detail="研究任务过多，请稍后重试")
+        if request.priority.upper() not in Priority.__members__:
+            raise HTTPException(status_code=422, detail=f"未知的优先级: {request.priority}")
+
+        run = ResearchRun(uuid.uuid4().hex, request, asyncio.get_running_loop())
+        self.runs[run.run_id] = run
+        self._evict_finished()
+        self.executor.submit(self._execute, run)
+        return run
+
+    def _evict_finished(self):
+        """超出保留数量时淘汰最早完成的运行记录"""
+        while len(self.runs) > self.max_runs:
+            for run_id, run in self.runs.items():
+                if run.finished:
+                    del self.runs[run_id]
+                    break
+            else:
+                return
+
+    def _execute(self, run: ResearchRun):
+        """在工作线程中执行研究（排队期间被取消的运行会立即以部分报告结束）"""
+        run.loop.call_soon_threadsafe(setattr, run, "status", "running")
+        try:
+            for event in self.scheduler.research(
+                run.request.query,
+                save_report=run.request.save_report,
+                hot_topic_info=run.request.hot_topic_info,
+                priority=Priority[run.request.priority.upper()],
+                user=run.request.user,
+                cancel_token=run.token,
+            ):
+                run.publish_threadsafe(event)
+        except ResearchCancelled as e:
+            # 排队期间被取消
+            run.publish_threadsafe({"node": "cancelled", "report": None, "reason": e.reason})
+        except Exception as e:
+            run.publish_threadsafe({"node": "failed", "error": str(e)})
+
+    def get(self, run_id: str) -> ResearchRun:
+        run = self.runs.get(run_id)
+        if run is None:
+            raise HTTPException(status_code=404, detail="研究任务不存在")
+        return run
+
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['node']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+def create_app(config: Optional[Config] = None, db_path: str = "hot_topics.db",
+               max_concurrent: int = 4, max_pending: int = 32, crawl: bool = False) -> FastAPI:
+    """
+    创建 FastAPI 应用
+
+    Args:
+        config: 配置对象，默认自动加载
+        db_path: 热榜数据库路径
+        max_concurrent: 同时运行的研究数
+        max_pending: 运行中 + 排队中的研究上限
+        crawl: 是否在服务进程内运行热榜后台爬取
+
+    Returns:
+        FastAPI 应用
+    """
+    config = config or load_config()
+    app = FastAPI(title="社交媒体热点分析智能体 API")
+    service = ResearchService(
+        DeepSearchAgent(config),
+        DatabaseManager(db_path),
+        max_concurrent=max_concurrent,
+        max_pending=max_pending,
+    )
+    app.state.service = service
+
+    if crawl:
+        crawl_scheduler = CrawlScheduler(HotTopicCrawler(config.hot_topics_platforms), service.db,
+                                         interval=config.hot_topics_refresh_interval,
+                                         platform_intervals=config.hot_topics_platform_intervals,
+                                         search_index=service.agent.search_index)
+        crawl_scheduler.start()
+        app.state.crawl_scheduler = crawl_scheduler
+
+    @app.post("/research", status_code=202)
+    async def submit_research(request: ResearchRequest) -> Dict[str, Any]:
+        """提交研究"""
+        return service.submit(request).to_dict()
+
+    @app.get("/research/{run_id}")
+    async def get_research(run_id: str) -> Dict[str, Any]:
+        """查询研究状态"""
+        return service.get(run_id).to_dict()
+
+    @app.get("/research/{run_id}/events")
+    async def stream_events(run_id: str) -> StreamingResponse:
+        """以 SSE 推送研究进度，连接建立时先回放已有事件"""
+        run = service.get(run_id)
+
+        async def event_stream():
+            queue = run.subscribe()
+            try:
+                while True:
+                    try:
+                        event = await asyncio.wait_for(queue.get(), timeout=15)
+                    except asyncio.TimeoutError:
+                        if run.finished and queue.empty():
+                            return
+                        yield ": keep-alive\n\n"
+                        continue
+                    yield _format_sse(event)
+                    if event["node"] in TERMINAL_NODES:
+                        return
+            finally:
+                run.unsubscribe(queue)
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache"})
+
+    @app.get("/research/{run_id}/report")
+    async def get_report(run_id: str, format: str = "markdown"):
+        """获取研究报告"""
+        run = service.get(run_id)
+        if run.report is None:
+            raise HTTPException(status_code=409, detail=f"报告尚未生成（状态: {run.status}）")
+        if format == "json":
+            return {**run.to_dict(), "report": run.report}
+        return PlainTextResponse(run.report, media_type="text/markdown")
+
+    @app.delete("/research/{run_id}")
+    async def cancel_research(run_id: str) -> Dict[str, Any]:
+        """取消研究，返回部分报告"""
+        run = service.get(run_id)
+        run.token.cancel("cancelled by client")
+        return run.to_dict()
+
+    @app.get("/hot-topics")
+    async def hot_topics(platform: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+        """当前热榜"""
+        if platform:
+            topics = await asyncio.to_thread(service.db.get_topics_by_platform, platform)
+        else:
+            topics = await asyncio.to_thread(service.db.get_all_topics)
+        return {
+            "crawl_time": await asyncio.to_thread(service.db.get_latest_crawl_time),
+            "topics": [asdict(topic) for topic in topics[:limit]],
+        }
+
+    @app.get("/hot-topics/trending")
+    async def trending_topics(window_minutes: int = 60, sort: str = "trend_score",
+                              platform: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+        """当前热榜的趋势：热度速度、加速度、排名变化与跨平台归一化热度"""
+        if sort not in SORT_KEYS:
+            raise HTTPException(status_code=400, detail=f"sort 可选: {', '.join(SORT_KEYS)}")
+        if window_minutes <= 0:
+            raise HTTPException(status_code=400, detail="window_minutes 必须为正数")
+        trends = await asyncio.to_thread(get_trending_topics, service.db, window=window_minutes * 60,
+                                         sort_by=sort, platform=platform, limit=limit)
+        return {
+            "crawl_time": await asyncio.to_thread(service.db.get_latest_crawl_time),
+            "window_minutes": window_minutes,
+            "topics": [trend.to_dict() for trend in trends],
+        }
+
+    @app.get("/search")
+    async def search(q: str, kind: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+        """全文检索历史热点话题与研究报告，kind 可选 topic / report"""
+        search_index = service.agent.search_index
+        if search_index is None:
+            raise HTTPException(status_code=404, detail="未启用全文索引（SEARCH_INDEX_PATH）")
+        try:
+            results = await asyncio.to_thread(search_index.search, q, kind=kind, limit=limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"query": q, "results": results}
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="社交媒体热点分析 HTTP API 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--config", default=None, help="配置文件路径")
+    parser.add_argument("--db", default="hot_topics.db", help="热榜数据库路径")
+    parser.add_argument("--max-concurrent", type=int, default=4, help="同时运行的研究数")
+    parser.add_argument("--max-pending", type=int, default=32, help="运行中 + 排队中的研究上限")
+    parser.add_argument("--crawl", action="store_true", help="在服务进程内运行热榜后台爬取")
+    args = parser.parse_args(argv)
+
+    app = create_app(load_config(args.config), db_path=args.db,
+                     max_concurrent=args.max_concurrent, max_pending=args.max_pending, crawl=args.crawl)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+无界面批量研究
+对当前热榜（或查询文件）中的每个话题并发运行 DeepSearchAgent，输出报告与机器可读的运行摘要
+
+用法:
+    python -m src.service.batch --from-db hot_topics.db --limit 40 --concurrency 8
+    python -m src.service.batch --queries-file queries.txt --summary run_summary.json
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..agent import DeepSearchAgent
+from ..hot_topics.database import DatabaseManager
+from ..utils.config import load_config
+from .scheduler import Priority, ResearchScheduler
+from .singleflight import ResearchCoalescer
+
+
+@dataclass
+class BatchJob:
+    """单个批量研究任务"""
+    query: str
+    hot_topic_info: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class BatchResult:
+    """单个任务的运行结果"""
+    query: str
+    status: str                          # completed / cancelled / failed
+    run_time: float = 0.0
+    report_path: Optional[str] = None
+    topic_id: Optional[str] = None
+    platform: Optional[str] = None
+    error: Optional[str] = None
+
+
+def jobs_from_database(db_path: str, limit: Optional[int] = None) -> List[BatchJob]:
+    """
+    从热榜数据库读取当前话题作为任务
+
+    Args:
+        db_path: 数据库文件路径
+        limit: 最多取多少个话题（按热度降序）
+
+    Returns:
+        任务列表（按跨平台事件簇去重，每个簇只研究热度最高的话题）
+    """
+    topics = DatabaseManager(db_path).get_all_topics()
+    jobs = []
+    seen = set()
+    for topic in topics:
+        key = topic.cluster_id or topic.title
+        if key in seen:
+            continue
+        seen.add(key)
+        jobs.append(BatchJob(query=topic.title, hot_topic_info=asdict(topic)))
+    return jobs[:limit] if limit else jobs
+
+
+def jobs_from_file(path: str, limit: Optional[int] = None) -> List[BatchJob]:
+    """
+    从文本文件读取查询，每行一个，# 开头为注释
+
+    Args:
+        path: 文件路径
+        limit: 最多读取多少条
+
+    Returns:
+        任务列表（去重）
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        queries = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    jobs = [BatchJob(query=query) for query in dict.fromkeys(queries)]
+    return jobs[:limit] if limit else jobs
+
+
+def _run_job(scheduler: ResearchScheduler, job: BatchJob, timeout: Optional[float]) -> BatchResult:
+    """经调度器以 BATCH 优先级执行单个任务，异常转为 failed 结果"""
+    info = job.hot_topic_info or {}
+    start_time = time.time()
+    try:
+        final_event = None
+        for event in scheduler.research(job.query, save_report=True, hot_topic_info=job.hot_topic_info,
+                                        priority=Priority.BATCH, user="batch", timeout=timeout):
+            if event["node"] in ("completed", "cancelled", "failed"):
+                final_event = event
+        if final_event is None:
+            raise RuntimeError("研究未产生最终结果")
+        return BatchResult(
+            query=job.query,
+            status=final_event["node"],
+            run_time=final_event.get("run_time", time.time() - start_time),
+            report_path=final_event.get("report_path"),
+            topic_id=info.get("id"),
+            platform=info.get("platform"),
+            error=final_event.get("reason") or final_event.get("error"),
+        )
+    except Exception as e:
+        return BatchResult(
+            query=job.query,
+            status="failed",
+            run_time=time.time() - start_time,
+            topic_id=info.get("id"),
+            platform=info.get("platform"),
+            error=str(e),
+        )
+
+
+def run_batch(agent: DeepSearchAgent, jobs: List[BatchJob], concurrency: int = 4,
+              timeout: Optional[float] = None, scheduler: Optional[ResearchScheduler] = None) -> Dict[str, Any]:
+    """
+    并发运行一批研究任务
+
+    所有任务共享同一个 agent，即共享 LLM 客户端、搜索客户端与内容侧存储。
+    任务经 ResearchScheduler 以 BATCH 优先级提交，实际并发受该类别的并发上限约束。
+
+    Args:
+        agent: DeepSearchAgent 实例
+        jobs: 任务列表
+        concurrency: 并发数（未传入 scheduler 时即 BATCH 类别的并发上限）
+        timeout: 单个任务的最长运行秒数
+        scheduler: 与交互请求共享的调度器，默认为本批次新建一个
+
+    Returns:
+        运行摘要（可直接序列化为 JSON）
+    """
+    if scheduler is None:
+        scheduler = ResearchScheduler(ResearchCoalescer(agent), max_concurrent=max(1, concurrency),
+                                      class_limits={Priority.BATCH: max(1, concurrency)})
+    started_at = datetime.now().isoformat()
+    start_time = time.time()
+    results: List[BatchResult] = []
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch-research") as executor:
+        futures = {executor.submit(_run_job, scheduler, job, timeout): job for job in jobs}
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"[batch] {len(results)}/{len(jobs)} {result.status}: {result.query} ({result.run_time:.1f}s)")
+
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+
+    return {
+        "started_at": started_at,
+        "finished_at": datetime.now().isoformat(),
+        "wall_time": round(time.time() - start_time, 3),
+        "concurrency": concurrency,
+        "total": len(jobs),
+        "counts": counts,
+        "results": [asdict(result) for result in results],
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="批量运行热点舆情深度研究")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--from-db", default="hot_topics.db", help="热榜数据库路径（默认 hot_topics.db）")
+    source.add_argument("--queries-file", help="查询文件，每行一个查询")
+    parser.add_argument("--limit", type=int, default=None, help="最多研究多少个话题")
+    parser.add_argument("--concurrency", type=int, default=4, help="并发研究数")
+    parser.add_argument("--timeout", type=float, default=None, help="单个任务最长运行秒数")
+    parser.add_argument("--config", default=None, help="配置文件路径")
+    parser.add_argument("--output-dir", default=None, help="报告输出目录，默认使用配置中的 output_dir")
+    parser.add_argument("--summary", default=None, help="运行摘要 JSON 路径，默认写入报告目录")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.output_dir:
+        config = replace(config, output_dir=args.output_dir)
+
+    if args.queries_file:
+        jobs = jobs_from_file(args.queries_file, args.limit)
+    else:
+        jobs = jobs_from_database(args.from_db, args.limit)
+
+    if not jobs:
+        print("没有需要研究的话题")
+        return
+
+    agent = DeepSearchAgent(config)
+    summary = run_batch(agent, jobs, concurrency=args.concurrency, timeout=args.timeout)
+
+    summary_path = args.summary or os.path.join(
+        config.output_dir, f"batch_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    print(f"\n批量研究完成: {summary['counts']}，用时 {summary['wall_time']:.1f} 秒")
+    print(f"运行摘要已保存到: {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
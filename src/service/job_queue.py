@@ -0,0 +1,321 @@
+"""
+SQLite 研究任务队列
+基于租约与心跳的持久化队列，多个进程（或共享同一队列文件的多台机器）可并发领取任务，
+租约过期的任务会被自动重新放回队列
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class ResearchJob:
+    """队列中的研究任务"""
+    id: int
+    query: str
+    hot_topic_info: Optional[Dict[str, Any]]
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    lease_owner: Optional[str] = None
+    lease_expires: Optional[float] = None
+    report_path: Optional[str] = None
+    error: Optional[str] = None
+
+
+def default_worker_id() -> str:
+    """生成 主机名:进程号 形式的 worker ID"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """研究任务队列"""
+
+    def __init__(self, db_path: str = "research_jobs.db", lease_seconds: int = 300):
+        """
+        初始化任务队列
+
+        Args:
+            db_path: 队列数据库文件路径
+            lease_seconds: 租约时长（秒），worker 需在此时间内发送心跳
+        """
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None 以便手动使用 BEGIN IMMEDIATE 做原子领取
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def init_db(self):
+        """初始化数据库表结构"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS research_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT NOT NULL,
+                hot_topic_info TEXT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                priority INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                lease_owner TEXT,
+                lease_expires REAL,
+                report TEXT,
+                report_path TEXT,
+                metrics TEXT,
+                error TEXT,
+                created_at TEXT,
+                updated_at TEXT
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_research_jobs_status
+            ON research_jobs (status, priority DESC, id)
+        ''')
+        conn.close()
+
+    @staticmethod
+    def _now_str() -> str:
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    @staticmethod
+    def _row_to_job(row) -> ResearchJob:
+        return ResearchJob(
+            id=row[0],
+            query=row[1],
+            hot_topic_info=json.loads(row[2]) if row[2] else None,
+            status=row[3],
+            priority=row[4],
+            attempts=row[5],
+            max_attempts=row[6],
+            lease_owner=row[7],
+            lease_expires=row[8],
+            report_path=row[9],
+            error=row[10],
+        )
+
+    _JOB_COLUMNS = ("id, query, hot_topic_info, status, priority, attempts, max_attempts, "
+                    "lease_owner, lease_expires, report_path, error")
+
+    def submit(self, query: str, hot_topic_info: Optional[Dict[str, Any]] = None,
+               priority: int = 0, max_attempts: int = 3) -> int:
+        """
+        提交研究任务
+
+        Args:
+            query: 研究问题
+            hot_topic_info: 热点话题信息
+            priority: 优先级，越大越先执行
+            max_attempts: 最多尝试次数（含因 worker 崩溃导致的重新领取）
+
+        Returns:
+            任务 ID
+        """
+        now = self._now_str()
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO research_jobs
+            (query, hot_topic_info, priority, max_attempts, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (query, json.dumps(hot_topic_info, ensure_ascii=False) if hot_topic_info else None,
+              priority, max_attempts, now, now))
+        job_id = cursor.lastrowid
+        conn.close()
+        return job_id
+
+    def _requeue_expired(self, cursor: sqlite3.Cursor):
+        """把租约已过期的运行中任务放回队列，超过尝试次数的标记为失败"""
+        now = time.time()
+        cursor.execute('''
+            UPDATE research_jobs
+            SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                error = CASE WHEN attempts < max_attempts THEN error ELSE 'lease expired' END,
+                lease_owner = NULL, lease_expires = NULL, updated_at = ?
+            WHERE status = 'running' AND lease_expires < ?
+        ''', (self._now_str(), now))
+
+    def lease(self, worker_id: str) -> Optional[ResearchJob]:
+        """
+        原子地领取一个排队中的任务
+
+        Args:
+            worker_id: 领取者 ID
+
+        Returns:
+            领取到的任务，队列为空时返回 None
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            self._requeue_expired(cursor)
+            cursor.execute('''
+                SELECT id FROM research_jobs
+                WHERE status = 'queued'
+                ORDER BY priority DESC, id
+                LIMIT 1
+            ''')
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute("COMMIT")
+                return None
+
+            cursor.execute('''
+                UPDATE research_jobs
+                SET status = 'running', lease_owner = ?, lease_expires = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE id = ?
+            ''', (worker_id, time.time() + self.lease_seconds, self._now_str(), row[0]))
+            cursor.execute(f"SELECT {self._JOB_COLUMNS} FROM research_jobs WHERE id = ?", (row[0],))
+            job = self._row_to_job(cursor.fetchone())
+            cursor.execute("COMMIT")
+            return job
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """
+        续租
+
+        Args:
+            job_id: 任务 ID
+            worker_id: 领取者 ID
+
+        Returns:
+            是否仍持有租约；返回 False 说明任务已被重新分配，worker 应放弃该任务
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE research_jobs
+            SET lease_expires = ?, updated_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+        ''', (time.time() + self.lease_seconds, self._now_str(), job_id, worker_id))
+        held = cursor.rowcount == 1
+        conn.close()
+        return held
+
+    def complete(self, job_id: int, worker_id: str, status: str, report: Optional[str] = None,
+                 report_path: Optional[str] = None, metrics: Optional[Dict[str, Any]] = None,
+                 error: Optional[str] = None) -> bool:
+        """
+        记录任务结果
+
+        Args:
+            job_id: 任务 ID
+            worker_id: 领取者 ID
+            status: completed / cancelled
+            report: 报告内容
+            report_path: 报告文件路径
+            metrics: 运行指标
+            error: 附加说明（如取消原因）
+
+        Returns:
+            是否写入成功（租约已丢失时返回 False）
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE research_jobs
+            SET status = ?, report = ?, report_path = ?, metrics = ?, error = ?,
+                lease_owner = NULL, lease_expires = NULL, updated_at = ?
+            WHERE id = ? AND lease_owner = ?
+        ''', (status, report, report_path, json.dumps(metrics or {}, ensure_ascii=False), error,
+              self._now_str(), job_id, worker_id))
+        written = cursor.rowcount == 1
+        conn.close()
+        return written
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        """
+        记录任务失败，未超过尝试次数时放回队列
+
+        Args:
+            job_id: 任务 ID
+            worker_id: 领取者 ID
+            error: 错误信息
+
+        Returns:
+            是否写入成功
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE research_jobs
+            SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?
+            WHERE id = ? AND lease_owner = ?
+        ''', (error, self._now_str(), job_id, worker_id))
+        written = cursor.rowcount == 1
+        conn.close()
+        return written
+
+    def get(self, job_id: int) -> Optional[ResearchJob]:
+        """按 ID 查询任务"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {self._JOB_COLUMNS} FROM research_jobs WHERE id = ?", (job_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return self._row_to_job(row) if row else None
+
+    def get_report(self, job_id: int) -> Optional[str]:
+        """获取任务报告内容"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT report FROM research_jobs WHERE id = ?", (job_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取各状态任务数
+
+        Returns:
+            {状态: 数量}
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT status, COUNT(*) FROM research_jobs GROUP BY status")
+        rows = cursor.fetchall()
+        conn.close()
+        return {row[0]: row[1] for row in rows}
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 100) -> List[ResearchJob]:
+        """
+        列出任务
+
+        Args:
+            status: 按状态过滤
+            limit: 最多返回条数
+
+        Returns:
+            任务列表（新任务在前）
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        if status:
+            cursor.execute(f'''
+                SELECT {self._JOB_COLUMNS} FROM research_jobs
+                WHERE status = ? ORDER BY id DESC LIMIT ?
+            ''', (status, limit))
+        else:
+            cursor.execute(f"SELECT {self._JOB_COLUMNS} FROM research_jobs ORDER BY id DESC LIMIT ?", (limit,))
+        rows = cursor.fetchall()
+        conn.close()
+        return [self._row_to_job(row) for row in rows]
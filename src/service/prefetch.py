@@ -0,0 +1,192 @@
+"""
+热点报告预取
+每次热榜保存后，为新上榜或快速上升的头部话题在后台预先生成报告，分析师点击时可直接展示
+
+预取为低优先级：一次只运行一个任务，有交互研究在运行或排队时暂停领取新任务，并受每日预算限制；
+配置了 ResearchScheduler 时以 PREFETCH 类别提交，排队中可被交互请求抢占。
+"""
+
+import queue
+import threading
+import time
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..hot_topics.database import DatabaseManager
+from ..hot_topics.models import HotTopic
+from .scheduler import JobPreempted, Priority, ResearchScheduler
+from .singleflight import ResearchCoalescer, normalize_query
+
+
+def topic_key(platform: str, title: str) -> str:
+    """预取报告的话题键"""
+    return f"{platform}:{normalize_query(title)}"
+
+
+class ReportPrefetcher:
+    """后台报告预取器"""
+
+    def __init__(self, coalescer: ResearchCoalescer, db: DatabaseManager, top_n: int = 3,
+                 daily_budget: int = 20, rise_threshold: int = 5, max_age_seconds: int = 3600,
+                 busy_check: Optional[Callable[[], bool]] = None, idle_wait: float = 5.0,
+                 scheduler: Optional[ResearchScheduler] = None):
+        """
+        初始化预取器
+
+        Args:
+            coalescer: 研究合并器（与交互请求共用，点击正在预取的话题时直接合并到该运行）
+            db: 热榜数据库，用于保存预取报告与统计预算
+            top_n: 每次热榜保存后最多预取多少个话题
+            daily_budget: 每天最多预取的报告数
+            rise_threshold: 排名上升至少多少位视为快速上升
+            max_age_seconds: 预取报告的有效期（秒），有效期内的话题不重复预取
+            busy_check: 返回 True 时暂停预取，默认在有交互研究（无调度器时为任意研究）进行中时暂停
+            idle_wait: 暂停时的重试间隔（秒）
+            scheduler: 研究调度器，提供时预取以 PREFETCH 优先级经调度器运行
+        """
+        self.coalescer = coalescer
+        self.db = db
+        self.top_n = top_n
+        self.daily_budget = daily_budget
+        self.rise_threshold = rise_threshold
+        self.max_age_seconds = max_age_seconds
+        self.scheduler = scheduler
+        if busy_check is None:
+            if scheduler is not None:
+                busy_check = lambda: scheduler.has_pending(Priority.INTERACTIVE)
+            else:
+                busy_check = lambda: self.coalescer.stats()["in_flight"] > 0
+        self.busy_check = busy_check
+        self.idle_wait = idle_wait
+
+        self._queue: "queue.Queue[HotTopic]" = queue.Queue()
+        self._queued_keys = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """启动后台预取线程"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, daemon=True, name="report-prefetcher")
+            self._thread.start()
+
+    def stop(self):
+        """停止后台预取线程（正在运行的预取会在完成后退出）"""
+        self._stop.set()
+
+    def attach(self, db: DatabaseManager):
+        """在数据库上注册保存回调"""
+        db.add_save_listener(self.on_topics_saved)
+
+    def detach(self, db: DatabaseManager):
+        """从数据库注销保存回调"""
+        db.remove_save_listener(self.on_topics_saved)
+
+    def select_candidates(self, topics: List[HotTopic],
+                          previous_ranks: Dict[Tuple[str, str], int]) -> List[HotTopic]:
+        """
+        挑选新上榜或快速上升的话题
+
+        Args:
+            topics: 本次保存的话题
+            previous_ranks: {(平台, 标题): 上一次的排名}
+
+        Returns:
+            按排名排序的候选话题（最多 top_n 个）
+        """
+        candidates = []
+        for topic in topics:
+            previous_rank = previous_ranks.get((topic.platform, topic.title))
+            is_new = previous_rank is None
+            is_rising = previous_rank is not None and previous_rank - topic.rank >= self.rise_threshold
+            if is_new or is_rising:
+                candidates.append(topic)
+
+        candidates.sort(key=lambda t: (t.rank, -t.hot_value))
+        selected = []
+        clusters = set()
+        for topic in candidates:
+            if len(selected) >= self.top_n:
+                break
+            # 同一事件簇只预取一次
+            cluster = topic.cluster_id or topic.id
+            if cluster in clusters:
+                continue
+            clusters.add(cluster)
+            if self.db.get_prefetched_report(topic_key(topic.platform, topic.title), self.max_age_seconds):
+                continue
+            selected.append(topic)
+        return selected
+
+    def on_topics_saved(self, topics: List[HotTopic], previous_ranks: Dict[Tuple[str, str], int]):
+        """DatabaseManager.save_topics 的回调：为候选话题排队预取"""
+        for topic in self.select_candidates(topics, previous_ranks):
+            key = topic_key(topic.platform, topic.title)
+            with self._lock:
+                if key in self._queued_keys:
+                    continue
+                self._queued_keys.add(key)
+            self._queue.put(topic)
+            print(f"[prefetch] 已排队: {topic.title} ({topic.platform} #{topic.rank})")
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                topic = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            key = topic_key(topic.platform, topic.title)
+            try:
+                # 有交互研究在运行时让路
+                while self.busy_check() and not self._stop.is_set():
+                    time.sleep(self.idle_wait)
+                if self._stop.is_set():
+                    return
+                if self.db.count_prefetched_today() >= self.daily_budget:
+                    print(f"[prefetch] 已达每日预算 {self.daily_budget}，跳过: {topic.title}")
+                    continue
+                self._prefetch(topic, key)
+            finally:
+                with self._lock:
+                    self._queued_keys.discard(key)
+
+    def _prefetch(self, topic: HotTopic, key: str):
+        """运行一次预取研究并保存结果"""
+        print(f"[prefetch] 开始预取: {topic.title}")
+        if self.scheduler is not None:
+            events = self.scheduler.research(topic.title, save_report=True, hot_topic_info=asdict(topic),
+                                             priority=Priority.PREFETCH, user="prefetch")
+        else:
+            events = self.coalescer.research(topic.title, save_report=True, hot_topic_info=asdict(topic))
+
+        final_event = None
+        status = "failed"
+        try:
+            for event in events:
+                if event["node"] in ("completed", "cancelled", "failed"):
+                    final_event = event
+                    status = event["node"]
+        except JobPreempted:
+            status = "preempted"
+            print(f"[prefetch] 排队中被交互请求抢占: {topic.title}")
+            return
+        except Exception as e:
+            print(f"[prefetch] 预取失败: {topic.title}: {e}")
+            return
+        finally:
+            # 每次尝试都计入每日预算（排队中被抢占的除外），失败与取消同样产生了调用开销
+            self.db.record_prefetch_attempt(key, topic.title, status)
+
+        if final_event and final_event["node"] == "completed":
+            self.db.save_prefetched_report(key, topic.title, topic.platform,
+                                           final_event["report"], final_event.get("report_path"))
+            print(f"[prefetch] 预取完成: {topic.title}")
+        else:
+            print(f"[prefetch] 预取未完成: {topic.title} ({final_event and final_event['node']})")
+
+    def get_report(self, platform: str, title: str) -> Optional[Dict]:
+        """获取话题的预取报告（在有效期内）"""
+        return self.db.get_prefetched_report(topic_key(platform, title), self.max_age_seconds)
@@ -0,0 +1,281 @@
+"""
+研究优先级调度器
+位于 DeepSearchAgent（经 ResearchCoalescer）之前，按优先级类别分配并发槽位：
+- 交互请求优先于预取与批处理，低优先级类别有各自的并发上限，保证交互请求总有空闲槽位
+- 同一类别内按用户轮转，避免单个用户的大量任务独占
+- 交互请求需要排队时，排队中（未运行）的预取任务被抢占；排队总数超限时抢占排队中的低优先级任务；
+  正在运行的任务不受影响
+- 命中报告缓存或可合并到进行中运行的请求不占用槽位，直接跟随已有的运行
+"""
+
+import itertools
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Deque, Dict, Generator, Iterator, Optional
+
+from ..utils.cancellation import CancellationToken
+from .singleflight import ResearchCoalescer
+
+
+class Priority(IntEnum):
+    """优先级类别，数值越小越优先"""
+    INTERACTIVE = 0
+    PREFETCH = 1
+    BATCH = 2
+
+
+class JobPreempted(Exception):
+    """排队中的任务被更高优先级的任务抢占"""
+
+
+class SchedulerFull(Exception):
+    """排队已满且没有可抢占的低优先级任务"""
+
+
+class _Ticket:
+    """一个排队中的槽位请求"""
+
+    def __init__(self, ticket_id: int, priority: Priority, user: str):
+        self.id = ticket_id
+        self.priority = priority
+        self.user = user
+        self.granted = threading.Event()
+        self.preempted = False
+
+
+class ResearchScheduler:
+    """按优先级、用户公平分配研究并发槽位"""
+
+    DEFAULT_CLASS_LIMITS = {Priority.INTERACTIVE: 4, Priority.PREFETCH: 1, Priority.BATCH: 2}
+
+    def __init__(self, coalescer: ResearchCoalescer, max_concurrent: int = 4,
+                 class_limits: Optional[Dict[Priority, int]] = None, max_queued: int = 100):
+        """
+        初始化调度器
+
+        Args:
+            coalescer: 研究合并器
+            max_concurrent: 同时运行的研究总数
+            class_limits: 各类别的并发上限（低优先级类别之和应小于 max_concurrent，为交互请求预留槽位）
+            max_queued: 所有类别排队总数上限，超过时抢占低优先级的排队任务
+        """
+        self.coalescer = coalescer
+        self.max_concurrent = max_concurrent
+        self.class_limits = {**self.DEFAULT_CLASS_LIMITS, **(class_limits or {})}
+        self.max_queued = max_queued
+
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._running: Dict[Priority, int] = {priority: 0 for priority in Priority}
+        # 每个类别：{用户: 排队队列}，OrderedDict 的顺序即轮转顺序
+        self._queues: Dict[Priority, "OrderedDict[str, Deque[_Ticket]]"] = {
+            priority: OrderedDict() for priority in Priority
+        }
+
+    # ---------- 槽位分配 ----------
+
+    def _queued_count(self, priority: Optional[Priority] = None) -> int:
+        priorities = [priority] if priority is not None else list(Priority)
+        return sum(len(q) for p in priorities for q in self._queues[p].values())
+
+    def _position(self, ticket: _Ticket) -> int:
+        """估算排队位置（同类别及更高优先级类别中排在前面的任务数 + 1）"""
+        ahead = sum(self._queued_count(p) for p in Priority if p < ticket.priority)
+        for user_queue in self._queues[ticket.priority].values():
+            for queued in user_queue:
+                if queued is ticket:
+                    break
+                ahead += 1
+        return ahead + 1
+
+    def _preempt_one(self, incoming: Priority) -> bool:
+        """抢占一个优先级低于 incoming 的排队任务（最低类别中最新提交的）"""
+        for priority in sorted(Priority, reverse=True):
+            if priority <= incoming:
+                return False
+            user_queues = self._queues[priority]
+            newest_user = None
+            newest_ticket = None
+            for user, user_queue in user_queues.items():
+                if user_queue and (newest_ticket is None or user_queue[-1].id > newest_ticket.id):
+                    newest_user, newest_ticket = user, user_queue[-1]
+            if newest_ticket is not None:
+                user_queues[newest_user].pop()
+                if not user_queues[newest_user]:
+                    del user_queues[newest_user]
+                newest_ticket.preempted = True
+                newest_ticket.granted.set()
+                print(f"[scheduler] 抢占排队任务 #{newest_ticket.id}（{newest_ticket.priority.name}）")
+                return True
+        return False
+
+    def _dispatch(self):
+        """在锁内调用：按优先级把空闲槽位分给排队任务"""
+        while sum(self._running.values()) < self.max_concurrent:
+            for priority in Priority:
+                user_queues = self._queues[priority]
+                if not user_queues or self._running[priority] >= self.class_limits[priority]:
+                    continue
+                # 轮转：取队首用户的任务后把该用户移到末尾
+                user, user_queue = next(iter(user_queues.items()))
+                ticket = user_queue.popleft()
+                if user_queue:
+                    user_queues.move_to_end(user)
+                else:
+                    del user_queues[user]
+                self._running[priority] += 1
+                ticket.granted.set()
+                break
+            else:
+                return
+
+    def _enqueue(self, priority: Priority, user: str) -> _Ticket:
+        with self._lock:
+            if self._queued_count() >= self.max_queued and not self._preempt_one(priority):
+                raise SchedulerFull("研究排队已满")
+            ticket = _Ticket(next(self._ids), priority, user)
+            self._queues[priority].setdefault(user, deque()).append(ticket)
+            self._dispatch()
+            return ticket
+
+    def _cancel_ticket(self, ticket: _Ticket):
+        """放弃排队中的任务"""
+        with self._lock:
+            user_queue = self._queues[ticket.priority].get(ticket.user)
+            if user_queue and ticket in user_queue:
+                user_queue.remove(ticket)
+                if not user_queue:
+                    del self._queues[ticket.priority][ticket.user]
+
+    def _release(self, ticket: _Ticket):
+        with self._lock:
+            self._running[ticket.priority] -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, priority: Priority = Priority.INTERACTIVE, user: str = "default",
+             cancel_token: Optional[CancellationToken] = None) -> Iterator[None]:
+        """
+        阻塞直到获得运行槽位，退出时释放
+
+        Args:
+            priority: 优先级类别
+            user: 用户标识，用于同类别内公平轮转
+            cancel_token: 排队期间的取消令牌
+
+        Raises:
+            JobPreempted: 排队中被更高优先级任务抢占
+            SchedulerFull: 排队已满
+        """
+        ticket = self._enqueue(priority, user)
+        try:
+            while not ticket.granted.wait(0.5):
+                if cancel_token is not None and cancel_token.cancelled:
+                    self._cancel_ticket(ticket)
+                    cancel_token.check()
+        except BaseException:
+            self._cancel_ticket(ticket)
+            if ticket.granted.is_set() and not ticket.preempted:
+                self._release(ticket)
+            raise
+
+        if ticket.preempted:
+            raise JobPreempted(f"任务 #{ticket.id} 在排队中被抢占")
+
+        try:
+            yield
+        finally:
+            self._release(ticket)
+
+    # ---------- 研究入口 ----------
+
+    def research(
+        self,
+        query: str,
+        save_report: bool = True,
+        hot_topic_info: Optional[Dict[str, Any]] = None,
+        *,
+        priority: Priority = Priority.INTERACTIVE,
+        user: str = "default",
+        cancel_token: Optional[CancellationToken] = None,
+        **kwargs
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        经调度后执行研究，事件与 ResearchCoalescer.research 相同
+
+        可以命中报告缓存或合并到进行中的运行时不排队、不占用槽位（点击正在预取的话题立即跟随该运行）。
+        需要排队时先产出一条 {"node": "queued", "priority", "position"} 事件；交互请求排队时抢占排队中的预取任务。
+
+        Args:
+            query: 研究问题
+            save_report: 是否保存报告
+            hot_topic_info: 热点话题信息
+            priority: 优先级类别
+            user: 用户标识
+            cancel_token: 取消令牌（排队期间同样生效）
+            **kwargs: 透传给 ResearchCoalescer.research 的参数
+
+        Yields:
+            研究事件
+        """
+        joined = self.coalescer.join(query, save_report=save_report, hot_topic_info=hot_topic_info,
+                                     cancel_token=cancel_token, **kwargs)
+        if joined is not None:
+            yield from joined
+            return
+
+        with self._lock:
+            must_wait = (
+                sum(self._running.values()) >= self.max_concurrent
+                or self._running[priority] >= self.class_limits[priority]
+                or any(self._queued_count(p) for p in Priority if p <= priority)
+            )
+            position = self._queued_count() + 1
+        if must_wait:
+            if priority == Priority.INTERACTIVE and self.preempt_queued(Priority.PREFETCH):
+                with self._lock:
+                    position = self._queued_count() + 1
+            yield {"node": "queued", "priority": priority.name.lower(), "position": position}
+
+        with self.slot(priority, user, cancel_token):
+            yield from self.coalescer.research(query, save_report=save_report, hot_topic_info=hot_topic_info,
+                                               cancel_token=cancel_token, **kwargs)
+
+    def preempt_queued(self, priority: Priority) -> int:
+        """
+        抢占某一类别的全部排队任务
+
+        Args:
+            priority: 类别
+
+        Returns:
+            被抢占的任务数
+        """
+        with self._lock:
+            count = 0
+            for user_queue in self._queues[priority].values():
+                for ticket in user_queue:
+                    ticket.preempted = True
+                    ticket.granted.set()
+                    count += 1
+            self._queues[priority].clear()
+            return count
+
+    def has_pending(self, priority: Priority = Priority.INTERACTIVE) -> bool:
+        """某一类别是否有运行中或排队中的任务"""
+        with self._lock:
+            return self._running[priority] > 0 or self._queued_count(priority) > 0
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """各类别运行中与排队中的任务数"""
+        with self._lock:
+            return {
+                priority.name.lower(): {
+                    "running": self._running[priority],
+                    "queued": self._queued_count(priority),
+                    "limit": self.class_limits[priority],
+                }
+                for priority in Priority
+            }
@@ -0,0 +1,291 @@
+"""
+研究请求合并（single-flight）
+相同查询与热点信息的并发请求共享同一次研究运行与进度流，
+刚完成的相同研究在短时间内直接从报告缓存返回
+"""
+
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Generator, List, Optional, Tuple
+
+from ..agent import DeepSearchAgent
+from ..utils.cancellation import CancellationToken
+
+FINAL_NODES = ("completed", "cancelled", "failed")
+
+
+def normalize_query(query: str) -> str:
+    """查询归一化：全半角统一、大小写统一、合并空白"""
+    return " ".join(unicodedata.normalize("NFKC", query).lower().split())
+
+
+def research_key(query: str, hot_topic_info: Optional[Dict[str, Any]] = None) -> str:
+    """
+    计算研究请求的合并键
+
+    热点信息只取稳定的话题 ID：界面、预取与批处理构造的热点信息字段不同，
+    且热度、排名、时间戳随每次爬取变化，整体参与计算会让同一话题的请求无法合并。
+
+    Args:
+        query: 研究问题
+        hot_topic_info: 热点话题信息
+
+    Returns:
+        归一化查询与话题 ID 组成的键
+    """
+    topic_id = (hot_topic_info or {}).get("id") or ""
+    return f"{normalize_query(query)}\n{topic_id}"
+
+
+class _Flight:
+    """一次进行中的共享研究"""
+
+    def __init__(self, key: str, query: str, timeout: Optional[float] = None, save_report: bool = True,
+                 research_kwargs: Optional[Dict[str, Any]] = None):
+        self.key = key
+        # 完成后报告写入缓存的键（强制重新生成结构的运行登记在独立的键下，结果仍按查询缓存）
+        self.cache_key = key
+        self.query = query
+        # 发起请求的参数，后加入的订阅者沿用这些参数
+        self.save_report = save_report
+        self.research_kwargs = research_kwargs or {}
+        self.events: List[Dict[str, Any]] = []
+        self.done = False
+        self.subscribers = 0
+        # 共享运行的截止时间：传给 agent.research 后 Agent 不再按 research_timeout 自建令牌
+        self.token = CancellationToken(timeout)
+        self.condition = threading.Condition()
+        # 由事件累积出的部分状态，供中途退出的订阅者生成部分报告
+        self.partial_state: Dict[str, Any] = {"report_title": "", "paragraphs": []}
+
+    def append(self, event: Dict[str, Any]):
+        delta = event.get("delta") or {}
+        if event["node"] == "structure" and "paragraph_titles" in delta:
+            self.partial_state = {
+                "report_title": delta.get("report_title", ""),
+                "paragraphs": [{"title": title, "latest_summary": ""} for title in delta["paragraph_titles"]],
+            }
+        elif event["node"] == "paragraph_completed":
+            paragraphs = self.partial_state["paragraphs"]
+            if 0 <= event["paragraph_index"] < len(paragraphs):
+                paragraphs[event["paragraph_index"]] = {"title": event["title"], "latest_summary": event["summary"]}
+
+        with self.condition:
+            self.events.append(event)
+            if event["node"] in FINAL_NODES:
+                self.done = True
+            self.condition.notify_all()
+
+
+class ResearchCoalescer:
+    """对 DeepSearchAgent.research 做请求合并与短期报告缓存"""
+
+    def __init__(self, agent: DeepSearchAgent, cache_ttl: float = 600, max_cached: int = 128):
+        """
+        初始化合并器
+
+        Args:
+            agent: 共享的 DeepSearchAgent
+            cache_ttl: 已完成报告的缓存秒数，0 表示不缓存
+            max_cached: 最多缓存多少份报告
+        """
+        self.agent = agent
+        self.cache_ttl = cache_ttl
+        self.max_cached = max_cached
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def _get_cached(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, event = entry
+        if expires_at < time.time():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return event
+
+    def _run_flight(self, flight: _Flight, save_report: bool, hot_topic_info: Optional[Dict[str, Any]],
+                    research_kwargs: Dict[str, Any]):
+        """后台线程：执行研究并把事件写入 flight"""
+        try:
+            for event in self.agent.research(flight.query, save_report=save_report, hot_topic_info=hot_topic_info,
+                                             cancel_token=flight.token, **research_kwargs):
+                flight.append(event)
+        except Exception as e:
+            flight.append({"node": "failed", "error": str(e)})
+        finally:
+            with self._lock:
+                if self._flights.get(flight.key) is flight:
+                    del self._flights[flight.key]
+                final_event = flight.events[-1] if flight.events else None
+                if self.cache_ttl and final_event and final_event["node"] == "completed":
+                    self._cache[flight.cache_key] = (time.time() + self.cache_ttl, final_event)
+                    self._cache.move_to_end(flight.cache_key)
+                    while len(self._cache) > self.max_cached:
+                        self._cache.popitem(last=False)
+
+    def research(
+        self,
+        query: str,
+        save_report: bool = True,
+        hot_topic_info: Optional[Dict[str, Any]] = None,
+        *,
+        cancel_token: Optional[CancellationToken] = None,
+        timeout: Optional[float] = None,
+        **research_kwargs
+    ) -> Generator[Dict[str, Any], None, None]:
+        """
+        与 DeepSearchAgent.research 相同的事件流，但相同请求只运行一次
+
+        后加入的订阅者会先收到已产生的全部事件；命中报告缓存时只返回一条带 "cached": True 的最终事件。
+        订阅者被取消时：若它是最后一个订阅者则取消共享运行并返回其部分报告，
+        否则只让该订阅者退出，共享运行继续为其他订阅者服务。
+
+        共享运行的截止时间与参数由发起运行的请求决定：截止时间取其 timeout，未指定时取其
+        cancel_token 的剩余时间，都没有时取 research_timeout。后加入的订阅者的 save_report 与
+        research_kwargs 不影响进行中的运行，与之不同时会打印提示。
+        fresh_outline=True 的请求要求重新生成报告结构，既不读报告缓存也不合并到进行中的运行。
+
+        Args:
+            query: 研究问题
+            save_report: 是否保存报告（仅对发起运行的请求生效）
+            hot_topic_info: 热点话题信息
+            cancel_token: 本订阅者的取消令牌
+            timeout: 本订阅者的最长等待秒数，发起运行时同时作为共享运行的截止时间
+            **research_kwargs: 发起运行时透传给 DeepSearchAgent.research 的参数
+
+        Yields:
+            研究事件
+        """
+        token = cancel_token or CancellationToken(timeout)
+        cached, flight = self._attach(query, save_report, hot_topic_info, token, timeout, research_kwargs, start=True)
+        yield from self._subscribe(query, token, cached, flight)
+
+    def join(
+        self,
+        query: str,
+        save_report: bool = True,
+        hot_topic_info: Optional[Dict[str, Any]] = None,
+        *,
+        cancel_token: Optional[CancellationToken] = None,
+        timeout: Optional[float] = None,
+        **research_kwargs
+    ) -> Optional[Generator[Dict[str, Any], None, None]]:
+        """
+        只命中报告缓存或合并到进行中的运行，不发起新运行（调度器据此决定是否需要占用槽位）
+
+        Args:
+            同 research
+
+        Returns:
+            与 research 相同的事件流（调用方必须消费或关闭它）；需要发起新运行时返回 None
+        """
+        token = cancel_token or CancellationToken(timeout)
+        cached, flight = self._attach(query, save_report, hot_topic_info, token, timeout, research_kwargs, start=False)
+        if cached is None and flight is None:
+            return None
+        return self._subscribe(query, token, cached, flight)
+
+    def _attach(self, query: str, save_report: bool, hot_topic_info: Optional[Dict[str, Any]],
+                token: CancellationToken, timeout: Optional[float], research_kwargs: Dict[str, Any],
+                start: bool) -> Tuple[Optional[Dict[str, Any]], Optional[_Flight]]:
+        """
+        查找报告缓存或进行中的运行并登记为订阅者，start 为 True 时在没有可合并的运行时发起新运行
+
+        Returns:
+            (缓存的最终事件, 订阅的运行)，二者至多一个不为 None
+        """
+        key = research_key(query, hot_topic_info)
+        fresh = bool(research_kwargs.get("fresh_outline"))
+
+        with self._lock:
+            cached = None if fresh else self._get_cached(key)
+            if cached is not None:
+                return cached, None
+            flight = self._flights.get(key)
+            if flight is None or fresh:
+                if not start:
+                    return None, None
+                deadline = timeout if timeout is not None else token.remaining()
+                flight_key = key if flight is None else f"{key}\nfresh-{id(token)}"
+                flight = _Flight(flight_key, query,
+                                 deadline if deadline is not None else self.agent.config.research_timeout,
+                                 save_report, research_kwargs)
+                flight.cache_key = key
+                self._flights[flight_key] = flight
+                threading.Thread(
+                    target=self._run_flight,
+                    args=(flight, save_report, hot_topic_info, research_kwargs),
+                    daemon=True,
+                    name="research-flight",
+                ).start()
+            else:
+                print(f"[singleflight] 合并到进行中的研究: {query}")
+                if save_report != flight.save_report or research_kwargs != flight.research_kwargs:
+                    print(f"[singleflight] 进行中的研究沿用发起请求的参数（save_report={flight.save_report}, "
+                          f"{flight.research_kwargs}），忽略本请求的 save_report={save_report}, {research_kwargs}")
+            flight.subscribers += 1
+            return None, flight
+
+    def _subscribe(self, query: str, token: CancellationToken, cached: Optional[Dict[str, Any]],
+                   flight: Optional[_Flight]) -> Generator[Dict[str, Any], None, None]:
+        """订阅者的事件流：缓存命中时只产出缓存的最终事件，否则跟随共享运行"""
+        if cached is not None:
+            print(f"[singleflight] 命中报告缓存: {query}")
+            yield {**cached, "cached": True}
+            return
+
+        def wake_up():
+            with flight.condition:
+                flight.condition.notify_all()
+
+        remove_callback = token.add_callback(wake_up)
+        index = 0
+        detached = False
+        try:
+            while True:
+                with flight.condition:
+                    while index >= len(flight.events) and not flight.done and (detached or not token.cancelled):
+                        remaining = token.remaining()
+                        flight.condition.wait(0.5 if remaining is None else min(0.5, remaining))
+                    pending = flight.events[index:]
+                    index = len(flight.events)
+
+                for event in pending:
+                    yield event
+                    if event["node"] in FINAL_NODES:
+                        return
+
+                if token.cancelled and not detached:
+                    detached = True
+                    with self._lock:
+                        last_subscriber = flight.subscribers == 1
+                    if last_subscriber:
+                        # 无人再等待结果：取消共享运行，继续消费直到拿到部分报告
+                        flight.token.cancel(token.reason or "cancelled")
+                        continue
+                    yield {
+                        "node": "cancelled",
+                        "report": self.agent._build_partial_report(flight.partial_state, query),
+                        "run_time": flight.events[-1].get("elapsed", 0.0) if flight.events else 0.0,
+                        "reason": token.reason,
+                        "report_path": None,
+                    }
+                    return
+        finally:
+            remove_callback()
+            with self._lock:
+                flight.subscribers -= 1
+                abandoned = flight.subscribers == 0 and not flight.done
+            if abandoned:
+                flight.token.cancel("all subscribers left")
+
+    def stats(self) -> Dict[str, int]:
+        """当前进行中的研究数与缓存报告数"""
+        with self._lock:
+            return {"in_flight": len(self._flights), "cached_reports": len(self._cache)}
@@ -0,0 +1,224 @@
+"""
+研究任务 worker
+从 SQLite 任务队列领取任务并运行 DeepSearchAgent，支持一次启动多个 worker 进程
+
+多台机器可以共享同一个队列文件（需确保所在文件系统支持 SQLite 文件锁）。
+
+用法:
+    python -m src.service.worker submit --from-db hot_topics.db --limit 40
+    python -m src.service.worker run --processes 4
+    python -m src.service.worker status
+"""
+
+import argparse
+import multiprocessing
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..agent import DeepSearchAgent
+from ..utils.cancellation import CancellationToken
+from ..utils.config import load_config
+from .batch import jobs_from_database, jobs_from_file
+from .job_queue import JobQueue, ResearchJob, default_worker_id
+from .scheduler import Priority, ResearchScheduler
+from .singleflight import ResearchCoalescer
+
+
+class ResearchWorker:
+    """单个 worker：循环领取任务、运行研究、写回结果"""
+
+    def __init__(self, queue: JobQueue, agent: DeepSearchAgent, worker_id: Optional[str] = None,
+                 poll_interval: float = 5.0, timeout: Optional[float] = None,
+                 scheduler: Optional[ResearchScheduler] = None):
+        """
+        初始化 worker
+
+        Args:
+            queue: 任务队列
+            agent: DeepSearchAgent 实例
+            worker_id: worker ID，默认 主机名:进程号
+            poll_interval: 队列为空时的轮询间隔（秒）
+            timeout: 单个任务最长运行秒数
+            scheduler: 研究调度器，任务以 BATCH 优先级提交；默认新建一个（worker 一次只运行一个任务）
+        """
+        self.queue = queue
+        self.agent = agent
+        self.scheduler = scheduler or ResearchScheduler(
+            ResearchCoalescer(agent), max_concurrent=1, class_limits={Priority.BATCH: 1}
+        )
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def _heartbeat_loop(self, job: ResearchJob, token: CancellationToken, stop: threading.Event):
+        """定期续租；租约丢失时取消正在进行的研究"""
+        interval = max(1.0, self.queue.lease_seconds / 3)
+        while not stop.wait(interval):
+            if not self.queue.heartbeat(job.id, self.worker_id):
+                print(f"[worker {self.worker_id}] 任务 {job.id} 租约已丢失，中止运行")
+                token.cancel("lease lost")
+                return
+
+    def process(self, job: ResearchJob):
+        """
+        运行单个任务并写回结果
+
+        Args:
+            job: 已领取的任务
+        """
+        token = CancellationToken(self.timeout or self.agent.config.research_timeout)
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, args=(job, token, stop), daemon=True)
+        heartbeat.start()
+
+        metrics: Dict[str, Any] = {"worker_id": self.worker_id, "attempt": job.attempts, "node_counts": {}}
+        final_event = None
+        try:
+            for event in self.scheduler.research(job.query, save_report=True, hot_topic_info=job.hot_topic_info,
+                                                 priority=Priority.BATCH, user=self.worker_id, cancel_token=token):
+                node = event["node"]
+                metrics["node_counts"][node] = metrics["node_counts"].get(node, 0) + 1
+                if "search_count" in event:
+                    metrics["search_count"] = event["search_count"]
+                if node == "failed":
+                    raise RuntimeError(event.get("error") or "研究失败")
+                if node in ("completed", "cancelled"):
+                    final_event = event
+            if final_event is None:
+                raise RuntimeError("研究未产生最终结果")
+
+            metrics["run_time"] = final_event.get("run_time", 0.0)
+            self.queue.complete(
+                job.id, self.worker_id,
+                status=final_event["node"],
+                report=final_event["report"],
+                report_path=final_event.get("report_path"),
+                metrics=metrics,
+                error=final_event.get("reason"),
+            )
+        except Exception as e:
+            print(f"[worker {self.worker_id}] 任务 {job.id} 失败: {e}")
+            self.queue.fail(job.id, self.worker_id, str(e))
+        finally:
+            stop.set()
+
+    def run(self, max_jobs: Optional[int] = None, exit_when_idle: bool = False):
+        """
+        worker 主循环
+
+        Args:
+            max_jobs: 处理多少个任务后退出，None 表示不限
+            exit_when_idle: 队列为空时是否退出
+        """
+        processed = 0
+        print(f"[worker {self.worker_id}] 已启动")
+        while max_jobs is None or processed < max_jobs:
+            job = self.queue.lease(self.worker_id)
+            if job is None:
+                if exit_when_idle:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+
+            print(f"[worker {self.worker_id}] 领取任务 {job.id}: {job.query}（第 {job.attempts} 次尝试）")
+            self.process(job)
+            processed += 1
+
+        print(f"[worker {self.worker_id}] 退出，共处理 {processed} 个任务")
+
+
+def run_worker(queue_path: str, config_file: Optional[str] = None, lease_seconds: int = 300,
+               max_jobs: Optional[int] = None, exit_when_idle: bool = False, timeout: Optional[float] = None):
+    """
+    在当前进程中启动一个 worker（也是子进程的入口函数）
+
+    Args:
+        queue_path: 队列数据库路径
+        config_file: 配置文件路径
+        lease_seconds: 租约时长（秒）
+        max_jobs: 处理多少个任务后退出
+        exit_when_idle: 队列为空时是否退出
+        timeout: 单个任务最长运行秒数
+    """
+    agent = DeepSearchAgent(load_config(config_file))
+    queue = JobQueue(queue_path, lease_seconds=lease_seconds)
+    ResearchWorker(queue, agent, timeout=timeout).run(max_jobs=max_jobs, exit_when_idle=exit_when_idle)
+
+
+def launch_workers(processes: int, **worker_kwargs) -> List[multiprocessing.Process]:
+    """
+    启动多个 worker 进程
+
+    Args:
+        processes: 进程数
+        **worker_kwargs: 传给 run_worker 的参数
+
+    Returns:
+        已启动的进程列表
+    """
+    workers = []
+    for _ in range(processes):
+        process = multiprocessing.Process(target=run_worker, kwargs=worker_kwargs, daemon=False)
+        process.start()
+        workers.append(process)
+    return workers
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="研究任务队列与 worker")
+    parser.add_argument("--queue", default="research_jobs.db", help="队列数据库路径")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    submit_parser = subparsers.add_parser("submit", help="提交任务")
+    source = submit_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--from-db", help="从热榜数据库提交当前话题")
+    source.add_argument("--queries-file", help="从查询文件提交")
+    source.add_argument("--query", help="提交单个查询")
+    submit_parser.add_argument("--limit", type=int, default=None, help="最多提交多少个任务")
+    submit_parser.add_argument("--priority", type=int, default=0, help="任务优先级")
+
+    run_parser = subparsers.add_parser("run", help="启动 worker")
+    run_parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count(), help="worker 进程数")
+    run_parser.add_argument("--config", default=None, help="配置文件路径")
+    run_parser.add_argument("--lease-seconds", type=int, default=300, help="租约时长（秒）")
+    run_parser.add_argument("--max-jobs", type=int, default=None, help="每个 worker 处理多少个任务后退出")
+    run_parser.add_argument("--exit-when-idle", action="store_true", help="队列为空时退出")
+    run_parser.add_argument("--timeout", type=float, default=None, help="单个任务最长运行秒数")
+
+    subparsers.add_parser("status", help="查看队列状态")
+    args = parser.parse_args(argv)
+
+    if args.command == "submit":
+        queue = JobQueue(args.queue)
+        if args.query:
+            jobs = [(args.query, None)]
+        elif args.queries_file:
+            jobs = [(job.query, job.hot_topic_info) for job in jobs_from_file(args.queries_file, args.limit)]
+        else:
+            jobs = [(job.query, job.hot_topic_info) for job in jobs_from_database(args.from_db, args.limit)]
+        for query, hot_topic_info in jobs:
+            queue.submit(query, hot_topic_info, priority=args.priority)
+        print(f"已提交 {len(jobs)} 个任务")
+
+    elif args.command == "run":
+        workers = launch_workers(
+            args.processes,
+            queue_path=args.queue,
+            config_file=args.config,
+            lease_seconds=args.lease_seconds,
+            max_jobs=args.max_jobs,
+            exit_when_idle=args.exit_when_idle,
+            timeout=args.timeout,
+        )
+        print(f"已启动 {len(workers)} 个 worker 进程")
+        for process in workers:
+            process.join()
+
+    else:
+        print(JobQueue(args.queue).stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""
+本地存储模块
+提供研究过程中使用的磁盘侧存储与全文检索索引
+"""
+
+from .content_store import ContentStore
+from .search_index import SearchIndex
+from .outline_cache import OutlineCache
+
+__all__ = ["ContentStore", "SearchIndex", "OutlineCache"]
@@ -0,0 +1,336 @@
+"""
+搜索内容侧存储
+以内容哈希为键把搜索结果正文存入 SQLite，图状态中只保留 ID 与少量元数据；
+同时记录每次搜索的查询与结果列表，相近查询在有效期内可直接复用，不再请求搜索 API；
+长正文压缩后的来源笔记也按内容哈希缓存，同一篇文章只总结一次
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from .search_index import literal_tokens, query_similarity
+
+
+class ContentStore:
+    """内容寻址的正文存储（SQLite BLOB，zlib 压缩）"""
+
+    def __init__(self, db_path: str = "cache/search_content.db"):
+        """
+        初始化内容存储
+
+        Args:
+            db_path: SQLite 数据库文件路径
+        """
+        self.db_path = db_path
+        self.init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_db(self):
+        """初始化数据库表结构"""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        # WAL 模式允许多个线程/进程并发读写
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS contents (
+                id TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                size INTEGER,
+                created_at TEXT
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS searches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT NOT NULL,
+                results TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_searches_created ON searches (created_at)")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS notes (
+                id TEXT PRIMARY KEY,
+                notes TEXT NOT NULL,
+                created_at TEXT
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def content_id(text: str) -> str:
+        """计算正文的内容 ID（sha256）"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def put(self, text: str) -> str:
+        """
+        写入正文，相同内容只保存一份（再次写入时刷新写入时间，仍被引用的正文不会被 prune 清除）
+
+        Args:
+            text: 正文
+
+        Returns:
+            内容 ID
+        """
+        return self.put_many([text])[0]
+
+    def put_many(self, texts: List[str]) -> List[str]:
+        """
+        批量写入正文
+
+        Args:
+            texts: 正文列表
+
+        Returns:
+            与输入一一对应的内容 ID 列表
+        """
+        ids = [self.content_id(text) for text in texts]
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT INTO contents (id, data, size, created_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET created_at = excluded.created_at
+        ''', [
+            (content_id, zlib.compress(text.encode("utf-8")), len(text), created_at)
+            for content_id, text in zip(ids, texts)
+        ])
+        conn.commit()
+        conn.close()
+        return ids
+
+    def get(self, content_id: str) -> Optional[str]:
+        """
+        读取正文
+
+        Args:
+            content_id: 内容 ID
+
+        Returns:
+            正文，不存在时返回 None
+        """
+        return self.get_many([content_id]).get(content_id)
+
+    def get_many(self, content_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        批量读取正文
+
+        Args:
+            content_ids: 内容 ID 列表
+
+        Returns:
+            {内容 ID: 正文}
+        """
+        content_ids = list(dict.fromkeys(content_ids))
+        if not content_ids:
+            return {}
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        placeholders = ",".join("?" for _ in content_ids)
+        cursor.execute(f"SELECT id, data FROM contents WHERE id IN ({placeholders})", content_ids)
+        rows = cursor.fetchall()
+        conn.close()
+
+        return {row[0]: zlib.decompress(row[1]).decode("utf-8") for row in rows}
+
+    def offload_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        把搜索结果正文移入存储，返回只含 ID 与元数据的结果
+
+        Args:
+            results: tavily_search 返回的结果列表
+
+        Returns:
+            [{"title", "url", "score", "content_id", "content_length"}, ...]
+        """
+        contents = [result.get("content") or "" for result in results]
+        ids = self.put_many(contents)
+
+        slim_results = []
+        for result, content, content_id in zip(results, contents, ids):
+            slim = {key: value for key, value in result.items() if key != "content"}
+            slim["content_id"] = content_id
+            slim["content_length"] = len(content)
+            slim_results.append(slim)
+        return slim_results
+
+    def load_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        按需加载正文，还原为带 content 字段的结果
+
+        Args:
+            results: 状态中保存的结果列表
+
+        Returns:
+            带 content 字段的结果列表
+        """
+        contents = self.get_many(r["content_id"] for r in results if "content_id" in r)
+
+        loaded = []
+        for result in results:
+            if "content_id" in result:
+                result = {**result, "content": contents.get(result["content_id"], "")}
+            loaded.append(result)
+        return loaded
+
+    def record_search(self, query: str, results: List[Dict[str, Any]]):
+        """
+        记录一次搜索
+
+        Args:
+            query: 搜索查询
+            results: offload_results 返回的结果列表（只含 ID 与元数据）
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO searches (query, results, created_at) VALUES (?, ?, ?)",
+            (query, json.dumps(results, ensure_ascii=False), datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        )
+        conn.commit()
+        conn.close()
+
+    def find_search(self, query: str, max_age: int, min_similarity: float = 0.8) -> Optional[Dict[str, Any]]:
+        """
+        查找有效期内查询相近的搜索记录
+
+        搜索结果只在数字与字母单词（年份、型号等，见 literal_tokens）完全相同的查询之间复用，
+        模糊相似度只比较其余文字；"2024年高考报名人数" 与 "2025年高考报名人数" 相似度虽高，也不会互相复用。
+
+        Args:
+            query: 搜索查询
+            max_age: 有效期（秒）
+            min_similarity: 最低查询相似度（见 query_similarity），1.0 表示只复用规范化后相同的查询
+
+        Returns:
+            最相近且最新的记录 {"query", "results", "created_at", "similarity"}，没有时返回 None
+        """
+        cutoff_str = (datetime.now() - timedelta(seconds=max_age)).strftime("%Y-%m-%d %H:%M:%S")
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT query, results, created_at FROM searches WHERE created_at >= ? ORDER BY created_at DESC",
+            (cutoff_str,),
+        )
+        rows = cursor.fetchall()
+        conn.close()
+
+        literals = literal_tokens(query)
+        best = None
+        for cached_query, results, created_at in rows:
+            if literal_tokens(cached_query) != literals:
+                continue
+            similarity = query_similarity(query, cached_query)
+            if similarity >= min_similarity and (best is None or similarity > best["similarity"]):
+                best = {"query": cached_query, "results": json.loads(results),
+                        "created_at": created_at, "similarity": similarity}
+        return best
+
+    def get_notes(self, content_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        批量读取来源笔记
+
+        Args:
+            content_ids: 内容 ID 列表
+
+        Returns:
+            {内容 ID: 笔记}，没有笔记的 ID 不在结果中
+        """
+        content_ids = list(dict.fromkeys(content_ids))
+        if not content_ids:
+            return {}
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        placeholders = ",".join("?" for _ in content_ids)
+        cursor.execute(f"SELECT id, notes FROM notes WHERE id IN ({placeholders})", content_ids)
+        rows = cursor.fetchall()
+        conn.close()
+        return dict(rows)
+
+    def put_notes(self, notes: Dict[str, str]):
+        """
+        写入来源笔记
+
+        Args:
+            notes: {内容 ID: 笔记}
+        """
+        if not notes:
+            return
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT OR REPLACE INTO notes (id, notes, created_at) VALUES (?, ?, ?)",
+            [(content_id, text, created_at) for content_id, text in notes.items()],
+        )
+        conn.commit()
+        conn.close()
+
+    def prune(self, days: int = 7):
+        """
+        清除指定天数前写入的正文
+
+        Args:
+            days: 保留天数
+        """
+        cutoff_str = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM contents WHERE created_at < ?", (cutoff_str,))
+        cursor.execute("DELETE FROM searches WHERE created_at < ?", (cutoff_str,))
+        cursor.execute("DELETE FROM notes WHERE created_at < ?", (cutoff_str,))
+        conn.commit()
+        conn.close()
+
+
+def store_search_results(config: Optional[dict], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    节点使用：如果配置了 content_store，则把结果正文移出图状态
+
+    Args:
+        config: RunnableConfig
+        results: 搜索结果
+
+    Returns:
+        写入状态的结果列表
+    """
+    store = (config or {}).get("configurable", {}).get("content_store")
+    if store is None or not results:
+        return results
+    return store.offload_results(results)
+
+
+def load_search_results(config: Optional[dict], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    节点使用：需要正文时从 content_store 懒加载
+
+    Args:
+        config: RunnableConfig
+        results: 状态中的结果列表
+
+    Returns:
+        带 content 字段的结果列表
+    """
+    store = (config or {}).get("configurable", {}).get("content_store")
+    if store is None or not results:
+        return results
+    return store.load_results(results)
@@ -0,0 +1,182 @@
+"""
+报告结构缓存
+舆情分析报告的结构大多是少数几种形态（事件概况、公众反应、官方回应、后续走向……）的变体。
+每次生成的结构按查询与话题类别存入 SQLite，新查询与同类别、相似度足够高的历史查询匹配时
+直接复用其结构（把原查询替换为新查询），省去生成结构的 LLM 调用。
+原查询中新查询没有的词（"小米发布新手机" 相对 "华为发布新手机" 的 "小米"，年份、型号等）
+若仍出现在改写后的结构里，该结构讲的是另一个对象，不复用
+"""
+
+import json
+import os
+import sqlite3
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from .search_index import distinctive_terms, query_similarity
+
+# 话题类别关键词，命中最多的类别即为查询的类别；不同类别的结构不互相复用
+_CATEGORY_KEYWORDS = {
+    "事故灾害": ["火灾", "大火", "地震", "爆炸", "事故", "坍塌", "台风", "洪水", "暴雨", "遇难", "伤亡", "救援", "坠毁"],
+    "公共政策": ["政策", "新规", "条例", "改革", "规定", "通知", "发布会", "政府", "部门"],
+    "娱乐明星": ["明星", "演唱会", "电影", "综艺", "官宣", "恋情", "离婚", "票房", "歌手", "演员", "电视剧"],
+    "体育赛事": ["比赛", "夺冠", "冠军", "决赛", "奥运", "世界杯", "联赛", "国足", "球队", "NBA"],
+    "科技产品": ["手机", "芯片", "人工智能", "AI", "大模型", "新品", "发布会", "系统", "华为", "苹果"],
+    "财经商业": ["股市", "A股", "涨停", "上市", "财报", "融资", "裁员", "油价", "房价", "银行", "降息"],
+    "社会民生": ["学校", "医院", "教育", "就业", "工资", "养老", "物价", "食品", "维权", "高考", "考研"],
+    "国际时事": ["美国", "俄罗斯", "乌克兰", "日本", "以色列", "联合国", "总统", "外交", "制裁", "大选"],
+}
+
+
+def classify_query(query: str) -> Optional[str]:
+    """
+    按关键词判断查询的话题类别
+
+    Args:
+        query: 查询
+
+    Returns:
+        类别名，没有命中任何关键词时返回 None
+    """
+    lowered = query.lower()
+    scores = {
+        category: sum(keyword.lower() in lowered for keyword in keywords)
+        for category, keywords in _CATEGORY_KEYWORDS.items()
+    }
+    category, score = max(scores.items(), key=lambda item: item[1])
+    return category if score else None
+
+
+class OutlineCache:
+    """报告结构缓存（SQLite）"""
+
+    def __init__(self, db_path: str = "cache/outline_cache.db"):
+        """
+        初始化结构缓存
+
+        Args:
+            db_path: SQLite 数据库文件路径
+        """
+        self.db_path = db_path
+        self.init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_db(self):
+        """初始化数据库表结构"""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS outlines (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT NOT NULL,
+                category TEXT,
+                report_title TEXT NOT NULL,
+                paragraphs TEXT NOT NULL,
+                hits INTEGER DEFAULT 0,
+                created_at TEXT NOT NULL
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_outlines_category ON outlines (category, created_at)")
+        conn.commit()
+        conn.close()
+
+    def save(self, query: str, report_title: str, paragraphs: List[Dict[str, str]]):
+        """
+        保存新生成的结构
+
+        Args:
+            query: 查询
+            report_title: 报告标题
+            paragraphs: [{"title", "content"}]
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO outlines (query, category, report_title, paragraphs, created_at) VALUES (?, ?, ?, ?, ?)",
+            (query, classify_query(query), report_title,
+             json.dumps([{"title": p["title"], "content": p["content"]} for p in paragraphs], ensure_ascii=False),
+             datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        )
+        conn.commit()
+        conn.close()
+
+    def find(self, query: str, min_similarity: float = 0.7, max_age: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        查找可复用的结构：同一类别（或都未分类）中与查询最相近、相似度达到阈值，
+        且改写后不再提及原查询特有词的历史结构
+
+        Args:
+            query: 查询
+            min_similarity: 最低查询相似度（见 query_similarity）
+            max_age: 只复用多少秒内生成的结构，None 表示不限
+
+        Returns:
+            改写为新查询后的结构 {"query", "category", "report_title", "paragraphs", "similarity", "created_at"}，
+            没有可复用的结构时返回 None
+        """
+        category = classify_query(query)
+        sql = "SELECT id, query, report_title, paragraphs, created_at FROM outlines WHERE category IS ?"
+        params: List[Any] = [category]
+        if max_age is not None:
+            sql += " AND created_at >= ?"
+            params.append((datetime.now() - timedelta(seconds=max_age)).strftime("%Y-%m-%d %H:%M:%S"))
+        sql += " ORDER BY created_at DESC LIMIT 500"
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+        candidates = []
+        for outline_id, cached_query, report_title, paragraphs, created_at in rows:
+            similarity = query_similarity(query, cached_query)
+            if similarity >= min_similarity:
+                candidates.append((similarity, outline_id, cached_query, report_title, paragraphs, created_at))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        found = None
+        for similarity, outline_id, cached_query, report_title, paragraphs, created_at in candidates:
+            outline = {
+                "query": cached_query,
+                "category": category,
+                "report_title": _adapt(report_title, cached_query, query),
+                "paragraphs": [
+                    {"title": _adapt(p["title"], cached_query, query),
+                     "content": _adapt(p["content"], cached_query, query)}
+                    for p in json.loads(paragraphs)
+                ],
+                "similarity": round(similarity, 4),
+                "created_at": created_at,
+            }
+            if not _mentions_other_subject(outline, cached_query, query):
+                found = (outline_id, outline)
+                break
+
+        if found is not None:
+            cursor.execute("UPDATE outlines SET hits = hits + 1 WHERE id = ?", (found[0],))
+            conn.commit()
+        conn.close()
+        return found[1] if found is not None else None
+
+
+def _adapt(text: str, cached_query: str, query: str) -> str:
+    # 轻量改写：结构中出现的原查询换成新查询
+    return text.replace(cached_query, query) if cached_query != query else text
+
+
+def _mentions_other_subject(outline: Dict[str, Any], cached_query: str, query: str) -> bool:
+    """改写后的结构是否仍提及原查询特有的词（见 distinctive_terms）"""
+    terms = distinctive_terms(cached_query, query)
+    if not terms:
+        return False
+    text = " ".join([outline["report_title"]] + [p["title"] + " " + p["content"] for p in outline["paragraphs"]])
+    text = unicodedata.normalize("NFKC", text).lower()
+    return any(term in text for term in terms)
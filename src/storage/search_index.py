@@ -0,0 +1,472 @@
+"""
+全文检索索引
+用 SQLite FTS5 为历次爬取的热点话题标题与保存的研究报告建立全文索引。
+中文没有空格分词，写入前把文本切成字符二元组（"香港大火" → "香港 港大 大火 火"），
+查询同样切分后按短语匹配，两个字以上的查询都走倒排索引，耗时与归档规模基本无关。
+FTS 表不保存内容（content=''），原文只在 documents 表中保存一份。
+"""
+
+import glob
+import os
+import re
+import sqlite3
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..hot_topics.models import HotTopic
+
+# 中日韩文字连续片段，或字母数字单词
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_RUN = re.compile(f"[{_CJK}]+|[^\\W_{_CJK}]+")
+_CJK_RUN = re.compile(f"^[{_CJK}]+$")
+_REPORT_NAME = re.compile(r"^deep_search_report_(.*)_(\d{8}_\d{6})\.md$")
+
+KINDS = ("topic", "report")
+
+
+def _runs(text: str) -> List[str]:
+    return _RUN.findall(unicodedata.normalize("NFKC", text or "").lower())
+
+
+def ngram_terms(text: str) -> str:
+    """
+    把文本切分为索引词：中文片段切成字符二元组并补上末字，字母数字按单词
+
+    Args:
+        text: 原文
+
+    Returns:
+        空格分隔的索引词
+    """
+    terms = []
+    for run in _runs(text):
+        if _CJK_RUN.match(run) and len(run) > 1:
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+            terms.append(run[-1])     # 末字单独成词，单字查询也能命中片段结尾
+        else:
+            terms.append(run)
+    return " ".join(terms)
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    把用户输入转换为 FTS5 MATCH 表达式：各片段之间为 AND，中文片段按二元组短语匹配，单字与单词按前缀匹配
+
+    Args:
+        query: 用户输入
+
+    Returns:
+        MATCH 表达式，输入中没有可检索的字符时返回 None
+    """
+    parts = []
+    for run in _runs(query):
+        if _CJK_RUN.match(run) and len(run) > 1:
+            parts.append('"' + " ".join(run[i:i + 2] for i in range(len(run) - 1)) + '"')
+        else:
+            parts.append(f'"{run}"*')
+    return " AND ".join(parts) or None
+
+
+def text_features(text: str) -> Set[str]:
+    """文本的单字、二元组与单词集合，用于比较两个短文本（查询、标题）的相似度"""
+    features = set()
+    for run in _runs(text):
+        if _CJK_RUN.match(run):
+            features.update(run)
+            features.update(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            features.add(run)
+    return features
+
+
+def query_similarity(a: str, b: str) -> float:
+    """
+    两个查询的相似度（单字 + 二元组集合的 Jaccard 系数），措辞不同的同一事件
+    （"香港大火" / "香港火灾"）约为 0.4，只共享地名等泛词的查询（"香港大火" / "香港股市"）约为 0.27
+
+    Args:
+        a: 查询 A
+        b: 查询 B
+
+    Returns:
+        0~1 的相似度
+    """
+    features_a, features_b = text_features(a), text_features(b)
+    if not features_a or not features_b:
+        return 0.0
+    return len(features_a & features_b) / len(features_a | features_b)
+
+
+def literal_tokens(text: str) -> Set[str]:
+    """
+    文本中的数字与字母单词（年份、型号、版本号等），措辞相近但这些词不同的查询说的是不同的对象
+    （"2024年高考" / "2025年高考"、"Model 3" / "Model Y"）
+
+    Args:
+        text: 文本
+
+    Returns:
+        规范化（NFKC、小写）后的数字与字母单词集合
+    """
+    return {run for run in _runs(text) if not _CJK_RUN.match(run)}
+
+
+def distinctive_terms(text: str, other: str) -> List[str]:
+    """
+    text 中 other 没有的词：other 中没有的数字与字母单词，以及不被两者共有二元组覆盖的连续中文片段（两字以上），
+    如 "小米发布新手机" 相对 "华为发布新手机" 为 ["小米"]
+
+    Args:
+        text: 文本
+        other: 用于比较的另一个文本
+
+    Returns:
+        规范化（NFKC、小写）后的词列表
+    """
+    features = text_features(other)
+    terms = []
+    for run in _runs(text):
+        if not _CJK_RUN.match(run):
+            if run not in features:
+                terms.append(run)
+            continue
+        covered = [False] * len(run)
+        for i in range(len(run) - 1):
+            if run[i:i + 2] in features:
+                covered[i:i + 2] = [True, True]
+        start = None
+        for i, is_covered in enumerate(covered + [True]):
+            if not is_covered and start is None:
+                start = i
+            elif is_covered and start is not None:
+                if i - start > 1:
+                    terms.append(run[start:i])
+                start = None
+    return terms
+
+
+def make_snippet(text: str, query: str, width: int = 80) -> str:
+    """截取原文中第一个命中片段附近的文字"""
+    text = " ".join((text or "").split())
+    lowered = unicodedata.normalize("NFKC", text).lower()
+    positions = [lowered.find(run) for run in _runs(query)]
+    positions = [p for p in positions if p >= 0]
+    start = max(0, min(positions) - width // 4) if positions else 0
+    snippet = text[start:start + width]
+    return ("…" if start else "") + snippet + ("…" if start + width < len(text) else "")
+
+
+class SearchIndex:
+    """热点话题与研究报告的全文索引"""
+
+    def __init__(self, db_path: str = "cache/search_index.db"):
+        """
+        初始化全文索引
+
+        Args:
+            db_path: SQLite 数据库文件路径
+        """
+        self.db_path = db_path
+        self.init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def init_db(self):
+        """初始化数据库表结构"""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        # WAL 模式允许爬取进程与研究进程并发写入
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                title TEXT NOT NULL,
+                body TEXT,
+                platform TEXT,
+                created_at TEXT,
+                updated_at TEXT,
+                UNIQUE (kind, key)
+            )
+        ''')
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts
+            USING fts5(title, body, content='', tokenize='unicode61')
+        ''')
+        conn.commit()
+        conn.close()
+
+    # ---------- 写入 ----------
+
+    def _upsert(self, cursor, kind: str, documents: List[Tuple[str, str, str, Optional[str], str]]) -> int:
+        """
+        写入文档，已存在且标题与正文不变的只更新 updated_at；同一批中重复的键以最后一条为准
+
+        Args:
+            cursor: 数据库游标
+            kind: 文档类型
+            documents: [(key, title, body, platform, created_at)]
+
+        Returns:
+            新增或内容变化的文档数
+        """
+        if not documents:
+            return 0
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        documents = list({doc[0]: doc for doc in documents}.values())
+        keys = [doc[0] for doc in documents]
+        existing = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            cursor.execute(
+                f"SELECT key, id, title, body FROM documents WHERE kind = ? AND key IN ({','.join('?' * len(chunk))})",
+                [kind, *chunk],
+            )
+            existing.update({row[0]: row[1:] for row in cursor.fetchall()})
+
+        changed = 0
+        for key, title, body, platform, created_at in documents:
+            old = existing.get(key)
+            if old and old[1] == title and (old[2] or "") == (body or ""):
+                cursor.execute("UPDATE documents SET updated_at = ? WHERE id = ?", (now, old[0]))
+                continue
+            if old:
+                # 无内容 FTS 表删除时需要提供原来的索引词
+                cursor.execute(
+                    "INSERT INTO documents_fts (documents_fts, rowid, title, body) VALUES ('delete', ?, ?, ?)",
+                    (old[0], ngram_terms(old[1]), ngram_terms(old[2])),
+                )
+                cursor.execute(
+                    "UPDATE documents SET title = ?, body = ?, platform = ?, updated_at = ? WHERE id = ?",
+                    (title, body, platform, now, old[0]),
+                )
+                rowid = old[0]
+            else:
+                cursor.execute('''
+                    INSERT INTO documents (kind, key, title, body, platform, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (kind, key, title, body, platform, created_at or now, now))
+                rowid = cursor.lastrowid
+            cursor.execute(
+                "INSERT INTO documents_fts (rowid, title, body) VALUES (?, ?, ?)",
+                (rowid, ngram_terms(title), ngram_terms(body)),
+            )
+            changed += 1
+        return changed
+
+    def index_topics(self, topics: Iterable[HotTopic]) -> int:
+        """
+        索引热点话题标题（按话题 ID 去重，重复上榜只更新 updated_at）
+
+        Args:
+            topics: 话题列表
+
+        Returns:
+            新增或标题变化的话题数
+        """
+        documents = [(topic.id, topic.title, "", topic.platform, topic.timestamp or None) for topic in topics]
+        conn = self._connect()
+        cursor = conn.cursor()
+        changed = self._upsert(cursor, "topic", documents)
+        conn.commit()
+        conn.close()
+        return changed
+
+    def index_report(self, path: str, query: str, content: str, created_at: Optional[str] = None) -> bool:
+        """
+        索引研究报告
+
+        Args:
+            path: 报告文件路径（作为文档键）
+            query: 研究问题
+            content: 报告正文
+            created_at: 生成时间，默认当前时间
+
+        Returns:
+            是否新增或内容有变化
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        changed = self._upsert(cursor, "report", [(os.path.abspath(path), query, content, None, created_at)])
+        conn.commit()
+        conn.close()
+        return bool(changed)
+
+    def sync_reports(self, output_dir: str) -> int:
+        """
+        索引报告目录中尚未入库的报告文件（用于补建历史报告的索引）
+
+        Args:
+            output_dir: 报告目录
+
+        Returns:
+            新索引的报告数
+        """
+        paths = {os.path.abspath(path) for path in glob.glob(os.path.join(output_dir, "*.md"))}
+        if not paths:
+            return 0
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT key FROM documents WHERE kind = 'report'")
+        paths -= {row[0] for row in cursor.fetchall()}
+
+        documents = []
+        for path in sorted(paths):
+            match = _REPORT_NAME.match(os.path.basename(path))
+            query = match.group(1).replace("_", " ") if match else os.path.splitext(os.path.basename(path))[0]
+            created_at = (datetime.strptime(match.group(2), "%Y%m%d_%H%M%S") if match
+                          else datetime.fromtimestamp(os.path.getmtime(path))).strftime("%Y-%m-%d %H:%M:%S")
+            try:
+                with open(path, encoding="utf-8") as f:
+                    documents.append((path, query, f.read(), None, created_at))
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"跳过无法读取的报告 {path}: {e}")
+        changed = self._upsert(cursor, "report", documents)
+        conn.commit()
+        conn.close()
+        return changed
+
+    def attach(self, db):
+        """
+        在热榜数据库上注册保存回调，热榜变化时索引新上榜的话题；索引中还没有话题时先从话题历史补建
+
+        Args:
+            db: DatabaseManager
+        """
+        if not self.count("topic"):
+            history = [HotTopic(id=topic_id, title=title, platform=platform, hot_value=0, url="",
+                                timestamp=first_seen, rank=0)
+                       for topic_id, platform, title, first_seen in db.get_topic_titles()]
+            # 历史记录排在后面，首次上榜时间取自历史
+            self.index_topics(db.get_all_topics() + history)
+
+        def on_topics_saved(topics: List[HotTopic], previous_ranks):
+            self.index_topics(topics)
+
+        db.add_save_listener(on_topics_saved)
+
+    # ---------- 查询 ----------
+
+    def count(self, kind: Optional[str] = None) -> int:
+        """已索引的文档数"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        if kind:
+            cursor.execute("SELECT COUNT(*) FROM documents WHERE kind = ?", (kind,))
+        else:
+            cursor.execute("SELECT COUNT(*) FROM documents")
+        result = cursor.fetchone()[0]
+        conn.close()
+        return result
+
+    def search(self, query: str, kind: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        全文检索
+
+        Args:
+            query: 检索词，多个词用空格分隔时需全部命中
+            kind: 只检索 topic 或 report，默认全部
+            limit: 最多返回多少条
+
+        Returns:
+            按相关度排序的结果：[{"kind", "key", "title", "platform", "created_at", "updated_at", "snippet", "score"}]
+            报告的 key 为文件路径，话题的 key 为话题 ID
+        """
+        if kind is not None and kind not in KINDS:
+            raise ValueError(f"不支持的文档类型: {kind}，可选: {', '.join(KINDS)}")
+        match = build_match_query(query)
+        if not match:
+            return []
+
+        sql = '''
+            SELECT d.kind, d.key, d.title, d.body, d.platform, d.created_at, d.updated_at,
+                   bm25(documents_fts, 5.0, 1.0) AS score
+            FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+            WHERE documents_fts MATCH ?
+        '''
+        params: List[Any] = [match]
+        if kind:
+            sql += " AND d.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [
+            {
+                "kind": row[0],
+                "key": row[1],
+                "title": row[2],
+                "platform": row[4],
+                "created_at": row[5],
+                "updated_at": row[6],
+                "snippet": make_snippet(row[3] or row[2], query),
+                "score": round(-row[7], 4),
+            }
+            for row in rows
+        ]
+
+    def similar(self, query: str, kind: str = "report", limit: int = 3, max_age: Optional[int] = None,
+                min_similarity: float = 0.35) -> List[Dict[str, Any]]:
+        """
+        查找标题与查询相近的文档（用于复用历史报告）：任一二元组命中标题即为候选，再按相似度过滤
+
+        Args:
+            query: 查询
+            kind: 文档类型
+            limit: 最多返回多少条
+            max_age: 只返回多少秒内生成的文档，None 表示不限
+            min_similarity: 最低相似度，见 query_similarity
+
+        Returns:
+            按相似度、生成时间降序排列的结果：[{"kind", "key", "title", "body", "platform", "created_at", "similarity"}]
+        """
+        terms = [term for term in ngram_terms(query).split() if len(term) > 1] or ngram_terms(query).split()
+        if not terms:
+            return []
+        match = "title : (" + " OR ".join(f'"{term}"' for term in dict.fromkeys(terms)) + ")"
+
+        sql = '''
+            SELECT d.kind, d.key, d.title, d.body, d.platform, d.created_at
+            FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+            WHERE documents_fts MATCH ? AND d.kind = ?
+        '''
+        params: List[Any] = [match, kind]
+        if max_age is not None:
+            sql += " AND d.created_at >= ?"
+            params.append((datetime.now() - timedelta(seconds=max_age)).strftime("%Y-%m-%d %H:%M:%S"))
+        sql += " ORDER BY bm25(documents_fts, 5.0, 1.0) LIMIT 200"
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        conn.close()
+
+        results = []
+        for row in rows:
+            similarity = query_similarity(query, row[2])
+            if similarity >= min_similarity:
+                results.append({
+                    "kind": row[0],
+                    "key": row[1],
+                    "title": row[2],
+                    "body": row[3],
+                    "platform": row[4],
+                    "created_at": row[5],
+                    "similarity": round(similarity, 4),
+                })
+        results.sort(key=lambda result: (result["similarity"], result["created_at"] or ""), reverse=True)
+        return results[:limit]
@@ -8,6 +8,8 @@ from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from tavily import TavilyClient
 
+from ..utils.cancellation import CancellationToken, ResearchCancelled
+
 
 @dataclass
 class SearchResult:
@@ -88,6 +90,8 @@ class TavilySearch:
 
 # 全局搜索客户端实例
 _tavily_client = None
+# 按 API Key 复用的客户端，避免每次搜索都新建客户端
+_tavily_clients: Dict[str, TavilySearch] = {}
 
 
 def get_tavily_client() -> TavilySearch:
@@ -99,7 +103,8 @@ def get_tavily_client() -> TavilySearch:
 
 
 def tavily_search(query: str, max_results: int = 5, include_raw_content: bool = True, 
-                  timeout: int = 240, api_key: Optional[str] = None) -> List[Dict[str, Any]]:
+                  timeout: int = 240, api_key: Optional[str] = None,
+                  cancel_token: Optional[CancellationToken] = None) -> List[Dict[str, Any]]:
     """
     便捷的Tavily搜索函数
     
@@ -109,23 +114,33 @@ def tavily_search(query: str, max_results: int = 5, include_raw_content: bool =
         include_raw_content: 是否包含原始内容
         timeout: 超时时间（秒）
         api_key: Tavily API密钥，如果提供则使用此密钥，否则使用全局客户端
+        cancel_token: 取消令牌，超时会被截止时间收紧，取消时立即返回调用方
         
     Returns:
         搜索结果字典列表，保持与原始经验贴兼容的格式
     """
     try:
         if api_key:
-            # 使用提供的API密钥创建临时客户端
-            client = TavilySearch(api_key)
+            # 使用提供的API密钥对应的共享客户端
+            client = _tavily_clients.get(api_key)
+            if client is None:
+                client = _tavily_clients.setdefault(api_key, TavilySearch(api_key))
         else:
             # 使用全局客户端
             client = get_tavily_client()
         
-        results = client.search(query, max_results, include_raw_content, timeout)
+        if cancel_token is not None:
+            # 请求在后台线程中执行，其超时不会超过剩余时间
+            bounded_timeout = max(1, int(cancel_token.bound_timeout(timeout)))
+            results = cancel_token.run(client.search, query, max_results, include_raw_content, bounded_timeout)
+        else:
+            results = client.search(query, max_results, include_raw_content, timeout)
         
         # 转换为字典格式以保持兼容性
         return [result.to_dict() for result in results]
         
+    except ResearchCancelled:
+        raise
     except Exception as e:
         print(f"搜索功能调用错误: {str(e)}")
         return []
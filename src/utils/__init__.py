@@ -13,6 +13,8 @@ from .text_processing import (
 )
 
 from .config import Config, load_config
+from .cancellation import CancellationToken, ResearchCancelled
+from .speculation import Speculator
 
 __all__ = [
     "clean_json_tags",
@@ -22,5 +24,8 @@ __all__ = [
     "update_state_with_search_results",
     "format_search_results_for_prompt",
     "Config",
-    "load_config"
+    "load_config",
+    "CancellationToken",
+    "ResearchCancelled",
+    "Speculator"
 ]
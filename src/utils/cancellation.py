@@ -0,0 +1,173 @@
+"""
+取消与截止时间控制
+为一次研究运行提供协作式取消令牌，经由 configurable 传递给每个节点、LLM 调用和搜索调用
+"""
+
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+
+class ResearchCancelled(Exception):
+    """研究运行被取消或已超过截止时间"""
+
+    def __init__(self, reason: str = "cancelled"):
+        super().__init__(f"研究已中止: {reason}")
+        self.reason = reason
+
+
+class CancellationToken:
+    """协作式取消令牌，同时携带可选的截止时间"""
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        初始化取消令牌
+
+        Args:
+            timeout: 距现在的最长运行秒数，None 表示不设截止时间
+        """
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self._event = threading.Event()
+        self._reason: Optional[str] = None
+        self._callbacks: List[Callable[[], Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        """是否已取消（显式取消或截止时间已到）"""
+        if self._event.is_set():
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    @property
+    def reason(self) -> Optional[str]:
+        """取消原因"""
+        if self._reason:
+            return self._reason
+        if self.cancelled:
+            return "deadline exceeded"
+        return None
+
+    def cancel(self, reason: str = "cancelled"):
+        """
+        取消运行，并触发所有已注册的回调（用于中断进行中的 HTTP 请求）
+
+        Args:
+            reason: 取消原因
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+            self._callbacks.clear()
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"取消回调执行失败: {e}")
+
+    def add_callback(self, callback: Callable[[], Any]) -> Callable[[], None]:
+        """
+        注册取消回调，若已取消则立即执行
+
+        Args:
+            callback: 取消时调用的函数
+
+        Returns:
+            用于注销该回调的函数
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def remove():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+
+                return remove
+
+        callback()
+        return lambda: None
+
+    def remaining(self) -> Optional[float]:
+        """距截止时间的剩余秒数，未设截止时间时返回 None"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        """若已取消则抛出 ResearchCancelled"""
+        if self.cancelled:
+            raise ResearchCancelled(self.reason or "cancelled")
+
+    def bound_timeout(self, timeout: Optional[float]) -> Optional[float]:
+        """
+        用剩余时间收紧单次调用的超时
+
+        Args:
+            timeout: 调用原本的超时秒数
+
+        Returns:
+            不超过剩余时间的超时秒数
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
+
+    def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        在后台线程中执行阻塞调用，取消或到达截止时间时立即返回调用方
+
+        Args:
+            func: 要执行的阻塞函数
+            *args, **kwargs: 传递给 func 的参数
+
+        Returns:
+            func 的返回值
+        """
+        self.check()
+        outcome: dict = {}
+        done = threading.Event()
+
+        def target():
+            try:
+                outcome["result"] = func(*args, **kwargs)
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        worker = threading.Thread(target=target, daemon=True)
+        worker.start()
+
+        while not done.is_set():
+            remaining = self.remaining()
+            wait_time = 0.5 if remaining is None else min(0.5, remaining)
+            if self._event.wait(wait_time) or self.cancelled:
+                raise ResearchCancelled(self.reason or "cancelled")
+
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+
+def get_cancel_token(config: Optional[dict]) -> Optional[CancellationToken]:
+    """从 RunnableConfig 中取出取消令牌"""
+    if not config:
+        return None
+    return config.get("configurable", {}).get("cancel_token")
+
+
+def check_cancelled(config: Optional[dict]):
+    """节点入口处调用：若运行已取消则抛出 ResearchCancelled"""
+    token = get_cancel_token(config)
+    if token is not None:
+        token.check()
@@ -5,7 +5,7 @@
 
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 @dataclass
@@ -26,20 +26,38 @@ class Config:
     max_search_results: int = 3
     search_timeout: int = 60
     max_content_length: int = 10000
+    content_store_path: Optional[str] = "cache/search_content.db"  # 搜索正文侧存储，None 表示保留在图状态中
+    search_cache_ttl: Optional[int] = 3600  # 相近查询的搜索结果复用有效期（秒），需要 content_store，None 表示不复用
+    source_note_min_length: Optional[int] = 2000  # 超过该长度的正文先压缩为来源笔记（按内容哈希缓存），None 表示直接截断
     
     # Agent配置
     max_reflections: int = 1
+    reflection_queries: int = 1  # 每轮反思提出的互补查询数，大于 1 时并发搜索并由反思总结一次整合
     max_paragraphs: int = 5
+    research_timeout: Optional[int] = None  # 单次研究最长运行秒数，None 表示不限制
+    speculative_search: bool = True  # 当前段落总结与反思期间，后台提前完成下一段落的初始搜索
+    retrieval_max_reports: int = 2  # 作为背景的相近历史报告数，0 表示不检索（需要 search_index_path）
+    retrieval_max_age: Optional[int] = 7 * 24 * 3600  # 只参考多少秒内生成的历史报告，None 表示不限
     
     # 输出配置
     output_dir: str = "reports"
+    search_index_path: Optional[str] = "cache/search_index.db"  # 话题与报告全文索引，None 表示不建立索引
+    outline_cache_path: Optional[str] = None  # 报告结构缓存（如 "cache/outline_cache.db"），None 表示每次都生成结构
+    outline_min_similarity: float = 0.7  # 复用同类别历史结构所需的最低查询相似度
     save_intermediate_states: bool = False
 
 
     # 热榜配置
     hot_topics_refresh_interval: int = 300  # 5分钟  
+    hot_topics_platform_intervals: Optional[Dict[str, int]] = None  # 按平台覆盖刷新间隔，例如 {"bilibili": 600}
+    hot_topics_platforms: Optional[List[str]] = None  # 启用的热榜平台标识，None 表示默认启用的平台（百度、B站）
     max_hot_topics_display: int = 10  
     enable_hot_topics: bool = True
+
+    # 报告预取配置
+    enable_prefetch: bool = False
+    prefetch_top_n: int = 3
+    prefetch_daily_budget: int = 20
     
     def validate(self) -> bool:
         """验证配置"""
@@ -80,10 +98,27 @@ class Config:
                 max_search_results=getattr(config_module, "SEARCH_RESULTS_PER_QUERY", 3),
                 search_timeout=getattr(config_module, "SEARCH_TIMEOUT", 240),
                 max_content_length=getattr(config_module, "SEARCH_CONTENT_MAX_LENGTH", 20000),
+                content_store_path=getattr(config_module, "CONTENT_STORE_PATH", "cache/search_content.db"),
+                search_cache_ttl=getattr(config_module, "SEARCH_CACHE_TTL", 3600),
+                source_note_min_length=getattr(config_module, "SOURCE_NOTE_MIN_LENGTH", 2000),
                 max_reflections=getattr(config_module, "MAX_REFLECTIONS", 2),
+                reflection_queries=getattr(config_module, "REFLECTION_QUERIES", 1),
                 max_paragraphs=getattr(config_module, "MAX_PARAGRAPHS", 5),
+                research_timeout=getattr(config_module, "RESEARCH_TIMEOUT", None),
+                speculative_search=getattr(config_module, "SPECULATIVE_SEARCH", True),
+                retrieval_max_reports=getattr(config_module, "RETRIEVAL_MAX_REPORTS", 2),
+                retrieval_max_age=getattr(config_module, "RETRIEVAL_MAX_AGE", 7 * 24 * 3600),
                 output_dir=getattr(config_module, "OUTPUT_DIR", "reports"),
-                save_intermediate_states=getattr(config_module, "SAVE_INTERMEDIATE_STATES", False)
+                search_index_path=getattr(config_module, "SEARCH_INDEX_PATH", "cache/search_index.db"),
+                outline_cache_path=getattr(config_module, "OUTLINE_CACHE_PATH", None),
+                outline_min_similarity=getattr(config_module, "OUTLINE_MIN_SIMILARITY", 0.7),
+                save_intermediate_states=getattr(config_module, "SAVE_INTERMEDIATE_STATES", False),
+                hot_topics_refresh_interval=getattr(config_module, "HOT_TOPICS_REFRESH_INTERVAL", 300),
+                hot_topics_platform_intervals=getattr(config_module, "HOT_TOPICS_PLATFORM_INTERVALS", None),
+                hot_topics_platforms=getattr(config_module, "HOT_TOPICS_PLATFORMS", None),
+                enable_prefetch=getattr(config_module, "ENABLE_PREFETCH", False),
+                prefetch_top_n=getattr(config_module, "PREFETCH_TOP_N", 3),
+                prefetch_daily_budget=getattr(config_module, "PREFETCH_DAILY_BUDGET", 20)
             )
         else:
             # .env格式配置文件
@@ -107,13 +142,43 @@ class Config:
                 max_search_results=int(config_dict.get("SEARCH_RESULTS_PER_QUERY", "3")),
                 search_timeout=int(config_dict.get("SEARCH_TIMEOUT", "240")),
                 max_content_length=int(config_dict.get("SEARCH_CONTENT_MAX_LENGTH", "20000")),
+                content_store_path=config_dict.get("CONTENT_STORE_PATH", "cache/search_content.db") or None,
+                search_cache_ttl=int(config_dict.get("SEARCH_CACHE_TTL", "3600")) or None,
+                source_note_min_length=int(config_dict.get("SOURCE_NOTE_MIN_LENGTH", "2000")) or None,
                 max_reflections=int(config_dict.get("MAX_REFLECTIONS", "2")),
+                reflection_queries=int(config_dict.get("REFLECTION_QUERIES", "1")),
                 max_paragraphs=int(config_dict.get("MAX_PARAGRAPHS", "5")),
+                research_timeout=int(config_dict["RESEARCH_TIMEOUT"]) if config_dict.get("RESEARCH_TIMEOUT") else None,
+                speculative_search=config_dict.get("SPECULATIVE_SEARCH", "true").lower() == "true",
+                retrieval_max_reports=int(config_dict.get("RETRIEVAL_MAX_REPORTS", "2")),
+                retrieval_max_age=int(config_dict["RETRIEVAL_MAX_AGE"]) if config_dict.get("RETRIEVAL_MAX_AGE") else 7 * 24 * 3600,
                 output_dir=config_dict.get("OUTPUT_DIR", "reports"),
-                save_intermediate_states=config_dict.get("SAVE_INTERMEDIATE_STATES", "true").lower() == "true"
+                search_index_path=config_dict.get("SEARCH_INDEX_PATH", "cache/search_index.db") or None,
+                outline_cache_path=config_dict.get("OUTLINE_CACHE_PATH") or None,
+                outline_min_similarity=float(config_dict.get("OUTLINE_MIN_SIMILARITY", "0.7")),
+                save_intermediate_states=config_dict.get("SAVE_INTERMEDIATE_STATES", "true").lower() == "true",
+                hot_topics_refresh_interval=int(config_dict.get("HOT_TOPICS_REFRESH_INTERVAL", "300")),
+                hot_topics_platform_intervals=_parse_platform_intervals(config_dict.get("HOT_TOPICS_PLATFORM_INTERVALS")),
+                hot_topics_platforms=[p.strip() for p in config_dict["HOT_TOPICS_PLATFORMS"].split(",") if p.strip()]
+                if config_dict.get("HOT_TOPICS_PLATFORMS") else None,
+                enable_prefetch=config_dict.get("ENABLE_PREFETCH", "false").lower() == "true",
+                prefetch_top_n=int(config_dict.get("PREFETCH_TOP_N", "3")),
+                prefetch_daily_budget=int(config_dict.get("PREFETCH_DAILY_BUDGET", "20"))
             )
 
 
+def _parse_platform_intervals(value: Optional[str]) -> Optional[Dict[str, int]]:
+    """解析 .env 中的平台刷新间隔，格式: baidu:300,bilibili:600"""
+    if not value:
+        return None
+    intervals = {}
+    for item in value.split(","):
+        if ":" in item:
+            platform, seconds = item.split(":", 1)
+            intervals[platform.strip()] = int(seconds)
+    return intervals
+
+
 def load_config(config_file: Optional[str] = None) -> Config:
     """
     加载配置
@@ -160,6 +225,8 @@ def print_config(config: Config):
     print(f"最大内容长度: {config.max_content_length}")
     print(f"最大反思次数: {config.max_reflections}")
     print(f"最大段落数: {config.max_paragraphs}")
+    print(f"研究超时: {config.research_timeout or '不限制'}")
+    print(f"热榜刷新间隔: {config.hot_topics_refresh_interval}秒")
     print(f"输出目录: {config.output_dir}")
     print(f"保存中间状态: {config.save_intermediate_states}")
     
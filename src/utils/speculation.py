@@ -0,0 +1,70 @@
+"""
+推测执行
+为一次研究运行提供后台执行器，经由 configurable 传递给节点：节点提前提交之后才会用到、
+且不依赖当前结果的工作（如下一段落的初始搜索），图运行到那里时直接取用结果
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class Speculator:
+    """按键登记的后台任务，每个键的结果只被取用一次"""
+
+    def __init__(self, max_workers: int = 1):
+        """
+        初始化推测执行器
+
+        Args:
+            max_workers: 后台线程数
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculative")
+        self._futures: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, key: Hashable, func: Callable[..., Any], *args, **kwargs) -> bool:
+        """
+        在后台执行 func，同一个键只提交一次
+
+        Args:
+            key: 任务键，取用时使用相同的键
+            func: 要执行的函数
+            *args, **kwargs: 传递给 func 的参数
+
+        Returns:
+            是否新提交了任务
+        """
+        with self._lock:
+            if self._closed or key in self._futures:
+                return False
+            self._futures[key] = self._executor.submit(func, *args, **kwargs)
+            return True
+
+    def take(self, key: Hashable) -> Optional[Future]:
+        """
+        取出已提交的任务
+
+        Args:
+            key: 任务键
+
+        Returns:
+            任务的 Future，没有提交过时返回 None
+        """
+        with self._lock:
+            return self._futures.pop(key, None)
+
+    def shutdown(self):
+        """运行结束时调用：丢弃尚未开始的任务，不等待进行中的任务"""
+        with self._lock:
+            self._closed = True
+            self._futures.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_speculator(config: Optional[dict]) -> Optional[Speculator]:
+    """从 RunnableConfig 中取出推测执行器，未启用时返回 None"""
+    if not config:
+        return None
+    return config.get("configurable", {}).get("speculator")
@@ -0,0 +1,171 @@
+"""ResearchScheduler 与 ResearchCoalescer 的调度行为"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from src.service.scheduler import JobPreempted, Priority, ResearchScheduler
+from src.service.singleflight import ResearchCoalescer
+from src.utils.cancellation import CancellationToken, ResearchCancelled
+
+
+class FakeAgent:
+    """每次研究等待 release 后产出一条完成事件"""
+
+    def __init__(self):
+        self.config = SimpleNamespace(research_timeout=None)
+        self.release = threading.Event()
+        self.runs = []
+
+    def research(self, query, save_report=True, hot_topic_info=None, cancel_token=None, **kwargs):
+        self.runs.append(query)
+        while not self.release.wait(0.01):
+            cancel_token.check()
+        yield {"node": "completed", "report": f"report {query}", "report_path": None}
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "等待超时"
+        time.sleep(0.01)
+
+
+def make_scheduler(**kwargs):
+    agent = FakeAgent()
+    return ResearchScheduler(ResearchCoalescer(agent), **kwargs), agent
+
+
+def start_slot_thread(scheduler, order, name, priority, user="default", cancel_token=None, errors=None):
+    def run():
+        try:
+            with scheduler.slot(priority, user, cancel_token):
+                order.append(name)
+        except Exception as e:
+            if errors is None:
+                raise
+            errors[name] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def queued(scheduler):
+    return sum(stats["queued"] for stats in scheduler.stats().values())
+
+
+def test_grant_order_follows_priority():
+    scheduler, _ = make_scheduler(max_concurrent=1)
+    order = []
+    threads = []
+    with scheduler.slot(Priority.BATCH):
+        for name, priority in [("batch", Priority.BATCH), ("prefetch", Priority.PREFETCH),
+                               ("interactive", Priority.INTERACTIVE)]:
+            threads.append(start_slot_thread(scheduler, order, name, priority))
+            wait_until(lambda: queued(scheduler) == len(threads))
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ["interactive", "prefetch", "batch"]
+
+
+def test_class_limit_keeps_slot_for_interactive():
+    scheduler, _ = make_scheduler(max_concurrent=2, class_limits={Priority.BATCH: 1})
+    order = []
+    with scheduler.slot(Priority.BATCH):
+        batch = start_slot_thread(scheduler, order, "batch", Priority.BATCH)
+        wait_until(lambda: queued(scheduler) == 1)
+        interactive = start_slot_thread(scheduler, order, "interactive", Priority.INTERACTIVE)
+        interactive.join(5)
+        assert order == ["interactive"]
+    batch.join(5)
+    assert order == ["interactive", "batch"]
+
+
+def test_round_robin_across_users():
+    scheduler, _ = make_scheduler(max_concurrent=1)
+    order = []
+    threads = []
+    with scheduler.slot(Priority.INTERACTIVE):
+        for name, user in [("a1", "a"), ("a2", "a"), ("a3", "a"), ("b1", "b")]:
+            threads.append(start_slot_thread(scheduler, order, name, Priority.BATCH, user))
+            wait_until(lambda: queued(scheduler) == len(threads))
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ["a1", "b1", "a2", "a3"]
+
+
+def test_cancel_while_queued_leaves_queue():
+    scheduler, _ = make_scheduler(max_concurrent=1)
+    order, errors = [], {}
+    token = CancellationToken()
+    with scheduler.slot(Priority.INTERACTIVE):
+        thread = start_slot_thread(scheduler, order, "queued", Priority.BATCH, cancel_token=token, errors=errors)
+        wait_until(lambda: queued(scheduler) == 1)
+        token.cancel("user left")
+        thread.join(5)
+        assert queued(scheduler) == 0
+
+    assert order == []
+    assert isinstance(errors["queued"], ResearchCancelled)
+    assert all(stats["running"] == 0 for stats in scheduler.stats().values())
+
+
+def test_interactive_wait_preempts_queued_prefetch_only():
+    scheduler, agent = make_scheduler(max_concurrent=1)
+    order, errors = [], {}
+    with scheduler.slot(Priority.BATCH):
+        prefetch = start_slot_thread(scheduler, order, "prefetch", Priority.PREFETCH, errors=errors)
+        batch = start_slot_thread(scheduler, order, "batch", Priority.BATCH, errors=errors)
+        wait_until(lambda: queued(scheduler) == 2)
+
+        events = scheduler.research("click", save_report=False)
+        assert next(events)["node"] == "queued"
+        prefetch.join(5)
+        assert isinstance(errors["prefetch"], JobPreempted)
+        assert scheduler.stats()["batch"]["queued"] == 1
+    agent.release.set()
+    assert list(events)[-1]["node"] == "completed"
+    batch.join(5)
+    assert order == ["batch"]
+
+
+def test_full_queue_preempts_newest_low_priority():
+    scheduler, _ = make_scheduler(max_concurrent=1, max_queued=2)
+    order, errors = [], {}
+    threads = []
+    with scheduler.slot(Priority.INTERACTIVE):
+        for name in ("old", "new"):
+            threads.append(start_slot_thread(scheduler, order, name, Priority.BATCH, errors=errors))
+            wait_until(lambda: queued(scheduler) == len(threads))
+        threads.append(start_slot_thread(scheduler, order, "interactive", Priority.INTERACTIVE, errors=errors))
+        threads[1].join(5)
+        assert isinstance(errors["new"], JobPreempted)
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ["interactive", "old"]
+
+
+def test_joining_running_flight_takes_no_slot():
+    scheduler, agent = make_scheduler(max_concurrent=1)
+    prefetch, click = [], []
+    threading.Thread(target=lambda: prefetch.extend(scheduler.research(
+        "topic", save_report=False, priority=Priority.PREFETCH, user="prefetch")), daemon=True).start()
+    wait_until(lambda: agent.runs == ["topic"])
+
+    # 唯一的槽位被预取占用，相同话题的点击不排队，直接跟随该运行
+    thread = threading.Thread(target=lambda: click.extend(scheduler.research("Topic ", save_report=False)),
+                              daemon=True)
+    thread.start()
+    wait_until(lambda: scheduler.coalescer.stats()["in_flight"] == 1 and
+               next(iter(scheduler.coalescer._flights.values())).subscribers == 2)
+    assert scheduler.stats()["interactive"] == {"running": 0, "queued": 0, "limit": 4}
+    agent.release.set()
+    thread.join(5)
+
+    assert agent.runs == ["topic"]
+    assert [event["node"] for event in click] == ["completed"]
+    wait_until(lambda: len(prefetch) == 1)